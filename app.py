@@ -1,41 +1,62 @@
 import os
 from dotenv import load_dotenv
-from flask import request
 from flask_cors import CORS
-from models import SessionLocal
+from db import close_db
+from cache import cache
+from compression import init_compression
+from events import hub
+from metrics import init_metrics
+from models import engine
+from serialization import ORJSONProvider
 from routes.players import players_bp
 from routes.tournaments import tournaments_bp
 from routes.matchups import matchups_bp
 from routes.brackets import brackets_bp
 from routes.tournament_players import tournament_players_bp
+from routes.events import events_bp
 from apiflask import APIFlask
 
 load_dotenv()
 
 app = APIFlask(__name__)
 
+# jsonify and request parsing go through orjson
+app.json = ORJSONProvider(app)
+
 # Enable CORS
 CORS(app)
 
-# Database session
-@app.before_request
-def create_session():
-    request.db = SessionLocal() # pyright: ignore[reportAttributeAccessIssue]
+# Database session, created lazily on first use by db.get_db
+app.teardown_appcontext(close_db)
+
+# Per-endpoint latency, query and pool metrics at /metrics
+init_metrics(app, engine, lambda: [
+    ("cache_stats", "Response cache counters and size.", cache.snapshot()),
+    ("event_hub_stats", "Live event hub counters and open subscribers.", hub.snapshot())
+])
 
-@app.teardown_request
-def close_session(exception=None):
-    request.db.close() # pyright: ignore[reportAttributeAccessIssue]
+# gzip/brotli by Accept-Encoding; registered after metrics so sizes are measured on the wire
+init_compression(app)
 
 @app.route("/")
 def home():
     return "Welcome to the UniTY Tennis Backend!"
 
+@app.route("/cache/stats")
+def cache_stats():
+    return cache.snapshot()
+
+@app.route("/events/stats")
+def event_stats():
+    return hub.snapshot()
+
 # Register blueprints
 app.register_blueprint(players_bp)
 app.register_blueprint(tournaments_bp)
 app.register_blueprint(matchups_bp)
 app.register_blueprint(brackets_bp)
 app.register_blueprint(tournament_players_bp)
+app.register_blueprint(events_bp)
 
 if __name__ == "__main__":
     debug_mode = os.getenv("ENVIRONMENT", "prod") == "dev"
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+from functools import wraps
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from db import db
+from models import DATABASE_URL, POOL_OPTIONS
+
+load_dotenv()
+
+# Serve the polling endpoints as async views on an AsyncEngine instead of the sync session
+ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+
+# Async drivers standing in for the sync ones; ASYNC_DATABASE_URL overrides the mapping entirely
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_sessionmaker = None
+_engine_loop = None
+_sessionmaker_lock = threading.Lock()
+
+def async_database_url(url=DATABASE_URL):
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def run_steps(steps):
+    """Run a view body written as query steps on the request's sync session.
+
+    `steps` is a generator that yields (statement, fetch) pairs, `fetch` naming the
+    Result method that shapes the answer ("all", "first", "one" or "scalar"), gets
+    that answer back, and finally returns the response. The same body then serves
+    the sync view here and the async one through run_steps_async.
+    """
+    result = None
+    while True:
+        try:
+            statement, fetch = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result = getattr(db.execute(statement), fetch)()
+
+async def run_steps_async(steps):
+    """Run a view body written as query steps (see run_steps) on an AsyncSession.
+
+    The body runs on the request's own event loop, where Flask's request context
+    lives; only the queries go to the engine's loop, whose pool is shared by all
+    requests.
+    """
+    loop, sessionmaker = _engine()
+    session = sessionmaker()
+
+    async def fetch_result(statement, fetch):
+        return getattr(await session.execute(statement), fetch)()
+
+    def on_engine_loop(coroutine):
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    try:
+        result = None
+        while True:
+            try:
+                statement, fetch = steps.send(result)
+            except StopIteration as done:
+                return done.value
+            result = await on_engine_loop(fetch_result(statement, fetch))
+    finally:
+        await on_engine_loop(session.close())
+
+def _engine():
+    """The async engine's event loop and sessionmaker, created on first use.
+
+    Flask runs each async view to completion in an event loop of its own, and async
+    driver connections belong to the loop that opened them. So the engine lives on
+    one long-running loop in a background thread, and its pool is bounded by the
+    same DB_POOL_* settings as the sync engine's rather than connecting per query.
+    """
+    global _engine_loop, _sessionmaker
+
+    with _sessionmaker_lock:
+        if _sessionmaker is None:
+            _engine_loop, _sessionmaker = _create_engine()
+
+    return _engine_loop, _sessionmaker
+
+def _create_engine():
+    # Imported here so the sync mode never needs the async drivers installed
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = async_database_url()
+    if make_url(url).database in (None, "", ":memory:"):
+        engine = create_async_engine(url)
+    else:
+        engine = create_async_engine(url, **POOL_OPTIONS)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="async-db", daemon=True).start()
+    return loop, async_sessionmaker(engine, expire_on_commit=False)
+
+def async_alternative(async_view):
+    """Serve a route with `async_view` instead of the decorated sync view when ASYNC_MODE is on.
+
+    Both views take the same arguments and return the same responses; the swap happens
+    once at import time, so the sync mode pays nothing for it.
+    """
+    def decorator(view):
+        if not ASYNC_MODE:
+            return view
+        return wraps(view)(async_view)
+    return decorator
@@ -0,0 +1,123 @@
+"""Compare sync and async serving throughput under many concurrent pollers.
+
+Starts the app twice on a threaded WSGI server, once with ASYNC_MODE=false and once
+with ASYNC_MODE=true, and points BENCH_POLLERS (default 1000) client threads at the
+polling endpoints for BENCH_SECONDS each. The response cache is turned off so every
+poll reaches the database. Runs against BENCH_DATABASE_URL (default ./bench.db).
+
+    python -m benchmarks.async_polling
+"""
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+
+NUM_POLLERS = int(os.getenv("BENCH_POLLERS", 1000))
+DURATION = float(os.getenv("BENCH_SECONDS", 15))
+PORT = int(os.getenv("BENCH_PORT", 8099))
+PATHS = ["/brackets/1/matchups", "/brackets/1/standings", "/tournaments"]
+
+def setup():
+    from app import app
+    from models import Base, engine
+    from sqlalchemy import insert
+    from models import Bracket, BracketPlayer, Player, Tournament
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tournament.__table__), [{"name": "Bench", "format": "ROUND_ROBIN", "status": "IN_PROGRESS"}])
+        conn.execute(insert(Bracket.__table__), [{"tournament_id": 1, "name": "Bench"}])
+        conn.execute(insert(Player.__table__), [
+            {"name": f"Player {i}", "gender": "Male", "phone_number": f"555-{i:04}"} for i in range(32)
+        ])
+        conn.execute(insert(BracketPlayer.__table__), [{"bracket_id": 1, "player_id": i + 1} for i in range(32)])
+
+    response = app.test_client().post("/matchups/generate", json={"bracket_id": 1, "format": "SWISS"})
+    assert response.status_code == 201, response.get_json()
+
+def serve():
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    make_server("127.0.0.1", PORT, app, threaded=True).serve_forever()
+
+def wait_for_server():
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def poll(stop, latencies, errors, index):
+    path = PATHS[index % len(PATHS)]
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except OSError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+def run(async_mode):
+    env = {**os.environ, "ASYNC_MODE": "true" if async_mode else "false", "CACHE_BACKEND": "none"}
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.async_polling", "serve"], env=env)
+
+    try:
+        wait_for_server()
+        stop = threading.Event()
+        latencies = []
+        errors = []
+        pollers = [threading.Thread(target=poll, args=(stop, latencies, errors, i), daemon=True) for i in range(NUM_POLLERS)]
+        for poller in pollers:
+            poller.start()
+        time.sleep(DURATION)
+        stop.set()
+        for poller in pollers:
+            poller.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    print(
+        f"{'async' if async_mode else 'sync':>5}: {len(latencies) / DURATION:8.1f} req/s  "
+        f"p50 {quantiles[49] * 1000:7.1f} ms  p95 {quantiles[94] * 1000:7.1f} ms  "
+        f"p99 {quantiles[98] * 1000:7.1f} ms  errors {len(errors)} {dict(Counter(errors))}"
+    )
+
+def main():
+    setup()
+    print(f"{NUM_POLLERS} pollers for {DURATION:.0f}s each over {', '.join(PATHS)}")
+    run(async_mode=False)
+    run(async_mode=True)
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["serve"]:
+        serve()
+    else:
+        main()
@@ -0,0 +1,173 @@
+"""Compare query plans and latencies of the hot query shapes with and without the models.py indexes.
+
+Builds a synthetic dataset in its own database (BENCH_DATABASE_URL, default ./bench.db),
+runs each query without the declared indexes, creates them, and runs them again.
+
+    python -m benchmarks.indexes
+"""
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, insert, text
+from models import Base, Bracket, BracketPlayer, Matchup, Player, Tournament, TournamentPlayer
+
+load_dotenv()
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+NUM_MATCHUPS = int(os.getenv("BENCH_MATCHUPS", 1_000_000))
+NUM_PLAYERS = 10_000
+NUM_TOURNAMENTS = 100
+BRACKETS_PER_TOURNAMENT = 10
+PLAYERS_PER_BRACKET = 32
+REPEAT = 200
+BATCH_SIZE = 10_000
+
+QUERIES = {
+    "matchups by bracket/status/round": (
+        "SELECT id FROM matchup WHERE bracket_id = :bracket_id AND status = 'PLANNING' AND round = "
+        "(SELECT MIN(round) FROM matchup WHERE bracket_id = :bracket_id AND status = 'PLANNING')"
+    ),
+    "bracket player lookup": "SELECT id FROM bracket_player WHERE bracket_id = :bracket_id AND player_id = :player_id",
+    "tournament player lookup": "SELECT id FROM tournament_player WHERE tournament_id = :tournament_id AND player_id = :player_id",
+    "brackets by tournament": "SELECT id FROM bracket WHERE tournament_id = :tournament_id",
+}
+
+def insert_batches(conn, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(model.__table__), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(model.__table__), batch)
+
+def build_dataset(engine):
+    """Create the schema without secondary indexes and fill it with synthetic rows."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=engine)
+
+    rng = random.Random(42)
+    num_brackets = NUM_TOURNAMENTS * BRACKETS_PER_TOURNAMENT
+    matchups_per_bracket = NUM_MATCHUPS // num_brackets
+
+    with engine.begin() as conn:
+        insert_batches(conn, Player, (
+            {"name": f"Player {i}", "gender": "Male" if i % 2 else "Female", "phone_number": f"555-{i:06}"}
+            for i in range(NUM_PLAYERS)
+        ))
+        insert_batches(conn, Tournament, (
+            {"name": f"Tournament {i}", "format": "ROUND_ROBIN", "status": "IN_PROGRESS"}
+            for i in range(NUM_TOURNAMENTS)
+        ))
+        insert_batches(conn, Bracket, (
+            {"tournament_id": i // BRACKETS_PER_TOURNAMENT + 1, "name": f"Bracket {i}"}
+            for i in range(num_brackets)
+        ))
+
+        bracket_players = {
+            bracket_id: rng.sample(range(1, NUM_PLAYERS + 1), PLAYERS_PER_BRACKET)
+            for bracket_id in range(1, num_brackets + 1)
+        }
+        insert_batches(conn, BracketPlayer, (
+            {"bracket_id": bracket_id, "player_id": player_id}
+            for bracket_id, player_ids in bracket_players.items()
+            for player_id in player_ids
+        ))
+        tournament_players = {
+            ((bracket_id - 1) // BRACKETS_PER_TOURNAMENT + 1, player_id)
+            for bracket_id, player_ids in bracket_players.items()
+            for player_id in player_ids
+        }
+        insert_batches(conn, TournamentPlayer, (
+            {"tournament_id": tournament_id, "player_id": player_id}
+            for tournament_id, player_id in sorted(tournament_players)
+        ))
+
+        def matchups():
+            for bracket_id, player_ids in bracket_players.items():
+                current_round = rng.randint(1, 10)
+                for i in range(matchups_per_bracket):
+                    round_num = i * 10 // matchups_per_bracket + 1
+                    if round_num < current_round:
+                        status = "COMPLETED"
+                    elif round_num == current_round:
+                        status = "PLANNING"
+                    else:
+                        status = "PENDING"
+                    player1, player2 = rng.sample(player_ids, 2)
+                    yield {
+                        "bracket_id": bracket_id,
+                        "player1_id": player1,
+                        "player2_id": player2,
+                        "round": round_num,
+                        "status": status,
+                    }
+
+        insert_batches(conn, Matchup, matchups())
+
+    return num_brackets
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+        return "; ".join(row[-1] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}"), params).mappings()
+    return "; ".join(f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows)
+
+def run_queries(engine, num_brackets):
+    rng = random.Random(7)
+    results = {}
+
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            param_sets = [
+                {
+                    "bracket_id": rng.randint(1, num_brackets),
+                    "tournament_id": rng.randint(1, NUM_TOURNAMENTS),
+                    "player_id": rng.randint(1, NUM_PLAYERS),
+                }
+                for _ in range(REPEAT)
+            ]
+            plan = explain(conn, sql, param_sets[0])
+
+            started = time.perf_counter()
+            for params in param_sets:
+                conn.execute(text(sql), params).fetchall()
+            elapsed = time.perf_counter() - started
+
+            results[name] = {"plan": plan, "avg_ms": elapsed / REPEAT * 1000}
+
+    return results
+
+def main():
+    engine = create_engine(BENCH_DATABASE_URL)
+
+    started = time.perf_counter()
+    num_brackets = build_dataset(engine)
+    print(f"Built dataset with {NUM_MATCHUPS} matchups in {time.perf_counter() - started:.1f}s")
+
+    before = run_queries(engine, num_brackets)
+
+    started = time.perf_counter()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"Created indexes in {time.perf_counter() - started:.1f}s")
+
+    after = run_queries(engine, num_brackets)
+
+    for name in QUERIES:
+        print(f"\n{name}")
+        print(f"  before: {before[name]['avg_ms']:8.3f} ms  {before[name]['plan']}")
+        print(f"  after:  {after[name]['avg_ms']:8.3f} ms  {after[name]['plan']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Hammer round advancement from many threads and check the round state stays exact.
+
+Every matchup of a round is completed concurrently through PUT /matchups/<id>, then
+the script checks that the next round opened exactly once and that each round's
+stored PLANNING count matches the matchups. Runs against BENCH_DATABASE_URL
+(default ./bench.db), which must be set before the app is imported.
+
+    python -m benchmarks.round_advancement
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+
+from sqlalchemy import func, insert
+from models import Base, Bracket, BracketPlayer, BracketRound, Matchup, Player, SessionLocal, Tournament, engine
+from app import app
+
+NUM_PLAYERS = int(os.getenv("BENCH_PLAYERS", 32))
+NUM_THREADS = int(os.getenv("BENCH_THREADS", 16))
+
+def setup():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tournament.__table__), [{"name": "Bench", "format": "ROUND_ROBIN", "status": "IN_PROGRESS"}])
+        conn.execute(insert(Bracket.__table__), [{"tournament_id": 1, "name": "Bench"}])
+        conn.execute(insert(Player.__table__), [
+            {"name": f"Player {i}", "gender": "Male", "phone_number": f"555-{i:04}"} for i in range(NUM_PLAYERS)
+        ])
+        conn.execute(insert(BracketPlayer.__table__), [
+            {"bracket_id": 1, "player_id": i + 1} for i in range(NUM_PLAYERS)
+        ])
+
+def check_round_state(session):
+    actual = dict(
+        session.query(Matchup.round, func.count(Matchup.id))
+        .filter(Matchup.bracket_id == 1, Matchup.status == "PLANNING")
+        .group_by(Matchup.round)
+    )
+    stored = {row.round: row.open_count for row in session.query(BracketRound).filter(BracketRound.bracket_id == 1)}
+    mismatched = {round_num: (count, actual.get(round_num, 0)) for round_num, count in stored.items() if count != actual.get(round_num, 0)}
+    assert not mismatched, f"stored vs actual PLANNING counts differ: {mismatched}"
+    return actual
+
+def main():
+    setup()
+    client = app.test_client()
+    response = client.post("/matchups/generate", json={"bracket_id": 1, "format": "ROUND_ROBIN"})
+    assert response.status_code == 201, response.get_json()
+
+    session = SessionLocal()
+    first_round = [m.id for m in session.query(Matchup).filter(Matchup.bracket_id == 1, Matchup.round == 1)]
+    for matchup_id in first_round:
+        client.put(f"/matchups/{matchup_id}", json={"status": "PLANNING"})
+
+    def complete(matchup):
+        thread_client = app.test_client()
+        barrier.wait()
+        response = thread_client.put(f"/matchups/{matchup.id}", json={
+            "status": "COMPLETED",
+            "winner_id": matchup.player1_id,
+            "score": "6-4 6-4"
+        })
+        assert response.status_code == 200, response.get_json()
+
+    num_rounds = session.query(func.max(Matchup.round)).filter(Matchup.bracket_id == 1).scalar()
+    started = time.perf_counter()
+
+    for round_num in range(1, num_rounds + 1):
+        session.expire_all()
+        planning = session.query(Matchup).filter(Matchup.bracket_id == 1, Matchup.status == "PLANNING").all()
+        assert planning and {m.round for m in planning} == {round_num}, f"round {round_num} is not the only open round"
+
+        barrier = threading.Barrier(min(NUM_THREADS, len(planning)))
+        with ThreadPoolExecutor(max_workers=barrier.parties) as pool:
+            list(pool.map(complete, planning))
+
+        session.expire_all()
+        actual = check_round_state(session)
+        expected_next = session.query(Matchup).filter(Matchup.bracket_id == 1, Matchup.round == round_num + 1).count()
+        assert actual.get(round_num + 1, 0) == expected_next, f"round {round_num + 1} did not open fully"
+        print(f"round {round_num}: {len(planning)} results from {barrier.parties} threads, next round opened {expected_next}")
+
+    session.close()
+    print(f"All {num_rounds} rounds advanced exactly once in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time round-robin schedule generation and storage for large brackets.
+
+Compares the circle-method pairing table with the old list-rotation loop, then
+stores the schedule through replace_bracket_matchups in its own database
+(BENCH_DATABASE_URL, default ./bench.db).
+
+    python -m benchmarks.round_robin
+"""
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models import Base, Bracket, Player, Tournament
+from scheduling.round_robin import round_robin_schedule
+from scheduling.store import replace_bracket_matchups
+
+load_dotenv()
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+NUM_PLAYERS = int(os.getenv("BENCH_PLAYERS", 512))
+
+def rotation_schedule(player_ids):
+    """The list-rotation loop generate_matchups used before the schedule engine."""
+    players = list(player_ids)
+    if len(players) % 2 != 0:
+        players.append(None)
+
+    schedule = []
+    for round_num in range(len(players) - 1):
+        for i in range(len(players) // 2):
+            player1 = players[i]
+            player2 = players[-(i + 1)]
+            if player1 and player2:
+                schedule.append((round_num + 1, player1, player2))
+        players = [players[0], players[-1], *players[1:-1]]
+    return schedule
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - started) * 1000:10.1f} ms")
+    return result
+
+def main():
+    player_ids = list(range(1, NUM_PLAYERS + 1))
+    print(f"{NUM_PLAYERS} players")
+
+    timed("list rotation (old)", lambda: rotation_schedule(player_ids))
+    single = timed("circle method, single", lambda: list(round_robin_schedule(player_ids)))
+    double = timed("circle method, double", lambda: list(round_robin_schedule(player_ids, double=True)))
+    print(f"{len(single)} matchups single, {len(double)} double")
+
+    engine = create_engine(BENCH_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tournament.__table__), [{"name": "Bench", "format": "ROUND_ROBIN", "status": "IN_PROGRESS"}])
+        conn.execute(insert(Bracket.__table__), [{"tournament_id": 1, "name": "Bench"}])
+        conn.execute(insert(Player.__table__), [
+            {"name": f"Player {player_id}", "gender": "Male", "phone_number": f"555-{player_id:04}"}
+            for player_id in player_ids
+        ])
+
+    session = sessionmaker(bind=engine)()
+    for label, schedule in (("store single", single), ("store double", double)):
+        rows = [
+            {"bracket_id": 1, "player1_id": home_id, "player2_id": away_id, "round": round_num, "status": "PENDING"}
+            for round_num, home_id, away_id in schedule
+        ]
+
+        def store():
+            stored = replace_bracket_matchups(session, 1, rows)
+            session.commit()
+            return stored
+
+        stored = timed(label, store)
+        assert all(row["id"] is not None for row in stored)
+    session.close()
+
+if __name__ == "__main__":
+    main()
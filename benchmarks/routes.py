@@ -0,0 +1,317 @@
+"""Drive every route through the Flask test client and record latency and query counts.
+
+Builds a dataset with populate.populate() at the scale given by the POPULATE_* settings
+(see populate.py), then sends BENCH_REQUESTS (default 200) requests to each route and
+reports p50/p95/p99 latency, requests per second, CPU time and SQL statements per
+request. With BENCH_TRACE_ALLOCATIONS=true it also records the peak memory allocated
+while serving each request. Write routes act on records the harness creates itself,
+so every run sees the same data.
+The streaming event routes are left to benchmarks.sse_fanout.
+
+Results go to BENCH_OUTPUT (default benchmark-<commit>.json). Two result files can be
+compared route by route:
+
+    python -m benchmarks.routes
+    python -m benchmarks.routes compare benchmark-abc1234.json benchmark-def5678.json
+
+Runs against BENCH_DATABASE_URL (default ./bench.db), which is dropped and rebuilt.
+The response cache is off unless CACHE_BACKEND is set, so reads reach the database.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("CACHE_BACKEND", "none")
+# The harness reports query counts itself; per-request budget warnings would only bury them
+os.environ.setdefault("METRICS_QUERY_BUDGET", "0")
+os.environ.setdefault("METRICS_LATENCY_BUDGET_MS", "0")
+
+NUM_REQUESTS = int(os.getenv("BENCH_REQUESTS", 200))
+# Tracing allocations slows every request down, so latency from such a run isn't comparable
+TRACE_ALLOCATIONS = os.getenv("BENCH_TRACE_ALLOCATIONS", "false").lower() == "true"
+SKIPPED_ENDPOINTS = {"static", "openapi.docs", "openapi.swagger_ui_oauth_redirect", "openapi.spec"}
+STREAMING_ENDPOINTS = {"events.stream_bracket_events", "events.stream_tournament_events"}
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def setup():
+    """Build the dataset and return the ids the route scenarios work on."""
+    from sqlalchemy import insert, select
+    from models import Base, Bracket, BracketPlayer, Matchup, Player, Tournament, engine
+    from populate import populate
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    populate(
+        num_players=int(os.getenv("POPULATE_PLAYERS", 500)),
+        num_tournaments=int(os.getenv("POPULATE_TOURNAMENTS", 10)),
+        brackets_per_tournament=int(os.getenv("POPULATE_BRACKETS", 4)),
+        bracket_size=int(os.getenv("POPULATE_BRACKET_SIZE", 16)),
+        completed_fraction=float(os.getenv("POPULATE_COMPLETED", 0.5)),
+        seed=int(os.getenv("POPULATE_SEED", 42))
+    )
+
+    matchups = Matchup.__table__
+    with engine.begin() as conn:
+        tournament_id = conn.execute(select(Tournament.__table__.c.id).order_by(Tournament.__table__.c.id)).scalar()
+        bracket_id = conn.execute(
+            select(Bracket.__table__.c.id).where(Bracket.__table__.c.format == "ROUND_ROBIN").order_by(Bracket.__table__.c.id)
+        ).scalar()
+        completed = conn.execute(
+            select(matchups.c.id, matchups.c.bracket_id).where(matchups.c.status == "COMPLETED").order_by(matchups.c.id)
+        ).all()
+        player_ids = list(conn.execute(select(Player.__table__.c.id).order_by(Player.__table__.c.id).limit(64)).scalars())
+
+        # A bracket of its own for generate, bulk add and created matchups, so the populated ones stay as they are
+        bench_bracket_id = conn.execute(
+            insert(Bracket.__table__).values(tournament_id=tournament_id, name="Bench", version=1)
+        ).inserted_primary_key[0]
+        conn.execute(insert(BracketPlayer.__table__), [
+            {"bracket_id": bench_bracket_id, "player_id": player_id} for player_id in player_ids[:16]
+        ])
+
+        # Players in no bracket or tournament, for DELETE /players to remove
+        spare_player_ids = [
+            conn.execute(
+                insert(Player.__table__).values(name=f"Spare Player {i}", gender="Male", phone_number=f"555-8{i:06}")
+            ).inserted_primary_key[0]
+            for i in range(NUM_REQUESTS)
+        ]
+
+    # PUT re-scores one completed matchup; the batch re-scores the completed matchups of another bracket
+    batch_bracket_id = next(
+        (bracket for _, bracket in completed if bracket != completed[0][1]), completed[0][1]
+    )
+    return {
+        "tournament_id": tournament_id,
+        "bracket_id": bracket_id,
+        "bench_bracket_id": bench_bracket_id,
+        "player_ids": player_ids,
+        "spare_player_ids": spare_player_ids,
+        "matchup_id": completed[0][0],
+        "batch_matchup_ids": [matchup_id for matchup_id, bracket in completed if bracket == batch_bracket_id][:50]
+    }
+
+def scenarios(ids):
+    """(endpoint, method, path, body, record) per route.
+
+    `path` and `body` take the request number; `record`, if set, is given each response
+    so later scenarios can use the records it created.
+    """
+    t, b, bench = ids["tournament_id"], ids["bracket_id"], ids["bench_bracket_id"]
+    created_players = []
+    created_registrations = []
+
+    def add_player(i):
+        return {"name": f"Bench Player {i}", "gender": "Female", "phone_number": f"555-9{i:06}"}
+
+    def record_player(response):
+        created_players.append(response.get_json()["id"])
+
+    def register_player(i):
+        player_id = created_players[i % len(created_players)] if created_players else ids["player_ids"][0]
+        created_registrations.append(player_id)
+        return {"tournament_id": t, "player_ids": [player_id]}
+
+    def unregister_player(i):
+        return f"/tournaments/{t}/players/{created_registrations.pop()}"
+
+    return [
+        ("home", "GET", lambda i: "/", None),
+        ("players.get_players", "GET", lambda i: "/players", None),
+        ("players.get_players", "GET", lambda i: "/players?limit=100", None),
+        ("players.add_player", "POST", lambda i: "/players", add_player, record_player),
+        ("players.search_player_registry", "GET", lambda i: "/players/search?q=dan", None),
+        ("players.search_player_registry", "GET", lambda i: "/players/search?q=danyelle%20neal", None),
+        ("players.search_player_registry", "GET", lambda i: "/players/search?q=555-9000001", None),
+        ("tournaments.get_tournaments", "GET", lambda i: "/tournaments", None),
+        ("tournaments.get_tournament_overview", "GET", lambda i: f"/tournaments/{t}/overview", None),
+        ("tournaments.create_tournament", "POST", lambda i: "/tournaments",
+            lambda i: {"name": f"Bench Tournament {i}", "format": "ROUND_ROBIN", "status": "PLANNING"}),
+        ("tournaments.update_tournament", "PUT", lambda i: f"/tournaments/{t}",
+            lambda i: {"name": f"Tournament {t} ({i % 2})"}),
+        ("brackets.get_brackets", "GET", lambda i: "/brackets", None),
+        ("brackets.create_bracket", "POST", lambda i: "/brackets",
+            lambda i: {"tournament_id": t, "name": f"Bench Bracket {i}"}),
+        ("brackets.get_brackets_by_tournament", "GET", lambda i: f"/tournaments/{t}/brackets", None),
+        ("brackets.get_bracket_players", "GET", lambda i: f"/brackets/{b}/players", None),
+        ("brackets.add_player_to_bracket", "POST", lambda i: f"/brackets/{bench}/players",
+            lambda i: {"player_id": created_players[i % len(created_players)]}),
+        ("brackets.add_players_to_bracket", "POST", lambda i: f"/brackets/{bench}/players/bulk",
+            lambda i: {"player_ids": ids["player_ids"]}),
+        ("brackets.get_bracket_standings", "GET", lambda i: f"/brackets/{b}/standings", None),
+        ("tournament_players.get_tournament_players", "GET", lambda i: "/tournament-players?limit=100", None),
+        ("tournament_players.get_players_by_tournament", "GET", lambda i: f"/tournaments/{t}/players", None),
+        ("tournament_players.add_players_to_tournament", "POST", lambda i: "/tournament_players", register_player),
+        ("tournament_players.remove_player_from_tournament", "DELETE", unregister_player, None),
+        ("matchups.get_matchups", "GET", lambda i: "/matchups?limit=100", None),
+        ("matchups.get_matchups_by_bracket", "GET", lambda i: f"/brackets/{b}/matchups", None),
+        ("matchups.get_matchups_by_bracket", "GET", lambda i: f"/brackets/{b}/matchups?ALL=true", None),
+        ("matchups.get_matchups_by_bracket", "GET", lambda i: f"/brackets/{b}/matchups?ALL=true&normalized=true", None),
+        ("matchups.get_matchups_by_bracket", "GET",
+            lambda i: f"/brackets/{b}/matchups?ALL=true&normalized=true&player_fields=name&fields=round,status,score,player1,player2,winner", None),
+        ("matchups.generate_matchups", "POST", lambda i: "/matchups/generate",
+            lambda i: {"bracket_id": bench, "format": ("ROUND_ROBIN", "SINGLE_ELIMINATION", "DOUBLE_ELIMINATION")[i % 3]}),
+        ("matchups.create_matchup", "POST", lambda i: "/matchups",
+            lambda i: {"bracket_id": bench, "player1_id": ids["player_ids"][0], "player2_id": ids["player_ids"][1], "status": "PENDING"}),
+        ("matchups.update_matchup", "PUT", lambda i: f"/matchups/{ids['matchup_id']}",
+            lambda i: {"score": f"6-{i % 5} 6-4"}),
+        ("matchups.update_matchups_batch", "POST", lambda i: "/matchups/batch",
+            lambda i: {"results": [{"id": matchup_id, "score": f"6-{i % 5} 7-5"} for matchup_id in ids["batch_matchup_ids"]]}),
+        ("players.remove_player", "DELETE", lambda i: f"/players/{ids['spare_player_ids'][i]}", None),
+        ("cache_stats", "GET", lambda i: "/cache/stats", None),
+        ("event_stats", "GET", lambda i: "/events/stats", None),
+        ("metrics", "GET", lambda i: "/metrics", None)
+    ]
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def route_name(adapter, method, url):
+    """The route's rule plus any query string, e.g. "GET /brackets/<int:bracket_id>/matchups?ALL=true"."""
+    path, _, query = url.partition("?")
+    rule, _ = adapter.match(path, method=method, return_rule=True)
+    return f"{method} {rule.rule}" + (f"?{query}" if query else "")
+
+def run():
+    from sqlalchemy import event
+    from app import app
+    from models import engine
+
+    ids = setup()
+    client = app.test_client()
+    adapter = app.url_map.bind("localhost")
+
+    query_count = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*args):
+        query_count[0] += 1
+
+    if TRACE_ALLOCATIONS:
+        tracemalloc.start()
+
+    results = []
+    covered = set()
+    for endpoint, method, path, body, *record in scenarios(ids):
+        latencies = []
+        queries = 0
+        cpu_time = 0.0
+        allocated = 0
+        statuses = {}
+        started = time.perf_counter()
+
+        for i in range(NUM_REQUESTS):
+            url = path(i)
+            if i == 0:
+                route = route_name(adapter, method, url)
+            payload = body(i) if body else None
+            query_count[0] = 0
+            if TRACE_ALLOCATIONS:
+                tracemalloc.reset_peak()
+                memory_before = tracemalloc.get_traced_memory()[0]
+            cpu_started = time.process_time()
+            request_started = time.perf_counter()
+            response = client.open(url, method=method, json=payload)
+            response.get_data()
+            latencies.append(time.perf_counter() - request_started)
+            cpu_time += time.process_time() - cpu_started
+            if TRACE_ALLOCATIONS:
+                allocated += tracemalloc.get_traced_memory()[1] - memory_before
+            if record:
+                record[0](response)
+            queries += query_count[0]
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        result = {
+            "route": route,
+            "endpoint": endpoint,
+            "requests": NUM_REQUESTS,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "requests_per_sec": round(NUM_REQUESTS / elapsed, 1),
+            "cpu_ms_per_request": round(cpu_time / NUM_REQUESTS * 1000, 3),
+            "queries_per_request": round(queries / NUM_REQUESTS, 2),
+            "allocated_kb_per_request": round(allocated / NUM_REQUESTS / 1024, 1) if TRACE_ALLOCATIONS else None,
+            "response_bytes": len(response.get_data())
+        }
+        results.append(result)
+        covered.add(endpoint)
+        print(
+            f"{result['route']:<48} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+            f"p99 {result['p99_ms']:>8.2f} ms  {result['requests_per_sec']:>8.1f} req/s  "
+            f"cpu {result['cpu_ms_per_request']:>8.2f} ms  {result['queries_per_request']:>6.2f} queries  "
+            + (f"{result['allocated_kb_per_request']:>9.1f} KB peak  " if TRACE_ALLOCATIONS else "")
+            + str(result["statuses"])
+        )
+
+    uncovered = sorted(
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.endpoint not in covered | SKIPPED_ENDPOINTS | STREAMING_ENDPOINTS
+    )
+    if uncovered:
+        print(f"Routes without a scenario: {', '.join(uncovered)}")
+
+    commit = git_commit()
+    output = os.getenv("BENCH_OUTPUT", f"benchmark-{commit}.json")
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": engine.url.get_backend_name(),
+            "python": platform.python_version(),
+            "cache_backend": os.getenv("CACHE_BACKEND"),
+            "scale": {key: value for key, value in os.environ.items() if key.startswith("POPULATE_")},
+            "results": results
+        }, f, indent=2)
+    print(f"Saved results to {output}")
+
+def compare(before_path, after_path):
+    """Print each route's change in latency, throughput, CPU, allocations and queries between two result files."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"{before['commit']} -> {after['commit']}")
+    baseline = {result["route"]: result for result in before["results"]}
+    for result in after["results"]:
+        old = baseline.get(result["route"])
+        if old is None:
+            print(f"{result['route']:<48} new")
+            continue
+
+        changes = []
+        for key in ("p50_ms", "p95_ms", "requests_per_sec", "cpu_ms_per_request", "allocated_kb_per_request"):
+            if result.get(key) is None or old.get(key) is None:
+                continue
+            ratio = result[key] / old[key] if old[key] else float("inf")
+            changes.append(f"{key} {old[key]:.2f} -> {result[key]:.2f} ({(ratio - 1) * 100:+.0f}%)")
+        changes.append(f"queries {old['queries_per_request']:.2f} -> {result['queries_per_request']:.2f}")
+        print(f"{result['route']:<48} " + "  ".join(changes))
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["compare"] and len(sys.argv) == 4:
+        compare(sys.argv[2], sys.argv[3])
+    else:
+        run()
@@ -0,0 +1,156 @@
+"""Hold many open event streams on one worker and time how fast updates fan out.
+
+Starts the app on a threaded WSGI server, opens BENCH_SUBSCRIBERS (default 2000)
+streams on /brackets/1/events from a single selector loop, then sends BENCH_UPDATES
+score updates and reports how long each took to reach every subscriber. Runs against
+BENCH_DATABASE_URL (default ./bench.db). The server's SSE_MAX_SUBSCRIBERS is raised
+to fit the subscribers, each of which holds one of its threads.
+
+    python -m benchmarks.sse_fanout
+"""
+import http.client
+import json
+import os
+import resource
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+
+NUM_SUBSCRIBERS = int(os.getenv("BENCH_SUBSCRIBERS", 2000))
+NUM_UPDATES = int(os.getenv("BENCH_UPDATES", 20))
+PORT = int(os.getenv("BENCH_PORT", 8098))
+SUBSCRIBE_TIMEOUT = float(os.getenv("BENCH_SUBSCRIBE_TIMEOUT", 60))
+
+def setup():
+    from sqlalchemy import insert
+    from app import app
+    from models import Base, Bracket, BracketPlayer, Player, Tournament, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tournament.__table__), [{"name": "Bench", "format": "ROUND_ROBIN", "status": "IN_PROGRESS"}])
+        conn.execute(insert(Bracket.__table__), [{"tournament_id": 1, "name": "Bench"}])
+        conn.execute(insert(Player.__table__), [
+            {"name": f"Player {i}", "gender": "Male", "phone_number": f"555-{i:04}"} for i in range(8)
+        ])
+        conn.execute(insert(BracketPlayer.__table__), [{"bracket_id": 1, "player_id": i + 1} for i in range(8)])
+
+    response = app.test_client().post("/matchups/generate", json={"bracket_id": 1, "format": "ROUND_ROBIN"})
+    assert response.status_code == 201, response.get_json()
+
+def serve():
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", PORT, app, threaded=True)
+    server.socket.listen(4096)
+    server.serve_forever()
+
+def request(method, path, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, data
+
+def wait_for_server():
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            request("GET", "/")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def open_subscribers(selector):
+    for _ in range(NUM_SUBSCRIBERS):
+        sock = socket.create_connection(("127.0.0.1", PORT))
+        sock.sendall(b"GET /brackets/1/events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ, data={"events": 0})
+
+def wait_for_event(selector, expected, timeout=60):
+    """Read every stream until each has seen `expected` matchup events; return the elapsed time."""
+    started = time.perf_counter()
+    pending = {key.fileobj for key in selector.get_map().values() if key.data["events"] < expected}
+
+    while pending and time.perf_counter() - started < timeout:
+        for key, _ in selector.select(timeout=1):
+            chunk = key.fileobj.recv(65536)
+            key.data["events"] += chunk.count(b"event: matchup")
+            if key.data["events"] >= expected:
+                pending.discard(key.fileobj)
+
+    if pending:
+        raise RuntimeError(f"{len(pending)} subscribers missed event {expected}")
+    return time.perf_counter() - started
+
+def main():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, NUM_SUBSCRIBERS * 2 + 256)), hard))
+
+    setup()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.sse_fanout", "serve"],
+        env={**os.environ, "SSE_MAX_SUBSCRIBERS": str(NUM_SUBSCRIBERS)}
+    )
+    selector = selectors.DefaultSelector()
+
+    try:
+        wait_for_server()
+        started = time.perf_counter()
+        open_subscribers(selector)
+
+        # Wait until the server reports every stream subscribed
+        deadline = time.monotonic() + SUBSCRIBE_TIMEOUT
+        while True:
+            _, stats = request("GET", "/events/stats")
+            stats = json.loads(stats)
+            if stats["subscribers"] >= NUM_SUBSCRIBERS:
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"only {stats['subscribers']} of {NUM_SUBSCRIBERS} subscribers connected "
+                    f"({stats['refused_subscribers']} refused) after {SUBSCRIBE_TIMEOUT:.0f}s"
+                )
+            time.sleep(0.1)
+        print(f"{NUM_SUBSCRIBERS} subscribers connected in {time.perf_counter() - started:.1f}s")
+
+        latencies = []
+        for update in range(1, NUM_UPDATES + 1):
+            sent = time.perf_counter()
+            status, _ = request("PUT", "/matchups/1", body=f'{{"score": "6-{update % 7} 6-4"}}')
+            assert status == 200
+            wait_for_event(selector, update)
+            latencies.append(time.perf_counter() - sent)
+
+        print(
+            f"fan-out to all subscribers: median {statistics.median(latencies) * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms over {NUM_UPDATES} updates"
+        )
+        _, stats = request("GET", "/events/stats")
+        print(stats.decode().strip())
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["serve"]:
+        serve()
+    else:
+        main()
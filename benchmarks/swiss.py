@@ -0,0 +1,38 @@
+"""Time Swiss pairing of every round of a large event with random results.
+
+    python -m benchmarks.swiss
+"""
+import os
+import random
+import time
+
+from scheduling.swiss import default_num_rounds, pair_swiss_round
+
+NUM_PLAYERS = int(os.getenv("BENCH_PLAYERS", 1000))
+
+def main():
+    rng = random.Random(42)
+    player_ids = list(range(1, NUM_PLAYERS + 1))
+    results = []
+    seen = set()
+    rematches = 0
+
+    for round_num in range(1, default_num_rounds(NUM_PLAYERS) + 1):
+        started = time.perf_counter()
+        pairs, bye_player_id, repeated = pair_swiss_round(player_ids, results)
+        elapsed = time.perf_counter() - started
+        rematches += len(repeated)
+
+        for player1_id, player2_id in pairs:
+            assert (frozenset((player1_id, player2_id)) in seen) == ((player1_id, player2_id) in repeated)
+            seen.add(frozenset((player1_id, player2_id)))
+            results.append((player1_id, player2_id, rng.choice((player1_id, player2_id))))
+        if bye_player_id is not None:
+            results.append((bye_player_id, None, bye_player_id))
+
+        print(f"round {round_num:2}: {len(pairs)} pairs in {elapsed * 1000:.1f} ms")
+
+    print(f"{rematches} rematches")
+
+if __name__ == "__main__":
+    main()
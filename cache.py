@@ -0,0 +1,246 @@
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from dotenv import load_dotenv
+from flask import Response, make_response, request
+from pydantic import BaseModel
+from sqlalchemy import event
+from compression import compress_response, matching_etag
+from models import SessionLocal
+
+load_dotenv()
+
+class NullCacheBackend:
+    """Backend that never stores anything, for turning the cache off."""
+
+    def __init__(self):
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key):
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key, value, tags, generations):
+        pass
+
+    def replace(self, key, expected, value):
+        pass
+
+    def generations(self, tags):
+        return ()
+
+    def invalidate(self, tags):
+        self.stats["invalidations"] += len(tags)
+
+    def snapshot(self):
+        return {**self.stats, "size": 0, "max_entries": 0}
+
+class LRUCacheBackend:
+    """Bounded in-memory LRU cache with a TTL and tag-based invalidation.
+
+    Every tag carries a generation number that invalidation bumps. A value is only
+    stored if its tags' generations are unchanged since the caller read them before
+    querying the database, so a write committed mid-read can never be cached over.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._entries = OrderedDict()
+        self._tag_keys = {}
+        self._tag_generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            value, tags, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key, value, tags, generations):
+        with self._lock:
+            if self._generations(tags) != generations:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, tags, time.monotonic() + self.ttl)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def replace(self, key, expected, value):
+        """Swap in `value` for `key`, keeping its tags and expiry, if `expected` is still what's stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is expected:
+                self._entries[key] = (value, *entry[1:])
+
+    def generations(self, tags):
+        with self._lock:
+            return self._generations(tags)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, ()):
+                    self._remove(key)
+                self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "size": len(self._entries), "max_entries": self.max_entries}
+
+    def _generations(self, tags):
+        return tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+    def _remove(self, key):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+def create_backend():
+    backend = os.getenv("CACHE_BACKEND", "memory")
+
+    if backend == "none":
+        return NullCacheBackend()
+    if backend == "memory":
+        return LRUCacheBackend(
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 1024)),
+            ttl=float(os.getenv("CACHE_TTL_SECONDS", 60))
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+cache = create_backend()
+
+def bracket_tag(bracket_id):
+    return f"bracket:{bracket_id}"
+
+def tournament_tag(tournament_id):
+    return f"tournament:{tournament_id}"
+
+def invalidate_on_commit(session, *tags):
+    """Queue cache tags to be invalidated once the session's current transaction commits."""
+    session.info.setdefault("cache_tags", set()).update(tags)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate(tags)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("cache_tags", None)
+
+def _key_part(value):
+    if isinstance(value, BaseModel):
+        return tuple(sorted(value.model_dump().items()))
+    return value
+
+def compress_entry(key, entry, response):
+    """Compress a cached entry's response, keeping any newly compressed body in the cache.
+
+    Entries are never changed in place: a new variant goes into a copy of the entry,
+    which replaces it only if it is still the one cached.
+    """
+    body, mimetype, etag, variants = entry
+    if etag:
+        response.set_etag(etag)
+    response = compress_response(response, variants)
+
+    encoding = response.headers.get("Content-Encoding")
+    if encoding and encoding not in variants:
+        cache.replace(key, entry, (body, mimetype, etag, {**variants, encoding: response.get_data()}))
+    return response
+
+def cached(tags):
+    """Serve a GET view's 200 responses from the cache.
+
+    `tags` maps the view's keyword arguments to the cache tags whose invalidation
+    evicts the response. The key is the endpoint plus those keyword arguments,
+    query models included, so every filter combination is cached separately.
+    Compressed bodies are kept in the entry alongside its ETag, one per encoding
+    clients have asked for, so a hit is not compressed again.
+    Async views get an async wrapper, so the decorator works in both serving modes.
+    """
+    def decorator(view):
+        def lookup(kwargs):
+            key = (request.endpoint, tuple(sorted((name, _key_part(value)) for name, value in kwargs.items())))
+            entry = cache.get(key)
+
+            if entry is None:
+                return key, None
+
+            body, mimetype, etag, _ = entry
+            # The client may hold the plain body or any compressed variant of it
+            matched = matching_etag(etag) if etag else None
+            if matched:
+                response = Response(status=304)
+                response.set_etag(matched)
+                return key, response
+            return key, compress_entry(key, entry, Response(body, mimetype=mimetype))
+
+        def store(key, response, entry_tags, generations):
+            response = make_response(response)
+
+            if response.status_code == 200 and not response.is_streamed:
+                etag, _ = response.get_etag()
+                entry = (response.get_data(), response.mimetype, etag, {})
+                cache.set(key, entry, entry_tags, generations)
+                response = compress_entry(key, entry, response)
+
+            return response
+
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                key, response = lookup(kwargs)
+                if response is not None:
+                    return response
+
+                entry_tags = tuple(tags(**kwargs))
+                generations = cache.generations(entry_tags)
+                return store(key, await view(*args, **kwargs), entry_tags, generations)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key, response = lookup(kwargs)
+            if response is not None:
+                return response
+
+            entry_tags = tuple(tags(**kwargs))
+            generations = cache.generations(entry_tags)
+            return store(key, view(*args, **kwargs), entry_tags, generations)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,152 @@
+import gzip
+import os
+import zlib
+
+import brotli
+from dotenv import load_dotenv
+from flask import request
+
+load_dotenv()
+
+# In order of preference when a client accepts several equally
+ENCODINGS = [encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if encoding.strip()]
+MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+MIMETYPES = set(
+    os.getenv(
+        "COMPRESSION_MIMETYPES",
+        "application/json,text/event-stream,text/plain,text/html,text/css,application/javascript"
+    ).split(",")
+)
+
+class GzipStream:
+    def __init__(self):
+        # wbits 31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+COMPRESSORS = {
+    "br": (lambda data: brotli.compress(data, quality=BROTLI_QUALITY), BrotliStream),
+    "gzip": (lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), GzipStream)
+}
+
+def negotiate_encoding():
+    """The preferred encoding the client accepts, by Accept-Encoding quality, or None."""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accepted.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def encoded_etag(etag, encoding):
+    """The ETag of a body's `encoding` variant: its bytes differ, so its strong tag must too."""
+    return f"{etag}-{encoding}"
+
+def matching_etag(etag):
+    """The If-None-Match tag naming `etag` or any of its encoded variants, or None."""
+    for tag in (etag, *(encoded_etag(etag, encoding) for encoding in COMPRESSORS)):
+        if request.if_none_match.contains(tag):
+            return tag
+    return None
+
+def compress_stream(chunks, encoding, flush_each):
+    """Compress a streamed body as it is produced.
+
+    With `flush_each` every chunk is flushed through on its own, so a client reading
+    an event stream gets each event as it happens rather than when the buffer fills.
+    """
+    compressor = COMPRESSORS[encoding][1]()
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+            if flush_each:
+                data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        # Closing the original body is what runs cleanup like an event stream's unsubscribe
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+def compress_response(response, variants=None):
+    """Compress a response in the encoding the client prefers, if it's worth it.
+
+    `variants` maps encodings to bodies already compressed from this same body, as the
+    response cache keeps them, so a cached response is compressed once per encoding
+    rather than once per request. It is only read; the caller picks up a newly
+    compressed body from the response. A compressed response's ETag gets the
+    encoding as a suffix, so each variant keeps a strong tag of its own.
+    """
+    if (
+        not ENCODINGS
+        or response.mimetype not in MIMETYPES
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or request.method == "HEAD"
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, response.mimetype == "text/event-stream")
+        response.headers.pop("Content-Length", None)
+    else:
+        body = variants.get(encoding) if variants is not None else None
+
+        if body is None:
+            data = response.get_data()
+            if len(data) < MIN_SIZE:
+                return response
+
+            body = COMPRESSORS[encoding][0](data)
+            if len(body) >= len(data):
+                return response
+
+        response.set_data(body)
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+def init_compression(app):
+    """Compress `app`'s responses according to each request's Accept-Encoding.
+
+    Responses under MIN_SIZE bytes are sent as they are. Streamed responses are
+    compressed chunk by chunk, whatever their size.
+    """
+    app.after_request(compress_response)
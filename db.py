@@ -0,0 +1,18 @@
+from flask import g
+from werkzeug.local import LocalProxy
+from models import SessionLocal
+
+def get_db():
+    """Return the database session for the current request, creating it on first use."""
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+def close_db(exception=None):
+    """Close the request's session, if one was ever created."""
+    session = g.pop("db", None)
+    if session is not None:
+        session.close()
+
+# Request-scoped session; no connection is checked out until it is first used
+db = LocalProxy(get_db)
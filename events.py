@@ -0,0 +1,175 @@
+import os
+import queue
+import threading
+from collections import OrderedDict, deque
+
+import orjson
+from dotenv import load_dotenv
+from sqlalchemy import event
+from models import SessionLocal
+from cache import bracket_tag, tournament_tag
+
+load_dotenv()
+
+class Subscriber:
+    """One open event stream: a bounded queue of (id, kind, payload) events waiting to be sent.
+
+    `start_id` is the last event id published when it subscribed, and `dropped_at` the id
+    of the first event it could not take, once it has fallen behind and been dropped.
+    """
+
+    __slots__ = ("channel", "queue", "start_id", "dropped_at")
+
+    def __init__(self, channel, queue_size, start_id):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.start_id = start_id
+        self.dropped_at = None
+
+class ChannelHistory:
+    """A channel's most recent events, and the id at or below which its events are no longer known.
+
+    `floor` rises as old events fall out of the bounded history. A channel created after
+    others were evicted starts at the hub's eviction floor, since it may be one of them.
+    """
+
+    __slots__ = ("floor", "entries")
+
+    def __init__(self, floor, history_size):
+        self.floor = floor
+        self.entries = deque(maxlen=history_size)
+
+class EventHub:
+    """In-process publish/subscribe for live matchup changes.
+
+    Every event gets an id from one counter and is kept in a short history per channel,
+    so a reconnecting client can resume from its Last-Event-ID. Subscribers each have a
+    bounded queue; one that falls behind far enough to fill it is dropped and told to
+    refresh, so a slow reader never holds up publishing or grows memory.
+    At most `max_subscribers` streams are open at once, since each holds a server
+    thread for as long as its client stays connected.
+    """
+
+    def __init__(self, queue_size=100, history_size=256, max_channels=1024, max_subscribers=512):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.max_channels = max_channels
+        self.max_subscribers = max_subscribers
+        self.stats = {"published": 0, "delivered": 0, "dropped_subscribers": 0, "refused_subscribers": 0}
+        self._subscribers = {}
+        self._subscriber_count = 0
+        self._history = OrderedDict()
+        self._last_id = 0
+        # The last event id of any channel whose history was evicted
+        self._evicted_floor = 0
+        self._lock = threading.Lock()
+
+    def publish(self, channels, kind, data):
+        # Serialized once, however many subscribers receive it
+        payload = orjson.dumps(data, default=str).decode()
+
+        with self._lock:
+            self._last_id += 1
+            entry = (self._last_id, kind, payload)
+            self.stats["published"] += 1
+
+            for channel in channels:
+                history = self._history.get(channel)
+                if history is None:
+                    history = self._history[channel] = ChannelHistory(self._evicted_floor, self.history_size)
+                    while len(self._history) > self.max_channels:
+                        _, evicted = self._history.popitem(last=False)
+                        self._evicted_floor = max(self._evicted_floor, evicted.entries[-1][0])
+                else:
+                    self._history.move_to_end(channel)
+                    if len(history.entries) == history.entries.maxlen:
+                        history.floor = history.entries[0][0]
+                history.entries.append(entry)
+
+                for subscriber in list(self._subscribers.get(channel, ())):
+                    try:
+                        subscriber.queue.put_nowait(entry)
+                        self.stats["delivered"] += 1
+                    except queue.Full:
+                        subscriber.dropped_at = entry[0]
+                        self._remove(subscriber)
+                        self.stats["dropped_subscribers"] += 1
+
+        return entry[0]
+
+    def subscribe(self, channel, last_event_id=None):
+        """Register a subscriber and return (subscriber, backlog, missed), or None if the hub is full.
+
+        `backlog` holds the events after `last_event_id` from the channel's history.
+        `missed` is True instead if some of them may already have left the history, or
+        the channel's whole history was evicted, in which case the client has to
+        refetch rather than replay.
+        """
+        with self._lock:
+            if self._subscriber_count >= self.max_subscribers:
+                self.stats["refused_subscribers"] += 1
+                return None
+
+            subscriber = Subscriber(channel, self.queue_size, self._last_id)
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+            self._subscriber_count += 1
+
+            backlog = []
+            missed = False
+            if last_event_id is not None:
+                history = self._history.get(channel)
+                floor = history.floor if history is not None else self._evicted_floor
+                # Ids from before a restart mean nothing to this process
+                missed = last_event_id > self._last_id or last_event_id < floor
+                if not missed and history is not None:
+                    backlog = [entry for entry in history.entries if entry[0] > last_event_id]
+
+            return subscriber, backlog, missed
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._remove(subscriber)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "subscribers": self._subscriber_count,
+                "channels": len(self._history),
+                "last_event_id": self._last_id
+            }
+
+    def _remove(self, subscriber):
+        subscribers = self._subscribers.get(subscriber.channel)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._subscriber_count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.channel]
+
+hub = EventHub(
+    queue_size=int(os.getenv("SSE_QUEUE_SIZE", 100)),
+    history_size=int(os.getenv("SSE_HISTORY_SIZE", 256)),
+    max_channels=int(os.getenv("SSE_MAX_CHANNELS", 1024)),
+    max_subscribers=int(os.getenv("SSE_MAX_SUBSCRIBERS", 512))
+)
+
+def bracket_channels(bracket_id, tournament_id):
+    """A bracket's events go to its own stream and to its tournament's."""
+    channels = [bracket_tag(bracket_id)]
+    if tournament_id is not None:
+        channels.append(tournament_tag(tournament_id))
+    return channels
+
+def publish_on_commit(session, channels, kind, data):
+    """Queue an event to be published once the session's current transaction commits."""
+    session.info.setdefault("events", []).append((channels, kind, data))
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_committed(session):
+    for channels, kind, data in session.info.pop("events", ()):
+        hub.publish(channels, kind, data)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("events", None)
@@ -1,11 +1,32 @@
 import os
 import json
+import gzip
+import time
+import hashlib
+from datetime import date
 
 from dotenv import load_dotenv
-from models import SessionLocal, Matchup, Bracket, Player, Tournament, TournamentPlayer, BracketPlayer
+from sqlalchemy import Date, bindparam, func, insert, select, update
+from models import Base, SessionLocal, engine, Matchup, Bracket, Player, Tournament, TournamentPlayer, BracketPlayer
+from scheduling.rounds import rebuild_round_state
+from scheduling.standings import rebuild_standings
+from search import rebuild_search_index
 
 load_dotenv()
 
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+
+# Tables in the order they are exported, keyed by export file name
+EXPORT_TABLES = [
+    ("tournaments", Tournament),
+    ("players", Player),
+    ("brackets", Bracket),
+    ("tournament_players", TournamentPlayer),
+    ("bracket_players", BracketPlayer),
+    ("matchups", Matchup),
+]
+
 def export_table_to_file(table_name, rows):
     """Save rows of a table to a JSON file."""
     output_dir = "exported_data"
@@ -111,6 +132,104 @@ def export_all_tables():
     finally:
         session.close()
 
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ChunkedNdjsonWriter:
+    """Write NDJSON rows to one or more chunk files, starting a new chunk once max_bytes is reached."""
+
+    def __init__(self, output_dir, table_name, max_bytes=None, compress=False):
+        self.output_dir = output_dir
+        self.table_name = table_name
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.chunks = []
+        self.row_count = 0
+        self._file = None
+        self._path = None
+        self._chunk_rows = 0
+        self._chunk_bytes = 0
+
+    def _open_chunk(self):
+        extension = "ndjson.gz" if self.compress else "ndjson"
+        if self.max_bytes:
+            name = f"{self.table_name}.{len(self.chunks) + 1:05d}.{extension}"
+        else:
+            name = f"{self.table_name}.{extension}"
+        self._path = os.path.join(self.output_dir, name)
+        self._file = gzip.open(self._path, "wb") if self.compress else open(self._path, "wb")
+        self._chunk_rows = 0
+        self._chunk_bytes = 0
+
+    def _close_chunk(self):
+        self._file.close()
+        self.chunks.append({
+            "file": os.path.basename(self._path),
+            "rows": self._chunk_rows,
+            "bytes": os.path.getsize(self._path),
+            "sha256": _file_sha256(self._path)
+        })
+        self._file = None
+
+    def write(self, row):
+        line = (json.dumps(row, separators=(",", ":"), default=_json_default) + "\n").encode("utf-8")
+
+        # Chunk size is bounded on uncompressed bytes so the check needs no flush
+        if self._file is not None and self.max_bytes and self._chunk_bytes + len(line) > self.max_bytes:
+            self._close_chunk()
+        if self._file is None:
+            self._open_chunk()
+
+        self._file.write(line)
+        self._chunk_rows += 1
+        self._chunk_bytes += len(line)
+        self.row_count += 1
+
+    def close(self):
+        if self._file is None and not self.chunks:
+            # Always leave a file behind so empty tables still appear in the export
+            self._open_chunk()
+        if self._file is not None:
+            self._close_chunk()
+
+def export_all_tables_streaming(output_dir="exported_data", compress=False, max_chunk_bytes=None):
+    """Stream every table to NDJSON chunk files in batches and write a manifest of counts and checksums."""
+    session = SessionLocal()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {"format": "ndjson", "compressed": compress, "tables": {}}
+
+    try:
+        for table_name, model in EXPORT_TABLES:
+            writer = ChunkedNdjsonWriter(output_dir, table_name, max_chunk_bytes, compress)
+            result = session.execute(
+                select(model.__table__).order_by(model.__table__.c.id),
+                execution_options={"yield_per": EXPORT_BATCH_SIZE}
+            )
+            for row in result.mappings():
+                writer.write(dict(row))
+            writer.close()
+
+            manifest["tables"][table_name] = {"rows": writer.row_count, "chunks": writer.chunks}
+            print(f"Exported {writer.row_count} rows from {table_name} in {len(writer.chunks)} chunk(s)")
+
+        with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=4)
+
+        print("All tables exported successfully.")
+    except Exception as e:
+        print(f"Error exporting tables: {e}")
+    finally:
+        session.close()
+
 def import_data_from_files():
     """Import data from JSON files and insert them into the database."""
     session = SessionLocal()
@@ -172,15 +291,171 @@ def import_data_from_files():
                     session.add(bracket_player)
 
         session.commit()
+        rebuild_derived_tables(session)
+        print("All data imported successfully.")
+    except Exception as e:
+        session.rollback()
+        print(f"Error importing data: {e}")
+    finally:
+        session.close()
+
+def _read_table_rows(input_dir, table_name):
+    """Yield the exported rows of a table from its NDJSON chunks, or from the legacy JSON file."""
+    manifest_path = os.path.join(input_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        for chunk in manifest["tables"].get(table_name, {}).get("chunks", []):
+            chunk_path = os.path.join(input_dir, chunk["file"])
+            opener = gzip.open if chunk_path.endswith(".gz") else open
+            with opener(chunk_path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return
+
+    file_path = os.path.join(input_dir, f"{table_name}.json")
+    if os.path.exists(file_path):
+        with open(file_path, "r") as f:
+            yield from json.load(f)
+
+def _row_converter(table):
+    """Build a function converting exported JSON values back to column types (ISO strings to dates)."""
+    date_columns = [column.name for column in table.columns if isinstance(column.type, Date)]
+
+    def convert(row):
+        for name in date_columns:
+            if isinstance(row.get(name), str):
+                row[name] = date.fromisoformat(row[name])
+        return row
+
+    return convert
+
+def _self_references(table):
+    """Columns that point at other rows of the same table, such as a matchup's next matchup."""
+    return [
+        column.name for column in table.columns
+        if any(foreign_key.column.table is table for foreign_key in column.foreign_keys)
+    ]
+
+def _link_self_references(session, table, input_dir, table_name, columns, batch_size):
+    """Fill in self-referencing columns once every row they can point at exists."""
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values({column: bindparam(f"b_{column}") for column in columns})
+    )
+    batch = []
+    linked = 0
+    for row in _read_table_rows(input_dir, table_name):
+        if all(row.get(column) is None for column in columns):
+            continue
+        batch.append({"b_id": row["id"], **{f"b_{column}": row.get(column) for column in columns}})
+        if len(batch) >= batch_size:
+            session.execute(statement, batch)
+            session.commit()
+            linked += len(batch)
+            batch = []
+    if batch:
+        session.execute(statement, batch)
+        session.commit()
+        linked += len(batch)
+    return linked
+
+def rebuild_derived_tables(session):
+    """Recompute the tables derived from imported rows: round state, standings and the player search index."""
+    rebuild_round_state(session)
+    rebuild_standings(session)
+    rebuild_search_index(session)
+    session.commit()
+
+def bulk_import_data_from_files(input_dir="exported_data", batch_size=IMPORT_BATCH_SIZE, rebuild_indexes=False):
+    """Import exported tables in foreign-key order using batched executemany inserts.
+
+    Each batch is committed on its own. Exports are written in id order, so an
+    interrupted import resumes after the highest id already in each table when run
+    again, whatever had been committed when it stopped. Columns referring to rows of
+    the same table, such as a matchup's next matchups, can point forward to rows not
+    inserted yet; they are inserted empty and set by a second pass once the table is
+    complete. The derived tables are rebuilt at the end.
+    """
+    table_names = {model.__table__.name: table_name for table_name, model in EXPORT_TABLES}
+    ordered_tables = [table for table in Base.metadata.sorted_tables if table.name in table_names]
+    session = SessionLocal()
+
+    dropped_indexes = []
+    if rebuild_indexes:
+        for table in ordered_tables:
+            for index in table.indexes:
+                index.drop(bind=engine, checkfirst=True)
+                dropped_indexes.append(index)
+
+    try:
+        for table in ordered_tables:
+            table_name = table_names[table.name]
+            convert = _row_converter(table)
+            deferred = _self_references(table)
+            last_id = session.execute(select(func.max(table.c.id))).scalar() or 0
+            started = time.perf_counter()
+            inserted = 0
+            batch = []
+
+            for row in _read_table_rows(input_dir, table_name):
+                if row["id"] <= last_id:
+                    continue
+                row = convert(row)
+                for column in deferred:
+                    row[column] = None
+                batch.append(row)
+                if len(batch) < batch_size:
+                    continue
+
+                session.execute(insert(table), batch)
+                session.commit()
+                inserted += len(batch)
+                batch = []
+                print(f"{table_name}: {inserted} rows ({inserted / (time.perf_counter() - started):.0f} rows/sec)")
+
+            if batch:
+                session.execute(insert(table), batch)
+                session.commit()
+                inserted += len(batch)
+
+            elapsed = time.perf_counter() - started
+            rate = inserted / elapsed if elapsed else 0
+            print(f"Imported {inserted} rows into {table_name} ({rate:.0f} rows/sec, resumed after id {last_id})")
+
+            if deferred:
+                linked = _link_self_references(session, table, input_dir, table_name, deferred, batch_size)
+                print(f"Linked {linked} rows of {table_name} through {', '.join(deferred)}")
+
+        rebuild_derived_tables(session)
+        print("Rebuilt round state, standings and the player search index.")
         print("All data imported successfully.")
     except Exception as e:
         session.rollback()
         print(f"Error importing data: {e}")
     finally:
         session.close()
+        for index in dropped_indexes:
+            index.create(bind=engine, checkfirst=True)
+        if dropped_indexes:
+            print(f"Rebuilt {len(dropped_indexes)} indexes.")
 
 if __name__ == "__main__":
     if os.getenv("DATA_PHASE") == "EXPORT":
-        export_all_tables()
+        if os.getenv("EXPORT_FORMAT", "json") == "ndjson":
+            chunk_mb = os.getenv("EXPORT_CHUNK_MB")
+            export_all_tables_streaming(
+                compress=os.getenv("EXPORT_GZIP", "false").lower() == "true",
+                max_chunk_bytes=int(float(chunk_mb) * 1024 * 1024) if chunk_mb else None
+            )
+        else:
+            export_all_tables()
     elif os.getenv("DATA_PHASE") == "IMPORT":
-        import_data_from_files()
\ No newline at end of file
+        import_data_from_files()
+    elif os.getenv("DATA_PHASE") == "BULK_IMPORT":
+        bulk_import_data_from_files(
+            batch_size=int(os.getenv("IMPORT_BATCH_SIZE", IMPORT_BATCH_SIZE)),
+            rebuild_indexes=os.getenv("IMPORT_REBUILD_INDEXES", "false").lower() == "true"
+        )
\ No newline at end of file
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from flask import Response, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# A request over either budget is logged as a warning; 0 turns that check off
+QUERY_BUDGET = int(os.getenv("METRICS_QUERY_BUDGET", 25))
+LATENCY_BUDGET = float(os.getenv("METRICS_LATENCY_BUDGET_MS", 500)) / 1000
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values, in the shape Prometheus expects."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+class MetricsRegistry:
+    """Per-endpoint request metrics, guarded by one lock since requests record from many threads."""
+
+    def __init__(self):
+        endpoint = ("endpoint", "method")
+        self.requests = Counter("http_requests_total", "Requests served.", ("endpoint", "method", "status"))
+        self.latency = Histogram("http_request_duration_seconds", "Time to produce the response.", endpoint, LATENCY_BUCKETS)
+        self.response_size = Histogram("http_response_size_bytes", "Response body size; 0 for streamed responses.", endpoint, SIZE_BUCKETS)
+        self.db_queries = Histogram("db_queries_per_request", "SQL statements executed per request.", endpoint, QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram("db_query_duration_seconds_per_request", "Time spent in SQL statements per request.", endpoint, LATENCY_BUCKETS)
+        self.pool_wait = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for pooled connections per request.", endpoint, LATENCY_BUCKETS)
+        self.over_budget = Counter("http_requests_over_budget_total", "Requests over the query-count or latency budget.", ("endpoint", "budget"))
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, status, elapsed, size, stats):
+        labels = (endpoint, method)
+        with self._lock:
+            self.requests.inc((endpoint, method, str(status)))
+            self.latency.observe(labels, elapsed)
+            self.response_size.observe(labels, size)
+            self.db_queries.observe(labels, stats["queries"])
+            self.db_time.observe(labels, stats["query_time"])
+            self.pool_wait.observe(labels, stats["pool_wait"])
+
+    def count_over_budget(self, endpoint, budget):
+        with self._lock:
+            self.over_budget.inc((endpoint, budget))
+
+    def render(self, extra_gauges=()):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.response_size, self.db_queries, self.db_time, self.pool_wait, self.over_budget):
+                lines.extend(metric.render())
+
+        for name, help, values in extra_gauges:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(values.items()):
+                lines.append(f'{name}{{key="{_escape(key)}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+def _request_stats():
+    if has_app_context():
+        return g.get("request_metrics")
+    return None
+
+def _finish_query(conn, context):
+    started = conn.info.get("query_started", {}).pop(context, None)
+    stats = _request_stats()
+    if started is not None and stats is not None:
+        stats["queries"] += 1
+        stats["query_time"] += time.perf_counter() - started
+
+# Start times are keyed by execution context, so one whose statement raised can't be
+# mistaken for another's; handle_error drops it (and still counts the failed query)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", {})[context] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_query(conn, context)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        _finish_query(exception_context.connection, exception_context.execution_context)
+
+def instrument_pool(engine):
+    """Time every connection checkout from the engine's pool, waits for a free connection included.
+
+    SQLAlchemy has no event before a checkout starts, so the pool's connect() is wrapped.
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            stats = _request_stats()
+            if stats is not None:
+                stats["pool_wait"] += time.perf_counter() - started
+
+    pool.connect = timed_connect
+
+def init_metrics(app, engine, extra_gauges=lambda: ()):
+    """Record request metrics for `app`, and serve them at /metrics in Prometheus text format.
+
+    `extra_gauges` returns (name, help, {key: value}) tuples rendered alongside, for
+    stats kept elsewhere such as the cache's.
+    """
+    instrument_pool(engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = {"started": time.perf_counter(), "queries": 0, "query_time": 0.0, "pool_wait": 0.0}
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop("request_metrics", None)
+        if stats is None or request.endpoint == "metrics":
+            return response
+
+        elapsed = time.perf_counter() - stats["started"]
+        endpoint = request.endpoint or "unmatched"
+        size = 0 if response.is_streamed else response.calculate_content_length() or 0
+        registry.record(endpoint, request.method, response.status_code, elapsed, size, stats)
+
+        if QUERY_BUDGET and stats["queries"] > QUERY_BUDGET:
+            registry.count_over_budget(endpoint, "queries")
+            app.logger.warning(
+                "%s %s ran %d queries (budget %d)", request.method, request.path, stats["queries"], QUERY_BUDGET
+            )
+        if LATENCY_BUDGET and elapsed > LATENCY_BUDGET and not response.is_streamed:
+            registry.count_over_budget(endpoint, "latency")
+            app.logger.warning(
+                "%s %s took %.0f ms (budget %.0f ms, %.0f ms in %d queries)",
+                request.method, request.path, elapsed * 1000, LATENCY_BUDGET * 1000,
+                stats["query_time"] * 1000, stats["queries"]
+            )
+
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(registry.render(extra_gauges()), mimetype="text/plain; version=0.0.4")
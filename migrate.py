@@ -0,0 +1,133 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import func, inspect, select, delete
+from sqlalchemy.schema import CreateColumn
+from models import Base, BracketRound, BracketStanding, PlayerSearchTerm, SessionLocal, engine
+from search import rebuild_search_index
+from scheduling.rounds import rebuild_round_state
+from scheduling.standings import rebuild_standings
+
+load_dotenv()
+
+def find_duplicates(session, index):
+    """Return the number of surplus rows that would violate a unique index."""
+    table = index.table
+    columns = list(index.columns)
+    groups = (
+        select(func.count().label("copies"))
+        .select_from(table)
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    surplus = session.execute(select(func.sum(groups.c.copies - 1))).scalar()
+    return surplus or 0
+
+def remove_duplicates(session, index):
+    """Delete duplicate rows for a unique index, keeping the row with the lowest id."""
+    table = index.table
+    columns = list(index.columns)
+    keep = select(func.min(table.c.id)).group_by(*columns)
+    # MySQL cannot delete from a table it selects from in the same statement, so the ids are read first
+    duplicate_ids = session.execute(select(table.c.id).where(table.c.id.not_in(keep))).scalars().all()
+    for start in range(0, len(duplicate_ids), 1000):
+        session.execute(delete(table).where(table.c.id.in_(duplicate_ids[start:start + 1000])))
+    return len(duplicate_ids)
+
+def migrate_columns():
+    """Add the columns declared in models.py that are missing from existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                # Both SQLite and MySQL accept ADD COLUMN with the column's DDL, server default included
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+                print(f"Added {table.name}.{column.name}")
+
+def migrate_tables():
+    """Create the tables declared in models.py that don't exist yet and fill the derived ones."""
+    existing_tables = set(inspect(engine).get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing_tables]
+
+    if not missing:
+        return
+
+    Base.metadata.create_all(bind=engine, tables=missing)
+    for table in missing:
+        print(f"Created {table.name}")
+
+    session = SessionLocal()
+    try:
+        if BracketRound.__table__ in missing:
+            rebuild_round_state(session)
+            session.commit()
+            print("Rebuilt round state for all brackets")
+        if BracketStanding.__table__ in missing:
+            rebuild_standings(session)
+            session.commit()
+            print("Rebuilt standings for all brackets")
+        if PlayerSearchTerm.__table__ in missing:
+            rebuild_search_index(session)
+            session.commit()
+            print("Rebuilt the player search index")
+    finally:
+        session.close()
+
+def migrate_indexes(dedupe=False):
+    """Create the indexes declared in models.py that are missing from an existing SQLite or MySQL database, or differ from it."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    session = SessionLocal()
+
+    try:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                print(f"Skipping {table.name}: table does not exist")
+                continue
+
+            existing_indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                columns = [column.name for column in index.columns]
+                if existing_indexes.get(index.name) == columns:
+                    print(f"{index.name} already exists")
+                    continue
+
+                if index.unique:
+                    duplicates = find_duplicates(session, index)
+                    if duplicates and not dedupe:
+                        print(f"Cannot create {index.name}: {duplicates} duplicate rows in {table.name} (set MIGRATE_DEDUPE=true to remove them)")
+                        continue
+                    if duplicates:
+                        removed = remove_duplicates(session, index)
+                        session.commit()
+                        print(f"Removed {removed} duplicate rows from {table.name}")
+
+                if index.name in existing_indexes:
+                    # Declared with different columns since it was created
+                    index.drop(bind=engine)
+                    print(f"Dropped {index.name} on {table.name} ({', '.join(existing_indexes[index.name])})")
+                index.create(bind=engine)
+                print(f"Created {index.name} on {table.name}")
+
+        print("Index migration complete.")
+    except Exception as e:
+        session.rollback()
+        print(f"Failed to migrate indexes: {e}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_columns()
+    migrate_tables()
+    migrate_indexes(dedupe=os.getenv("MIGRATE_DEDUPE", "false").lower() == "true")
@@ -1,15 +1,26 @@
-from sqlalchemy import Column, Date, Integer, String, ForeignKey, create_engine
+from sqlalchemy import Column, Date, Index, Integer, String, ForeignKey, create_engine
 from sqlalchemy.orm import relationship, sessionmaker, DeclarativeBase
 from dotenv import load_dotenv
-from typing import Optional
-from pydantic import BaseModel
 import os
 
 load_dotenv()
 
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
-engine = create_engine(DATABASE_URL)
+
+# Connection pool settings; in-memory SQLite uses a single-connection pool that takes none of these
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+}
+
+if DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+    engine = create_engine(DATABASE_URL)
+else:
+    engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
@@ -19,8 +30,11 @@ class Bracket(Base):
     __tablename__ = "bracket"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    tournament_id = Column(Integer, ForeignKey("tournament.id"), nullable=False)
+    tournament_id = Column(Integer, ForeignKey("tournament.id"), nullable=False, index=True)
     name = Column(String(50), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every write touching the bracket
+    format = Column(String(50), nullable=True)  # Set when matchups are generated
+    num_rounds = Column(Integer, nullable=True)
 
     # Relationships
     tournament = relationship("Tournament", back_populates="brackets")
@@ -32,6 +46,9 @@ class Bracket(Base):
 
 class Matchup(Base):
     __tablename__ = "matchup"
+    __table_args__ = (
+        Index("ix_matchup_bracket_status_round", "bracket_id", "status", "round"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     bracket_id = Column(Integer, ForeignKey("bracket.id"), nullable=False)
@@ -44,6 +61,12 @@ class Matchup(Base):
     score = Column(String(50))
     status = Column(String(20), nullable=False)
 
+    # Elimination advancement: the matchup and slot (1 or 2) the winner and loser move on to
+    winner_next_matchup_id = Column(Integer, ForeignKey("matchup.id", ondelete="SET NULL"), nullable=True)
+    winner_next_slot = Column(Integer, nullable=True)
+    loser_next_matchup_id = Column(Integer, ForeignKey("matchup.id", ondelete="SET NULL"), nullable=True)
+    loser_next_slot = Column(Integer, nullable=True)
+
     # Relationships
     bracket = relationship("Bracket", back_populates="matchups")
     player1 = relationship("Player", foreign_keys=[player1_id])
@@ -80,6 +103,7 @@ class Tournament(Base):
     end_date = Column(Date, nullable=True)    # Using String for simplicity; can be Date if needed
     format = Column(String(50), nullable=False)
     status = Column(String(20), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every write touching the tournament
 
     # Relationships
     brackets = relationship("Bracket", back_populates="tournament")
@@ -90,6 +114,9 @@ class Tournament(Base):
 
 class TournamentPlayer(Base):
     __tablename__ = "tournament_player"
+    __table_args__ = (
+        Index("uq_tournament_player", "tournament_id", "player_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     tournament_id = Column(Integer, ForeignKey("tournament.id"), nullable=False)
@@ -104,6 +131,9 @@ class TournamentPlayer(Base):
 
 class BracketPlayer(Base):
     __tablename__ = "bracket_player"
+    __table_args__ = (
+        Index("uq_bracket_player", "bracket_id", "player_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     bracket_id = Column(Integer, ForeignKey("bracket.id"), nullable=False)
@@ -116,47 +146,77 @@ class BracketPlayer(Base):
     def __repr__(self):
         return f"<BracketPlayer(id={self.id}, bracket_id={self.bracket_id}, player_id={self.player_id})>"
 
-# Pydantic models
-class BracketType(BaseModel):
-    id: Optional[int]
-    tournament_id: int
-    name: str
-
-class MatchupType(BaseModel):
-    id: Optional[int]
-    bracket_id: int
-    player1_id: Optional[int]
-    player2_id: Optional[int]
-    player1_partner_id: Optional[int]
-    player2_partner_id: Optional[int]
-    winner_id: Optional[int]
-    score: Optional[str]
-    status: str
-
-class PlayerType(BaseModel):
-    id: Optional[int]
-    name: str
-    gender: str
-    phone_number: str
-
-class TournamentType(BaseModel):
-    id: Optional[int]
-    name: str
-    start_date: Optional[str]
-    end_date: Optional[str]
-    format: str
-    status: str
-
-class TournamentPlayerType(BaseModel):
-    id: Optional[int]
-    tournament_id: int
-    player_id: int
-
-class BracketPlayerType(BaseModel):
-    id: Optional[int]
-    bracket_id: int
-    player_id: int
+class BracketRound(Base):
+    __tablename__ = "bracket_round"
+    __table_args__ = (
+        Index("uq_bracket_round", "bracket_id", "round", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bracket_id = Column(Integer, ForeignKey("bracket.id"), nullable=False)
+    round = Column(Integer, nullable=False)
+    open_count = Column(Integer, nullable=False, default=0)  # Matchups of the round still in PLANNING
+
+    def __repr__(self):
+        return f"<BracketRound(bracket_id={self.bracket_id}, round={self.round}, open_count={self.open_count})>"
+
+class BracketStanding(Base):
+    __tablename__ = "bracket_standing"
+    __table_args__ = (
+        Index("uq_bracket_standing", "bracket_id", "player_id", unique=True),
+        # Standings are read in this order (player_id breaking full ties), so the index serves them without a sort
+        Index("ix_bracket_standing_rank", "bracket_id", "wins", "set_difference", "game_difference", "player_id"),
+    )
 
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bracket_id = Column(Integer, ForeignKey("bracket.id"), nullable=False)
+    player_id = Column(Integer, ForeignKey("player.id"), nullable=False)
+    played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    sets_won = Column(Integer, nullable=False, default=0)
+    sets_lost = Column(Integer, nullable=False, default=0)
+    games_won = Column(Integer, nullable=False, default=0)
+    games_lost = Column(Integer, nullable=False, default=0)
+    set_difference = Column(Integer, nullable=False, default=0)  # Tiebreakers after wins, kept in step with the totals
+    game_difference = Column(Integer, nullable=False, default=0)
+
+    # Relationships
+    player = relationship("Player")
+
+    def __repr__(self):
+        return f"<BracketStanding(bracket_id={self.bracket_id}, player_id={self.player_id}, wins={self.wins})>"
+
+class PlayerSearchTerm(Base):
+    __tablename__ = "player_search_term"
+    __table_args__ = (
+        # Prefix searches are range scans over this index, already in result order
+        Index("ix_player_search_term", "field", "term", "player_id"),
+        Index("ix_player_search_term_player", "player_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(Integer, ForeignKey("player.id"), nullable=False)
+    field = Column(String(10), nullable=False)  # "name" for each word-suffix of the normalized name, "phone" for its digits
+    term = Column(String(80), nullable=False)
+
+    def __repr__(self):
+        return f"<PlayerSearchTerm(player_id={self.player_id}, field='{self.field}', term='{self.term}')>"
+
+class PlayerSearchTrigram(Base):
+    __tablename__ = "player_search_trigram"
+    __table_args__ = (
+        Index("uq_player_search_trigram", "trigram", "word", unique=True),
+        Index("ix_player_search_trigram_word", "word"),
+    )
+
+    # Trigrams of the distinct words in player names, not of each player, so fuzzy lookups scale with the vocabulary
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trigram = Column(String(3), nullable=False)
+    word = Column(String(80), nullable=False)
+
+    def __repr__(self):
+        return f"<PlayerSearchTrigram(trigram='{self.trigram}', word='{self.word}')>"
 
 # Create all tables
 # Base.metadata.create_all(bind=engine)
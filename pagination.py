@@ -0,0 +1,65 @@
+from typing import Optional
+from flask import Response, current_app, jsonify, stream_with_context
+from pydantic import Field
+from db import db
+from serialization import FieldsQuery
+
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+class PageQuery(FieldsQuery):
+    limit: Optional[int] = Field(default=None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of rows to return")
+    after_id: Optional[int] = Field(default=None, description="Only return rows with an id greater than this cursor")
+    stream: Optional[bool] = Field(default=False, description="Stream the JSON array from a server-side cursor")
+
+def list_response(row_type, id_column, page):
+    """Return rows of a serialization.RowType ordered by primary key, paginated or streamed as requested.
+
+    Only the columns named by `fields`, if given, are selected.
+
+    Without `limit`, `after_id` or `stream` the plain JSON list is returned, as before.
+    With `limit`/`after_id` the response is {"items": [...], "next_cursor": id or null}.
+    With `stream` the JSON array is written incrementally, one batch of rows at a time.
+    """
+    try:
+        row_type = row_type.only(page.fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = row_type.select().order_by(id_column.asc())
+
+    if page.after_id is not None:
+        statement = statement.where(id_column > page.after_id)
+
+    if page.stream:
+        if page.limit is not None:
+            statement = statement.limit(page.limit)
+        return stream_json_list(statement, row_type)
+
+    if page.limit is None:
+        return jsonify(row_type.encode_all(db.execute(statement)))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = db.execute(statement.limit(page.limit + 1)).all()
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+
+    return jsonify({
+        "items": row_type.encode_all(rows),
+        "next_cursor": rows[-1].id if has_more else None
+    })
+
+def stream_json_list(statement, row_type):
+    """Write a SELECT's rows as a JSON array without materializing the result set."""
+    dumps = current_app.json.dumps
+    encode = row_type.encode
+
+    def generate():
+        yield "["
+        first = True
+        for row in db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE)):
+            yield ("" if first else ",") + dumps(encode(row))
+            first = False
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
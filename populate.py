@@ -1,50 +1,266 @@
-from models import Player, SessionLocal
+import math
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select
+from models import Bracket, BracketPlayer, Matchup, Player, SessionLocal, Tournament, TournamentPlayer, engine
+from search import rebuild_search_index
+from scheduling.elimination import elimination_schedule
+from scheduling.round_robin import round_robin_schedule
+from scheduling.rounds import rebuild_round_state
+from scheduling.standings import rebuild_standings
+
+load_dotenv()
+
+FIRST_NAMES = [
+    "Danielle", "Kane", "Allyson", "Nash", "Charleigh", "Miguel", "Josue", "Rivka", "Mathew", "Janelle",
+    "Hassan", "Raelynn", "Alonzo", "Zendaya", "Dexter", "Valery", "Sutton", "Julissa", "Marley", "Presley",
+    "John", "Olive", "Rex", "Harmoni", "Kamryn", "Saylor", "Matthias"
+]
+LAST_NAMES = [
+    "Neal", "Vincent", "Watkins", "Franco", "Ferguson", "Reid", "Chung", "Wiley", "Cisneros", "Hardin",
+    "Russell", "Hodges", "Hester", "Shaffer", "Correa", "Holloway", "Dejesus", "Waller", "Armstrong", "Clark",
+    "Dunn", "Hancock", "Tanner", "Mahoney", "Mejia", "Gill", "Cain"
+]
+FORMATS = ("ROUND_ROBIN", "SINGLE_ELIMINATION", "DOUBLE_ELIMINATION")
+BATCH_SIZE = 5000
+
+class BatchInserter:
+    """Collect rows for one table and write them as executemany INSERTs of `batch_size` rows."""
+
+    def __init__(self, table, batch_size=BATCH_SIZE):
+        self.table = table
+        self.batch_size = batch_size
+        self.rows = []
+        self.inserted = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        with engine.begin() as conn:
+            conn.execute(insert(self.table), self.rows)
+        self.inserted += len(self.rows)
+        self.rows = []
+
+def _next_id(model):
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def random_score(rng, player1_wins):
+    """A best-of-three score from player1's side, e.g. "6-4 3-6 7-5"."""
+    sets = []
+    # The winner always takes the last set; about a third of matches go to three
+    order = rng.choice([[True, True], [True, True], [False, True, True], [True, False, True]])
+    for winner_takes_set in order:
+        won, lost = rng.choice([(6, 0), (6, 1), (6, 2), (6, 3), (6, 4), (7, 5), (7, 6)])
+        if winner_takes_set == player1_wins:
+            sets.append(f"{won}-{lost}")
+        else:
+            sets.append(f"{lost}-{won}")
+    return " ".join(sets)
+
+def round_robin_rows(bracket_id, player_ids, completed_rounds, next_id, rng):
+    """Round robin matchups played out up to `completed_rounds`, with the round after them open."""
+    rows = []
+    for round_num, home_id, away_id in round_robin_schedule(player_ids):
+        row = {
+            "id": next_id + len(rows),
+            "bracket_id": bracket_id,
+            "player1_id": home_id,
+            "player2_id": away_id,
+            "winner_id": None,
+            "score": None,
+            "round": round_num,
+            "status": "PENDING",
+            "winner_next_matchup_id": None,
+            "winner_next_slot": None,
+            "loser_next_matchup_id": None,
+            "loser_next_slot": None
+        }
+        if round_num <= completed_rounds:
+            player1_wins = rng.random() < 0.5
+            row["winner_id"] = home_id if player1_wins else away_id
+            row["score"] = random_score(rng, player1_wins)
+            row["status"] = "COMPLETED"
+        elif round_num == completed_rounds + 1:
+            row["status"] = "PLANNING"
+        rows.append(row)
+    return rows
+
+def elimination_rows(bracket_id, schedule, completed_rounds, next_id, rng):
+    """Elimination matchups with their advancement links, played out up to `completed_rounds`."""
+    rows = []
+    for index, entry in enumerate(schedule):
+        rows.append({
+            "id": next_id + index,
+            "bracket_id": bracket_id,
+            "player1_id": entry["player1_id"],
+            "player2_id": entry["player2_id"],
+            "winner_id": None,
+            "score": None,
+            "round": entry["round"],
+            "status": "PENDING",
+            "winner_next_matchup_id": next_id + entry["winner_next"][0] if entry["winner_next"] else None,
+            "winner_next_slot": entry["winner_next"][1] if entry["winner_next"] else None,
+            "loser_next_matchup_id": next_id + entry["loser_next"][0] if entry["loser_next"] else None,
+            "loser_next_slot": entry["loser_next"][1] if entry["loser_next"] else None
+        })
+
+    # The schedule is in dependency order, so every feeder is decided before the matchup it feeds
+    for entry, row in zip(schedule, rows):
+        if row["player1_id"] is None or row["player2_id"] is None:
+            continue
+        if row["round"] > completed_rounds:
+            row["status"] = "PLANNING"
+            continue
+
+        player1_wins = rng.random() < 0.5
+        winner_id, loser_id = (row["player1_id"], row["player2_id"]) if player1_wins else (row["player2_id"], row["player1_id"])
+        row.update(winner_id=winner_id, score=random_score(rng, player1_wins), status="COMPLETED")
+
+        for target, player_id in ((entry["winner_next"], winner_id), (entry["loser_next"], loser_id)):
+            if target is not None:
+                rows[target[0]][f"player{target[1]}_id"] = player_id
+
+    return rows
+
+def populate(
+    num_players=500,
+    num_tournaments=10,
+    brackets_per_tournament=4,
+    bracket_size=16,
+    completed_fraction=0.5,
+    formats=FORMATS,
+    seed=42,
+    batch_size=BATCH_SIZE
+):
+    """Generate tournaments, brackets, registrations and matchups at the given scale.
+
+    Bracket players are drawn from a shared pool of `num_players`, and every bracket
+    player is registered in the bracket's tournament. Brackets cycle through `formats`,
+    and each has about `completed_fraction` of its rounds played with random scores. Rows
+    are written with executemany INSERTs in batches, and the derived round state,
+    standings and player search index are rebuilt once at the end.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    players = BatchInserter(Player.__table__, batch_size)
+    first_player_id = _next_id(Player)
+    for i in range(num_players):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        players.add({
+            "id": first_player_id + i,
+            "name": name,
+            "gender": "Male" if i % 2 == 0 else "Female",
+            "phone_number": f"555-{rng.randrange(10000000):07}"
+        })
+    players.flush()
+    player_ids = list(range(first_player_id, first_player_id + num_players))
+    print(f"Added {num_players} players.")
+
+    bracket_size = min(bracket_size, num_players)
+    tournaments = BatchInserter(Tournament.__table__, batch_size)
+    brackets = BatchInserter(Bracket.__table__, batch_size)
+    tournament_players = BatchInserter(TournamentPlayer.__table__, batch_size)
+    bracket_players = BatchInserter(BracketPlayer.__table__, batch_size)
+    matchups = BatchInserter(Matchup.__table__, batch_size)
+
+    next_tournament_id = _next_id(Tournament)
+    next_bracket_id = _next_id(Bracket)
+    next_matchup_id = _next_id(Matchup)
+    start_date = date.today() - timedelta(days=num_tournaments * 7)
+
+    for t in range(num_tournaments):
+        tournament_id = next_tournament_id + t
+        tournament_format = formats[t % len(formats)]
+        tournaments.add({
+            "id": tournament_id,
+            "name": f"Tournament {tournament_id}",
+            "start_date": start_date + timedelta(days=t * 7),
+            "end_date": start_date + timedelta(days=t * 7 + 2),
+            "format": tournament_format,
+            "status": rng.choice(["PLANNING", "IN_PROGRESS", "IN_PROGRESS", "COMPLETED"]),
+            "version": 1
+        })
+
+        registered = set()
+        for b in range(brackets_per_tournament):
+            bracket_id = next_bracket_id
+            next_bracket_id += 1
+            bracket_format = formats[(t + b) % len(formats)]
+            entrants = rng.sample(player_ids, bracket_size)
+            registered.update(entrants)
+
+            for player_id in entrants:
+                bracket_players.add({"bracket_id": bracket_id, "player_id": player_id})
+
+            if bracket_format == "ROUND_ROBIN":
+                num_rounds = bracket_size - 1 + bracket_size % 2
+                completed_rounds = math.floor(num_rounds * completed_fraction)
+                rows = round_robin_rows(bracket_id, entrants, completed_rounds, next_matchup_id, rng)
+            else:
+                schedule = elimination_schedule(entrants, double=bracket_format == "DOUBLE_ELIMINATION")
+                num_rounds = max((entry["round"] for entry in schedule), default=0)
+                completed_rounds = math.floor(num_rounds * completed_fraction)
+                rows = elimination_rows(bracket_id, schedule, completed_rounds, next_matchup_id, rng)
+
+            for row in rows:
+                matchups.add(row)
+            next_matchup_id += len(rows)
+
+            brackets.add({
+                "id": bracket_id,
+                "tournament_id": tournament_id,
+                "name": f"Bracket {b + 1}",
+                "version": 1,
+                "format": bracket_format,
+                "num_rounds": num_rounds
+            })
+
+        for player_id in sorted(registered):
+            tournament_players.add({"tournament_id": tournament_id, "player_id": player_id})
+
+    # Parents first, so foreign keys hold on databases that enforce them
+    for inserter in (tournaments, brackets, tournament_players, bracket_players, matchups):
+        inserter.flush()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Added {tournaments.inserted} tournaments, {brackets.inserted} brackets, "
+        f"{tournament_players.inserted} registrations and {matchups.inserted} matchups "
+        f"in {elapsed:.1f}s ({matchups.inserted / elapsed if elapsed else 0:.0f} matchups/sec)."
+    )
 
-def populate_players():
     session = SessionLocal()
-    names = [
-        "Danielle Neal",
-        "Kane Vincent",
-        "Allyson Watkins",
-        "Nash Franco",
-        "Charleigh Ferguson",
-        "Miguel Franco",
-        "Charleigh Reid",
-        "Josue Chung",
-        "Rivka Wiley",
-        "Mathew Cisneros",
-        "Janelle Hardin",
-        "Hassan Russell",
-        "Raelynn Hodges",
-        "Alonzo Hester",
-        "Zendaya Shaffer",
-        "Dexter Correa",
-        "Valery Holloway",
-        "Sutton Dejesus",
-        "Julissa Waller",
-        "Marley Armstrong",
-        "Presley Clark",
-        "John Dunn",
-        "Olive Hancock",
-        "Rex Tanner",
-        "Harmoni Mahoney",
-        "Kamryn Mejia",
-        "Saylor Gill",
-        "Matthias Cain"
-    ]
     try:
-        players = [
-            Player(name=name, gender="Male" if i % 2 == 0 else "Female", phone_number=f"555-00{i+1:02}")
-            for i, name in enumerate(names)
-        ]
-        session.bulk_save_objects(players)
+        rebuild_round_state(session)
+        rebuild_standings(session)
+        rebuild_search_index(session)
         session.commit()
-        print("28 players added successfully.")
+        print("Rebuilt round state, standings and the player search index.")
     except Exception as e:
         session.rollback()
-        print(f"Failed to add players: {e}")
+        print(f"Failed to rebuild round state, standings and the player search index: {e}")
     finally:
         session.close()
 
 if __name__ == "__main__":
-    populate_players()
+    populate(
+        num_players=int(os.getenv("POPULATE_PLAYERS", 500)),
+        num_tournaments=int(os.getenv("POPULATE_TOURNAMENTS", 10)),
+        brackets_per_tournament=int(os.getenv("POPULATE_BRACKETS", 4)),
+        bracket_size=int(os.getenv("POPULATE_BRACKET_SIZE", 16)),
+        completed_fraction=float(os.getenv("POPULATE_COMPLETED", 0.5)),
+        formats=tuple(os.getenv("POPULATE_FORMATS", ",".join(FORMATS)).split(",")),
+        seed=int(os.getenv("POPULATE_SEED", 42)),
+        batch_size=int(os.getenv("POPULATE_BATCH_SIZE", BATCH_SIZE))
+    )
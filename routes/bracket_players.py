@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from apiflask import APIBlueprint
 from models import BracketPlayer
+from scheduling.standings import add_standings, remove_standings
+from db import db
+from versioning import bump_bracket_version
 
 bracket_players_bp = APIBlueprint("bracket_players", __name__)
 
@@ -16,10 +19,12 @@ def add_bracket_player():
     bracket_player = BracketPlayer(bracket_id=bracket_id, player_id=player_id)
 
     try:
-        request.db.add(bracket_player) # pyright: ignore[reportAttributeAccessIssue]
-        request.db.commit() # pyright: ignore[reportAttributeAccessIssue]
+        db.add(bracket_player)
+        add_standings(db, bracket_id, [player_id])
+        bump_bracket_version(bracket_id)
+        db.commit()
     except Exception as e:
-        request.db.rollback() # pyright: ignore[reportAttributeAccessIssue]
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({
@@ -30,16 +35,18 @@ def add_bracket_player():
 
 @bracket_players_bp.route("/bracket_players/<int:bracket_player_id>", methods=["DELETE"])
 def delete_bracket_player(bracket_player_id):
-    bracket_player = request.db.query(BracketPlayer).filter(BracketPlayer.id == bracket_player_id).first() # pyright: ignore[reportAttributeAccessIssue]
+    bracket_player = db.query(BracketPlayer).filter(BracketPlayer.id == bracket_player_id).first()
 
     if not bracket_player:
         return jsonify({"error": "BracketPlayer not found"}), 404
 
     try:
-        request.db.delete(bracket_player) # pyright: ignore[reportAttributeAccessIssue]
-        request.db.commit() # pyright: ignore[reportAttributeAccessIssue]
+        db.delete(bracket_player)
+        remove_standings(db, bracket_player.bracket_id, [bracket_player.player_id])
+        bump_bracket_version(bracket_player.bracket_id)
+        db.commit()
     except Exception as e:
-        request.db.rollback() # pyright: ignore[reportAttributeAccessIssue]
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({"message": "Removed player from bracket successfully"})
@@ -1,25 +1,21 @@
-from flask import jsonify, request, g
+from flask import jsonify, request
+from sqlalchemy import insert, select
 from apiflask import APIBlueprint
-from models import Bracket, SessionLocal, Player, BracketPlayer
+from models import Bracket, Player, BracketPlayer, BracketStanding
+from scheduling.standings import add_standings
+from db import db
+from async_db import async_alternative, run_steps, run_steps_async
+from pagination import PageQuery, list_response
+from cache import bracket_tag, cached, tournament_tag
+from serialization import BRACKET, BRACKET_SUMMARY, PLAYER, STANDING, FieldsQuery
+from versioning import bracket_version, bump_bracket_version, bump_tournament_version, is_not_modified, make_etag, not_modified_response, tournament_version, with_etag
 
 brackets_bp = APIBlueprint("brackets", __name__)
 
-@brackets_bp.before_request
-def create_session():
-    g.db = SessionLocal()
-
-@brackets_bp.teardown_request
-def close_session(exception=None):
-    g.db.close()
-
 @brackets_bp.route("/brackets", methods=["GET"])
-def get_brackets():
-    brackets = g.db.query(Bracket).all()
-    return jsonify([{
-        "id": bracket.id,
-        "tournament_id": bracket.tournament_id,
-        "name": bracket.name
-    } for bracket in brackets])
+@brackets_bp.input(PageQuery, location="query")
+def get_brackets(query_data):
+    return list_response(BRACKET, Bracket.id, query_data)
 
 @brackets_bp.route("/brackets", methods=["POST"])
 def create_bracket():
@@ -33,47 +29,94 @@ def create_bracket():
     bracket = Bracket(tournament_id=tournament_id, name=name)
 
     try:
-        g.db.add(bracket)
-        g.db.commit()
+        db.add(bracket)
+        bump_tournament_version(tournament_id)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({
-        "id": bracket.id,
-        "tournament_id": bracket.tournament_id,
-        "name": bracket.name
-    }), 201
+    return jsonify(BRACKET.dump(bracket)), 201
 
 @brackets_bp.route("/brackets/<int:bracket_id>/players", methods=["GET"])
-def get_bracket_players(bracket_id):
-    bracket = g.db.query(Bracket).filter(Bracket.id == bracket_id).first()
+@brackets_bp.input(FieldsQuery, location="query")
+@cached(lambda bracket_id, query_data: [bracket_tag(bracket_id)])
+def get_bracket_players(bracket_id, query_data):
+    try:
+        player_type = PLAYER.only(query_data.fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if not bracket:
+    version = bracket_version(bracket_id)
+
+    if version is None:
         return jsonify({"error": "Bracket not found"}), 404
 
-    players = [
-        {
-            "id": bp.player.id,
-            "name": bp.player.name,
-            "gender": bp.player.gender,
-            "phone_number": bp.player.phone_number
-        }
-        for bp in bracket.bracket_players
+    etag = make_etag("bracket", bracket_id, version, "players", *([query_data.fields] if query_data.fields is not None else []))
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    players = db.execute(
+        player_type.select().join(BracketPlayer, BracketPlayer.player_id == Player.id).where(
+            BracketPlayer.bracket_id == bracket_id
+        ).order_by(BracketPlayer.id)
+    )
+
+    return with_etag(jsonify(player_type.encode_all(players)), etag)
+
+def bracket_standings_statement(bracket_id):
+    # Read in ix_bracket_standing_rank order; the matchup table is never touched. Full ties
+    # fall back to player_id, descending like the rest so one backward index scan serves it all
+    return select(*STANDING.columns(), Player.name).join(Player, Player.id == BracketStanding.player_id).where(
+        BracketStanding.bracket_id == bracket_id
+    ).order_by(
+        BracketStanding.wins.desc(),
+        BracketStanding.set_difference.desc(),
+        BracketStanding.game_difference.desc(),
+        BracketStanding.player_id.desc()
+    )
+
+def serialize_standings(standings):
+    encode = STANDING.encode
+    return [
+        {**encode(row), "rank": rank, "name": row.name}
+        for rank, row in enumerate(standings, start=1)
     ]
 
-    return jsonify(players)
+def bracket_standings_steps(bracket_id):
+    version = yield select(Bracket.version).where(Bracket.id == bracket_id), "scalar"
+
+    if version is None:
+        return jsonify({"error": "Bracket not found"}), 404
+
+    etag = make_etag("bracket", bracket_id, version, "standings")
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    standings = yield bracket_standings_statement(bracket_id), "all"
+    return with_etag(jsonify(serialize_standings(standings)), etag)
+
+async def get_bracket_standings_async(bracket_id):
+    return await run_steps_async(bracket_standings_steps(bracket_id))
+
+@brackets_bp.route("/brackets/<int:bracket_id>/standings", methods=["GET"])
+@cached(lambda bracket_id: [bracket_tag(bracket_id)])
+@async_alternative(get_bracket_standings_async)
+def get_bracket_standings(bracket_id):
+    return run_steps(bracket_standings_steps(bracket_id))
 
 @brackets_bp.route("/tournaments/<int:tournament_id>/brackets", methods=["GET"])
+@cached(lambda tournament_id: [tournament_tag(tournament_id)])
 def get_brackets_by_tournament(tournament_id):
-    brackets = g.db.query(Bracket).filter(Bracket.tournament_id == tournament_id).all()
-    return jsonify([
-        {
-            "id": bracket.id,
-            "name": bracket.name
-        }
-        for bracket in brackets
-    ])
+    etag = make_etag("tournament", tournament_id, tournament_version(tournament_id), "brackets")
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    brackets = db.execute(BRACKET_SUMMARY.select().where(Bracket.tournament_id == tournament_id))
+    return with_etag(jsonify(BRACKET_SUMMARY.encode_all(brackets)), etag)
 
 @brackets_bp.route("/brackets/<int:bracket_id>/players", methods=["POST"])
 def add_player_to_bracket(bracket_id):
@@ -83,18 +126,18 @@ def add_player_to_bracket(bracket_id):
     if not player_id:
         return jsonify({"error": "player_id is required"}), 400
 
-    bracket = g.db.query(Bracket).filter(Bracket.id == bracket_id).first()
+    bracket = db.query(Bracket).filter(Bracket.id == bracket_id).first()
 
     if not bracket:
         return jsonify({"error": "Bracket not found"}), 404
 
-    player = g.db.query(Player).filter(Player.id == player_id).first()
+    player = db.query(Player).filter(Player.id == player_id).first()
 
     if not player:
         return jsonify({"error": "Player not found"}), 404
 
     # Check if the player is already in the bracket
-    existing_entry = g.db.query(BracketPlayer).filter(
+    existing_entry = db.query(BracketPlayer).filter(
         BracketPlayer.bracket_id == bracket_id,
         BracketPlayer.player_id == player_id
     ).first()
@@ -106,10 +149,66 @@ def add_player_to_bracket(bracket_id):
     bracket_player = BracketPlayer(bracket_id=bracket_id, player_id=player_id)
 
     try:
-        g.db.add(bracket_player)
-        g.db.commit()
+        db.add(bracket_player)
+        add_standings(db, bracket_id, [player_id])
+        bump_bracket_version(bracket_id)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({"message": "Player added to bracket successfully"}), 201
+
+@brackets_bp.route("/brackets/<int:bracket_id>/players/bulk", methods=["POST"])
+def add_players_to_bracket(bracket_id):
+    data = request.get_json()
+    player_ids = data.get("player_ids")
+
+    if not isinstance(player_ids, list) or not player_ids:
+        return jsonify({"error": "player_ids must be a non-empty list"}), 400
+
+    if bracket_version(bracket_id) is None:
+        return jsonify({"error": "Bracket not found"}), 404
+
+    # Split by exact type: True and 1.0 compare equal to 1, so they must never be matched against ids
+    accepted, invalid = [], []
+    for player_id in player_ids:
+        (accepted if type(player_id) is int else invalid).append(player_id)
+    requested = list(dict.fromkeys(accepted))
+    repeated = len(accepted) - len(requested)
+
+    try:
+        # Lock the bracket first so a concurrent add can't slip in between the duplicate check and the insert
+        bump_bracket_version(bracket_id)
+
+        existing_players = set(db.execute(select(Player.id).where(Player.id.in_(requested))).scalars())
+        already_added = set(db.execute(
+            select(BracketPlayer.player_id).where(
+                BracketPlayer.bracket_id == bracket_id,
+                BracketPlayer.player_id.in_(requested)
+            )
+        ).scalars())
+
+        invalid.extend(player_id for player_id in requested if player_id not in existing_players)
+        skipped = [player_id for player_id in requested if player_id in already_added]
+        added = [player_id for player_id in requested if player_id in existing_players and player_id not in already_added]
+
+        # Multi-row INSERTs (and their empty standings), chunked to stay under SQLite's bound parameter limit
+        for start in range(0, len(added), 500):
+            chunk = added[start:start + 500]
+            db.execute(insert(BracketPlayer.__table__).values([
+                {"bracket_id": bracket_id, "player_id": player_id} for player_id in chunk
+            ]))
+            add_standings(db, bracket_id, chunk)
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "added": added,
+        "skipped": skipped,
+        "invalid": invalid,
+        "duplicates_in_request": repeated
+    }), 201 if added else 200
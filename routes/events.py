@@ -0,0 +1,91 @@
+import os
+import queue
+
+from flask import Response, jsonify, request
+from apiflask import APIBlueprint
+from models import Bracket, Tournament
+from db import db
+from cache import bracket_tag, tournament_tag
+from events import hub
+
+events_bp = APIBlueprint("events", __name__)
+
+HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+RETRY_MILLISECONDS = int(os.getenv("SSE_RETRY_MILLISECONDS", 3000))
+
+def format_event(event_id, kind, payload):
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n"
+
+def last_event_id():
+    """The id a reconnecting client last saw, from the Last-Event-ID header or ?last_event_id=."""
+    value = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+def event_stream(channel, resume_from):
+    """Subscribe to a channel and stream its events as text/event-stream.
+
+    The generator only waits on the subscriber's queue and never touches the database,
+    so an open stream costs a queue and a waiting thread, not a connection. That
+    thread is a server worker held for the whole connection, so once SSE_MAX_SUBSCRIBERS
+    streams are open further clients get a 503 and retry rather than starve the other
+    endpoints. A stream whose client fell behind, or that resumes from an id no longer
+    in history, is sent a "refresh" event telling the client to refetch before
+    listening again.
+    """
+    subscription = hub.subscribe(channel, resume_from)
+
+    if subscription is None:
+        response = jsonify({"error": "Too many open event streams"})
+        response.headers["Retry-After"] = str(max(1, RETRY_MILLISECONDS // 1000))
+        return response, 503
+
+    subscriber, backlog, missed = subscription
+
+    def generate():
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+
+        if missed:
+            yield format_event(subscriber.start_id, "refresh", '{"reason":"missed"}')
+        for entry in backlog:
+            yield format_event(*entry)
+
+        while True:
+            if subscriber.dropped_at is not None and subscriber.queue.empty():
+                yield format_event(subscriber.dropped_at, "refresh", '{"reason":"overflow"}')
+                return
+
+            try:
+                entry = subscriber.queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                # A comment line keeps proxies from closing an idle stream
+                yield ": heartbeat\n\n"
+                continue
+
+            yield format_event(*entry)
+
+    response = Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    # The server closes every response, including a HEAD or a stream the client left
+    # before its first read, neither of which ever runs the generator
+    response.call_on_close(lambda: hub.unsubscribe(subscriber))
+    return response
+
+@events_bp.route("/brackets/<int:bracket_id>/events", methods=["GET"])
+def stream_bracket_events(bracket_id):
+    if db.query(Bracket.id).filter(Bracket.id == bracket_id).scalar() is None:
+        return jsonify({"error": "Bracket not found"}), 404
+
+    # The request's session is closed when this returns; the stream itself holds no connection
+    return event_stream(bracket_tag(bracket_id), last_event_id())
+
+@events_bp.route("/tournaments/<int:tournament_id>/events", methods=["GET"])
+def stream_tournament_events(tournament_id):
+    if db.query(Tournament.id).filter(Tournament.id == tournament_id).scalar() is None:
+        return jsonify({"error": "Tournament not found"}), 404
+
+    return event_stream(tournament_tag(tournament_id), last_event_id())
@@ -1,109 +1,166 @@
+import os
 from typing import Optional
-from flask import jsonify, request, g
+from flask import current_app, jsonify, request
 from apiflask import APIBlueprint
-from pydantic import BaseModel, Field
-from models import Matchup, SessionLocal, Bracket
+from pydantic import Field
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import aliased
+from models import Matchup, Bracket, BracketPlayer, Player
+from scheduling.round_robin import round_robin_schedule
+from scheduling.swiss import default_num_rounds, pair_swiss_round
+from scheduling.elimination import elimination_schedule
+from scheduling.rounds import adjust_open_counts, advance_round, change_status, is_round_closed, rebuild_round_state
+from scheduling.standings import apply_results, matchup_result, rebuild_standings
+from scheduling.store import RESULT_COLUMNS, link_elimination_matchups, place_in_slot, place_in_slots, replace_bracket_matchups, write_matchup_results
+from db import db
+from async_db import async_alternative, run_steps, run_steps_async
+from pagination import PageQuery, list_response
+from cache import bracket_tag, cached
+from events import bracket_channels, publish_on_commit
+from serialization import BRACKET_MATCHUP, BRACKET_MATCHUP_REFERENCES, MATCHUP, MATCHUP_PLAYER_SLOTS, MATCHUP_SUMMARY, PLAYER, FieldsQuery
+from versioning import bump_bracket_version, is_not_modified, make_etag, not_modified_response, with_etag
 
 matchups_bp = APIBlueprint("matchups", __name__)
 
-@matchups_bp.before_request
-def create_session():
-    g.db = SessionLocal()
+def publish_matchup(data, tournament_id):
+    publish_on_commit(db, bracket_channels(data["bracket_id"], tournament_id), "matchup", data)
 
-@matchups_bp.teardown_request
-def close_session(exception=None):
-    g.db.close()
+def publish_refresh(bracket_id, tournament_id, reason):
+    """Tell a bracket's subscribers that more changed than a single matchup, so they refetch."""
+    publish_on_commit(db, bracket_channels(bracket_id, tournament_id), "refresh", {"bracket_id": bracket_id, "reason": reason})
 
 @matchups_bp.route("/matchups", methods=["GET"])
-def get_matchups():
-    matchups = g.db.query(Matchup).all()
-    return jsonify([{
-        "id": matchup.id,
-        "status": matchup.status,
-        "score": matchup.score
-    } for matchup in matchups])
-
-class MatchupSearchQuery(BaseModel):
+@matchups_bp.input(PageQuery, location="query")
+def get_matchups(query_data):
+    return list_response(MATCHUP_SUMMARY, Matchup.id, query_data)
+
+class MatchupSearchQuery(FieldsQuery):
     PENDING: Optional[bool] = Field(default=False, description="Filter for pending matchups")
     PLANNING: Optional[bool] = Field(default=True, description="Filter for planning matchups")
     COMPLETED: Optional[bool] = Field(default=True, description="Filter for completed matchups")
     ALL: Optional[bool] = Field(default=False, description="Return all matchups")
-
-
-@matchups_bp.route("/brackets/<int:bracket_id>/matchups", methods=["GET"])
-@matchups_bp.input(MatchupSearchQuery, location="query")
-def get_matchups_by_bracket(bracket_id, query_data):
-    show_pending = query_data.PENDING
-    show_planning = query_data.PLANNING
-    show_completed = query_data.COMPLETED
-    show_all = query_data.ALL
-
-    query = g.db.query(Matchup).filter(Matchup.bracket_id == bracket_id)
-
-    if not show_all:
+    player_fields: Optional[str] = Field(default=None, description="Comma-separated player fields to return; id is always included")
+    normalized: Optional[bool] = Field(default=False, description="Refer to players by id and list each player once under players")
+
+
+def bracket_matchup_types(query_data):
+    """The (matchup, player) row types for a request's fields, raising ValueError for unknown ones.
+
+    Player slots are named the same way in both shapes, e.g. fields=score,player1,
+    and stand for player1_id when the response is normalized.
+    """
+    player_type = PLAYER.only(query_data.player_fields)
+
+    if not query_data.normalized:
+        return BRACKET_MATCHUP.only(query_data.fields, query_data.player_fields), player_type
+
+    fields = query_data.fields
+    if fields is not None:
+        fields = ",".join(
+            f"{field}_id" if field in MATCHUP_PLAYER_SLOTS else field
+            for field in (field.strip() for field in fields.split(","))
+        )
+    return BRACKET_MATCHUP_REFERENCES.only(fields), player_type
+
+def bracket_matchups_statement(bracket_id, query_data, matchup_type):
+    """The SELECT behind GET /brackets/<id>/matchups, shared by the sync and async views."""
+    # Each embedded player's columns come in the same row as the matchup's, one outer join per slot
+    players = {slot: aliased(Player) for slot, _ in matchup_type.nested}
+    statement = select(*matchup_type.columns(nested_entities=players))
+    for slot, player in players.items():
+        statement = statement.outerjoin(player, player.id == getattr(Matchup, f"{slot}_id"))
+    statement = statement.where(Matchup.bracket_id == bracket_id)
+
+    if not query_data.ALL:
         status_filters = []
 
-        if show_pending:
+        if query_data.PENDING:
             status_filters.append("PENDING")
-        if show_planning:
+        if query_data.PLANNING:
             status_filters.append("PLANNING")
-        if show_completed:
+        if query_data.COMPLETED:
             status_filters.append("COMPLETED")
 
-        smallest_round = g.db.query(Matchup.round).filter(Matchup.bracket_id == bracket_id).filter(Matchup.status == "PLANNING").order_by(Matchup.round.asc()).first()
-        print(smallest_round)
-        
-        if smallest_round:
-            query = query.filter(Matchup.round == smallest_round[0])
+        # Smallest PLANNING round, inlined as a subquery so it runs with the main query
+        planning = aliased(Matchup)
+        smallest_round = select(func.min(planning.round)).where(
+            planning.bracket_id == bracket_id,
+            planning.status == "PLANNING"
+        ).scalar_subquery()
+
+        statement = statement.where(or_(smallest_round.is_(None), Matchup.round == smallest_round))
 
         if status_filters:
-            query = query.filter(Matchup.status.in_(status_filters))
+            statement = statement.where(Matchup.status.in_(status_filters))
+
+    return statement.order_by(Matchup.id)
+
+def referenced_players_statement(matchup_type, player_type, matchups):
+    """The SELECT for the normalized response's players table, or None if no player is referenced."""
+    slot_fields = {f"{slot}_id" for slot in MATCHUP_PLAYER_SLOTS}
+    positions = [index for index, field in enumerate(matchup_type.fields) if field in slot_fields]
+    player_ids = {matchup[index] for matchup in matchups for index in positions} - {None}
+
+    if not player_ids:
+        return None
+    return player_type.select().where(Player.id.in_(player_ids)).order_by(Player.id)
+
+def bracket_matchups_body(matchup_type, player_type, matchups, players):
+    if players is None:
+        return matchup_type.encode_all(matchups)
+    return {"matchups": matchup_type.encode_all(matchups), "players": player_type.encode_all(players)}
 
-    matchups = query.all()
+def bracket_matchups_etag(bracket_id, version, query_data):
+    flags = "".join(
+        "1" if flag else "0"
+        for flag in (query_data.PENDING, query_data.PLANNING, query_data.COMPLETED, query_data.ALL)
+    )
+    parts = ["bracket", bracket_id, version, "matchups", flags]
+
+    # Other response shapes get tags of their own; the full one keeps the tags clients already hold
+    if query_data.normalized or query_data.fields is not None or query_data.player_fields is not None:
+        parts.append("normalized" if query_data.normalized else "embedded")
+        parts.extend("*" if fields is None else fields for fields in (query_data.fields, query_data.player_fields))
+    return make_etag(*parts)
+
+def bracket_matchups_steps(bracket_id, query_data):
+    try:
+        matchup_type, player_type = bracket_matchup_types(query_data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Answer unchanged polls from the bracket's version alone, before touching the matchups
+    version = yield select(Bracket.version).where(Bracket.id == bracket_id), "scalar"
+
+    if version is None:
+        return jsonify({"error": "No matchups found for the given bracket"}), 404
+
+    etag = bracket_matchups_etag(bracket_id, version, query_data)
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    matchups = yield bracket_matchups_statement(bracket_id, query_data, matchup_type), "all"
 
     if not matchups:
         return jsonify({"error": "No matchups found for the given bracket"}), 404
 
-    return jsonify([
-        {
-            "id": matchup.id,
-            "bracket_id": matchup.bracket_id,
-            "player1": {
-                "id": matchup.player1.id,
-                "name": matchup.player1.name,
-                "gender": matchup.player1.gender,
-                "phone_number": matchup.player1.phone_number
-            } if matchup.player1 else None,
-            "player2": {
-                "id": matchup.player2.id,
-                "name": matchup.player2.name,
-                "gender": matchup.player2.gender,
-                "phone_number": matchup.player2.phone_number
-            } if matchup.player2 else None,
-            "player1_partner": {
-                "id": matchup.player1_partner.id,
-                "name": matchup.player1_partner.name,
-                "gender": matchup.player1_partner.gender,
-                "phone_number": matchup.player1_partner.phone_number
-            } if matchup.player1_partner else None,
-            "player2_partner": {
-                "id": matchup.player2_partner.id,
-                "name": matchup.player2_partner.name,
-                "gender": matchup.player2_partner.gender,
-                "phone_number": matchup.player2_partner.phone_number
-            } if matchup.player2_partner else None,
-            "winner": {
-                "id": matchup.winner.id,
-                "name": matchup.winner.name,
-                "gender": matchup.winner.gender,
-                "phone_number": matchup.winner.phone_number
-            } if matchup.winner else None,
-            "score": matchup.score,
-            "status": matchup.status,
-            "round": matchup.round
-        }
-        for matchup in matchups
-    ])
+    players = None
+    if query_data.normalized:
+        statement = referenced_players_statement(matchup_type, player_type, matchups)
+        players = (yield statement, "all") if statement is not None else []
+
+    return with_etag(jsonify(bracket_matchups_body(matchup_type, player_type, matchups, players)), etag)
+
+async def get_matchups_by_bracket_async(bracket_id, query_data):
+    return await run_steps_async(bracket_matchups_steps(bracket_id, query_data))
+
+@matchups_bp.route("/brackets/<int:bracket_id>/matchups", methods=["GET"])
+@matchups_bp.input(MatchupSearchQuery, location="query")
+@cached(lambda bracket_id, query_data: [bracket_tag(bracket_id)])
+@async_alternative(get_matchups_by_bracket_async)
+def get_matchups_by_bracket(bracket_id, query_data):
+    return run_steps(bracket_matchups_steps(bracket_id, query_data))
 
 @matchups_bp.route("/matchups", methods=["POST"])
 def create_matchup():
@@ -131,24 +188,89 @@ def create_matchup():
         status=status
     )
 
+    tournament_id = db.query(Bracket.tournament_id).filter(Bracket.id == bracket_id).scalar()
+
     try:
-        g.db.add(matchup)
-        g.db.commit()
+        db.add(matchup)
+        bump_bracket_version(bracket_id)
+        apply_results(db, bracket_id, added=[matchup_result(matchup)])
+        db.flush()
+        publish_matchup(MATCHUP.dump(matchup), tournament_id)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({
-        "id": matchup.id,
-        "bracket_id": matchup.bracket_id,
-        "player1_id": matchup.player1_id,
-        "player2_id": matchup.player2_id,
-        "player1_partner_id": matchup.player1_partner_id,
-        "player2_partner_id": matchup.player2_partner_id,
-        "winner_id": matchup.winner_id,
-        "score": matchup.score,
-        "status": matchup.status
-    }), 201
+    return jsonify(MATCHUP.dump(matchup)), 201
+
+ELIMINATION_FORMATS = ("SINGLE_ELIMINATION", "DOUBLE_ELIMINATION")
+
+def swiss_round_rows(bracket_id, round_num, player_ids, results):
+    """Matchup rows for one Swiss round. A bye is stored as a completed matchup the player wins."""
+    pairs, bye_player_id, rematches = pair_swiss_round(player_ids, results)
+    if rematches:
+        # Only when no pairing of the field avoids them, e.g. more rounds than a round robin has
+        current_app.logger.warning(
+            "Swiss round %s of bracket %s repeats %d pairing(s): %s", round_num, bracket_id, len(rematches), rematches
+        )
+    rows = [
+        {
+            "bracket_id": bracket_id,
+            "player1_id": player1_id,
+            "player2_id": player2_id,
+            "winner_id": None,
+            "round": round_num,
+            "status": "PLANNING"
+        }
+        for player1_id, player2_id in pairs
+    ]
+
+    if bye_player_id is not None:
+        rows.append({
+            "bracket_id": bracket_id,
+            "player1_id": bye_player_id,
+            "player2_id": None,
+            "winner_id": bye_player_id,
+            "round": round_num,
+            "status": "COMPLETED"
+        })
+
+    return rows
+
+def append_next_swiss_round(bracket, completed_round):
+    """Pair and insert the round after `completed_round` if it is the latest round and more remain."""
+    if completed_round is None or completed_round >= (bracket.num_rounds or 0):
+        return
+
+    latest_round = db.query(func.max(Matchup.round)).filter(Matchup.bracket_id == bracket.id).scalar()
+
+    if latest_round != completed_round:
+        return
+
+    player_ids = [
+        player_id for (player_id,) in
+        db.query(BracketPlayer.player_id).filter(BracketPlayer.bracket_id == bracket.id).order_by(BracketPlayer.id)
+    ]
+    results = db.query(Matchup.player1_id, Matchup.player2_id, Matchup.winner_id).filter(
+        Matchup.bracket_id == bracket.id
+    ).all()
+
+    rows = swiss_round_rows(bracket.id, completed_round + 1, player_ids, results)
+    db.execute(insert(Matchup.__table__), rows)
+    rebuild_round_state(db, bracket.id)
+    # The bye, if any, is recorded as a completed win straight away
+    apply_results(db, bracket.id, added=[
+        (row["player1_id"], row["player2_id"], row["winner_id"], None, row["status"]) for row in rows
+    ])
+
+def advance_elimination(matchup):
+    """Place a completed elimination matchup's winner and loser into the matchups they feed."""
+    loser_id = matchup.player2_id if matchup.winner_id == matchup.player1_id else matchup.player1_id
+
+    if matchup.winner_next_matchup_id:
+        place_in_slot(db, matchup.winner_next_matchup_id, matchup.winner_next_slot, matchup.winner_id)
+    if matchup.loser_next_matchup_id and loser_id:
+        place_in_slot(db, matchup.loser_next_matchup_id, matchup.loser_next_slot, loser_id)
 
 @matchups_bp.route("/matchups/generate", methods=["POST"])
 def generate_matchups():
@@ -160,72 +282,77 @@ def generate_matchups():
         return jsonify({"error": "bracket_id and format are required"}), 400
 
     # Fetch players in the bracket
-    bracket = g.db.query(Bracket).filter(Bracket.id == bracket_id).first()
+    bracket = db.query(Bracket).filter(Bracket.id == bracket_id).first()
 
     if not bracket:
         return jsonify({"error": "Bracket not found"}), 404
 
-    players = [bp.player for bp in bracket.bracket_players]
+    player_ids = [
+        player_id for (player_id,) in
+        db.query(BracketPlayer.player_id).filter(BracketPlayer.bracket_id == bracket_id).order_by(BracketPlayer.id)
+    ]
 
-    if not players:
+    if not player_ids:
         return jsonify({"error": "No players found in the bracket"}), 404
 
-    # Delete existing matchups for the bracket
-    try:
-        g.db.query(Matchup).filter(Matchup.bracket_id == bracket_id).delete()
-        g.db.commit()
-    except Exception as e:
-        g.db.rollback()
-        return jsonify({"error": f"Failed to delete existing matchups: {e}"}), 500
-
-    matchups = []
-
     if format == "ROUND_ROBIN":
-        num_players = len(players)
-        if num_players % 2 != 0:
-            players.append(None)  # Add a dummy player for odd number of players
-
-        num_rounds = len(players) - 1
-        for round_num in range(num_rounds):
-            round_matches = []
-            for i in range(len(players) // 2):
-                player1 = players[i]
-                player2 = players[-(i + 1)]
-
-                if player1 and player2:  # Skip matches with the dummy player
-                    round_matches.append(
-                        Matchup(
-                            bracket_id=bracket_id,
-                            player1_id=player1.id,
-                            player2_id=player2.id,
-                            round=round_num + 1,
-                            status="PENDING"
-                        )
-                    )
-
-            # Rotate players for the next round
-            players = [players[0], players[-1], *players[1:-1]]
-            matchups.extend(round_matches)
+        schedule = round_robin_schedule(player_ids, double=bool(data.get("double_round_robin", False)))
+        rows = [
+            {
+                "bracket_id": bracket_id,
+                "player1_id": home_id,
+                "player2_id": away_id,
+                "round": round_num,
+                "status": "PENDING"
+            }
+            for round_num, home_id, away_id in schedule
+        ]
+        num_rounds = max((row["round"] for row in rows), default=0)
     elif format == "SWISS":
-        # Placeholder for SWISS format logic
-        return jsonify({"error": "SWISS format not implemented yet"}), 501
+        # Only the first round is generated now; update_matchup pairs each later round as the previous one completes
+        num_rounds = data.get("rounds") or default_num_rounds(len(player_ids))
+        rows = swiss_round_rows(bracket_id, 1, player_ids, [])
+    elif format in ELIMINATION_FORMATS:
+        # Bracket players are seeded in the order they were added
+        schedule = elimination_schedule(player_ids, double=format == "DOUBLE_ELIMINATION")
+        rows = [
+            {
+                "bracket_id": bracket_id,
+                "player1_id": entry["player1_id"],
+                "player2_id": entry["player2_id"],
+                "round": entry["round"],
+                "status": "PLANNING" if entry["player1_id"] and entry["player2_id"] else "PENDING"
+            }
+            for entry in schedule
+        ]
+        num_rounds = max((row["round"] for row in rows), default=0)
     else:
         return jsonify({"error": "Invalid format"}), 400
 
+    # Replace the bracket's matchups in a single transaction so a failed insert keeps the old ones
     try:
-        g.db.bulk_save_objects(matchups)
-        g.db.commit()
+        matchups = replace_bracket_matchups(db, bracket_id, rows)
+        if format in ELIMINATION_FORMATS:
+            link_elimination_matchups(db, schedule, matchups)
+        rebuild_round_state(db, bracket_id)
+        rebuild_standings(db, bracket_id)
+        bracket.format = format
+        bracket.num_rounds = num_rounds
+        bump_bracket_version(bracket_id)
+        publish_refresh(bracket_id, bracket.tournament_id, "generated")
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify([
         {
-            "id": matchup.id,
-            "bracket_id": matchup.bracket_id,
-            "player1_id": matchup.player1_id,
-            "player2_id": matchup.player2_id,
-            "status": matchup.status
+            "id": matchup["id"],
+            "bracket_id": matchup["bracket_id"],
+            "player1_id": matchup["player1_id"],
+            "player2_id": matchup["player2_id"],
+            "round": matchup["round"],
+            "status": matchup["status"]
         }
         for matchup in matchups
     ]), 201
@@ -234,55 +361,216 @@ def generate_matchups():
 def update_matchup(matchup_id):
     data = request.get_json()
 
-    matchup = g.db.query(Matchup).filter(Matchup.id == matchup_id).first()
+    matchup = db.query(Matchup).filter(Matchup.id == matchup_id).first()
 
     if not matchup:
         return jsonify({"error": "Matchup not found"}), 404
 
-    # Update fields if provided in the request
-    matchup.player1_id = data.get("player1_id", matchup.player1_id)
-    matchup.player2_id = data.get("player2_id", matchup.player2_id)
-    matchup.player1_partner_id = data.get("player1_partner_id", matchup.player1_partner_id)
-    matchup.player2_partner_id = data.get("player2_partner_id", matchup.player2_partner_id)
-    matchup.winner_id = data.get("winner_id", matchup.winner_id)
-    matchup.score = data.get("score", matchup.score)
-    matchup.status = data.get("status", matchup.status)
+    bracket_format, tournament_id = db.query(Bracket.format, Bracket.tournament_id).filter(Bracket.id == matchup.bracket_id).one()
 
     try:
-        g.db.commit()
-
-        # Check if there are no other matchups in the same round in the PLANNING phase
-        same_round_planning = g.db.query(Matchup).filter(
-            Matchup.bracket_id == matchup.bracket_id,
-            Matchup.round == matchup.round,
-            Matchup.status == "PLANNING"
-        ).count()
+        # Bumping the version locks the bracket, so the result read back here is the one the standings hold
+        bump_bracket_version(matchup.bracket_id)
+        db.refresh(matchup)
+        previous_result = matchup_result(matchup)
+
+        # Update fields if provided in the request
+        matchup.player1_id = data.get("player1_id", matchup.player1_id)
+        matchup.player2_id = data.get("player2_id", matchup.player2_id)
+        matchup.player1_partner_id = data.get("player1_partner_id", matchup.player1_partner_id)
+        matchup.player2_partner_id = data.get("player2_partner_id", matchup.player2_partner_id)
+        matchup.winner_id = data.get("winner_id", matchup.winner_id)
+        matchup.score = data.get("score", matchup.score)
+        status = data.get("status", matchup.status)
+
+        apply_results(
+            db, matchup.bracket_id,
+            removed=[previous_result],
+            added=[(matchup.player1_id, matchup.player2_id, matchup.winner_id, matchup.score, status)]
+        )
+
+        publish_matchup({**MATCHUP.dump(matchup), "status": status}, tournament_id)
+
+        db.flush()
+
+        if bracket_format in ELIMINATION_FORMATS:
+            # Winner and loser move straight into their precomputed slots; no round scan needed
+            change_status(db, matchup.id, matchup.bracket_id, matchup.round, status)
+            if status == "COMPLETED" and matchup.winner_id:
+                advance_elimination(matchup)
+                publish_refresh(matchup.bracket_id, tournament_id, "advanced")
+            db.commit()
+            return jsonify(MATCHUP.dump(matchup)), 200
+
+        # The result and any round advancement commit together, decided from the round's PLANNING count
+        if change_status(db, matchup.id, matchup.bracket_id, matchup.round, status):
+            opened = advance_round(db, matchup.bracket_id, matchup.round)
+
+            if opened:
+                publish_refresh(matchup.bracket_id, tournament_id, "round_opened")
+            elif bracket_format == "SWISS" and is_round_closed(db, matchup.bracket_id, matchup.round):
+                bracket = db.query(Bracket).filter(Bracket.id == matchup.bracket_id).first()
+                append_next_swiss_round(bracket, matchup.round)
+                publish_refresh(matchup.bracket_id, tournament_id, "round_opened")
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return jsonify({"error": str(e)}), 500
 
-        if same_round_planning == 0:
-            # Update all matchups in the next round from PENDING to PLANNING
-            next_round_matchups = g.db.query(Matchup).filter(
-                Matchup.bracket_id == matchup.bracket_id,
-                Matchup.round == matchup.round + 1,
-                Matchup.status == "PENDING"
-            ).all()
+    return jsonify(MATCHUP.dump(matchup)), 200
+
+MATCHUP_STATUSES = ("PENDING", "PLANNING", "COMPLETED")
+BATCH_LIMIT = int(os.getenv("MATCHUP_BATCH_LIMIT", 1000))
+
+def serialize_result_row(row):
+    return {field: row[field] for field in MATCHUP.fields}
+
+def validate_result(item, current):
+    """Merge one batch item into its matchup's current row, returning (row, error)."""
+    row = dict(current)
+    for column in RESULT_COLUMNS:
+        if column in item:
+            row[column] = item[column]
+
+    if row["status"] not in MATCHUP_STATUSES:
+        return row, f"status must be one of {', '.join(MATCHUP_STATUSES)}"
+    if row["winner_id"] is not None and row["winner_id"] not in (row["player1_id"], row["player2_id"]):
+        return row, "winner_id must be one of the matchup's players"
+    if row["status"] == "COMPLETED" and row["winner_id"] is None:
+        return row, "a COMPLETED matchup needs a winner_id"
+    return row, None
+
+@matchups_bp.route("/matchups/batch", methods=["POST"])
+def update_matchups_batch():
+    """Apply many matchup results at once, all or nothing.
+
+    Every item is validated against the matchups as they stand once their brackets are
+    locked; if any item fails, nothing is written and each item's outcome is returned.
+    Otherwise all results go out as one executemany UPDATE, and standings, round counts
+    and advancement are worked out once per affected bracket and round.
+    """
+    data = request.get_json()
+    items = data.get("results") if isinstance(data, dict) else None
 
-            for next_matchup in next_round_matchups:
-                next_matchup.status = "PLANNING"
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "results must be a non-empty list"}), 400
+    if len(items) > BATCH_LIMIT:
+        return jsonify({"error": f"At most {BATCH_LIMIT} results per batch"}), 400
+    if not all(isinstance(item, dict) and type(item.get("id")) is int for item in items):
+        return jsonify({"error": "Every result needs an integer id"}), 400
 
-            g.db.commit()
+    matchup_ids = [item["id"] for item in items]
+    table = Matchup.__table__
 
+    try:
+        bracket_ids = sorted(db.execute(
+            select(table.c.bracket_id).where(table.c.id.in_(matchup_ids)).distinct()
+        ).scalars())
+
+        # Lock the brackets in a fixed order before reading the rows the results are checked against
+        for bracket_id in bracket_ids:
+            bump_bracket_version(bracket_id)
+
+        current = {row.id: row._mapping for row in db.execute(select(table).where(table.c.id.in_(matchup_ids)))}
+        brackets = {bracket.id: bracket for bracket in db.query(Bracket).filter(Bracket.id.in_(bracket_ids))}
+
+        results = []
+        rows = []
+        seen = set()
+        for item in items:
+            matchup_id = item["id"]
+            if matchup_id in seen:
+                results.append({"id": matchup_id, "result": "invalid", "error": "Duplicate matchup id in batch"})
+                continue
+            seen.add(matchup_id)
+
+            if matchup_id not in current:
+                results.append({"id": matchup_id, "result": "invalid", "error": "Matchup not found"})
+                continue
+
+            row, error = validate_result(item, current[matchup_id])
+            if error:
+                results.append({"id": matchup_id, "result": "invalid", "error": error})
+            else:
+                results.append({"id": matchup_id, "result": "valid"})
+                rows.append(row)
+
+        if len(rows) != len(items):
+            db.rollback()
+            return jsonify({"error": "Some results are invalid; nothing was saved", "results": results}), 400
+
+        write_matchup_results(db, rows)
+
+        removed = {}
+        added = {}
+        refreshed = {}
+        open_deltas = {}
+        closing_rounds = set()
+        placements = []
+
+        for row in rows:
+            old = current[row["id"]]
+            bracket_id = row["bracket_id"]
+            removed.setdefault(bracket_id, []).append(
+                (old["player1_id"], old["player2_id"], old["winner_id"], old["score"], old["status"])
+            )
+            added.setdefault(bracket_id, []).append(
+                (row["player1_id"], row["player2_id"], row["winner_id"], row["score"], row["status"])
+            )
+
+            was_planning = old["status"] == "PLANNING"
+            is_planning = row["status"] == "PLANNING"
+            if was_planning != is_planning:
+                key = (bracket_id, row["round"])
+                open_deltas[key] = open_deltas.get(key, 0) + (1 if is_planning else -1)
+                if was_planning:
+                    closing_rounds.add(key)
+
+            if brackets[bracket_id].format in ELIMINATION_FORMATS:
+                if row["status"] == "COMPLETED" and row["winner_id"]:
+                    loser_id = row["player2_id"] if row["winner_id"] == row["player1_id"] else row["player1_id"]
+                    if row["winner_next_matchup_id"]:
+                        placements.append((row["winner_next_matchup_id"], row["winner_next_slot"], row["winner_id"]))
+                    if row["loser_next_matchup_id"] and loser_id:
+                        placements.append((row["loser_next_matchup_id"], row["loser_next_slot"], loser_id))
+                    refreshed[bracket_id] = "advanced"
+
+        for bracket_id in bracket_ids:
+            apply_results(db, bracket_id, removed=removed.get(bracket_id, ()), added=added.get(bracket_id, ()))
+        place_in_slots(db, placements)
+        adjust_open_counts(db, open_deltas)
+
+        for row in rows:
+            publish_matchup(serialize_result_row(row), brackets[row["bracket_id"]].tournament_id)
+
+        for bracket_id, round_num in sorted(closing_rounds, key=lambda key: (key[0], key[1] or 0)):
+            # Elimination matchups open as their slots fill, never by round, as in update_matchup
+            if round_num is None or brackets[bracket_id].format in ELIMINATION_FORMATS:
+                continue
+            opened = advance_round(db, bracket_id, round_num)
+            bracket = brackets[bracket_id]
+            if opened:
+                refreshed[bracket_id] = "round_opened"
+            elif bracket.format == "SWISS" and is_round_closed(db, bracket_id, round_num):
+                append_next_swiss_round(bracket, round_num)
+                refreshed[bracket_id] = "round_opened"
+
+        for bracket_id, reason in refreshed.items():
+            publish_refresh(bracket_id, brackets[bracket_id].tournament_id, reason)
+
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({
-        "id": matchup.id,
-        "bracket_id": matchup.bracket_id,
-        "player1_id": matchup.player1_id,
-        "player2_id": matchup.player2_id,
-        "player1_partner_id": matchup.player1_partner_id,
-        "player2_partner_id": matchup.player2_partner_id,
-        "winner_id": matchup.winner_id,
-        "score": matchup.score,
-        "status": matchup.status
+        "results": [
+            {
+                "id": row["id"],
+                "result": "updated",
+                "matchup": serialize_result_row(row)
+            }
+            for row in rows
+        ]
     }), 200
@@ -1,26 +1,43 @@
-from flask import jsonify, request, g
+from flask import jsonify, request
 from apiflask import APIBlueprint
-from models import Player, SessionLocal
+from pydantic import Field
+from sqlalchemy import or_, select, union
+from models import BracketPlayer, Matchup, Player
+from db import db
+from pagination import PageQuery, list_response
+from search import index_player, search_players, unindex_player
+from serialization import PLAYER, FieldsQuery
+from versioning import bump_bracket_version
 
 players_bp = APIBlueprint("players", __name__)
 
-@players_bp.before_request
-def create_session():
-    g.db = SessionLocal()
+@players_bp.route("/players", methods=["GET"])
+@players_bp.input(PageQuery, location="query")
+def get_players(query_data):
+    return list_response(PLAYER, Player.id, query_data)
 
-@players_bp.teardown_request
-def close_session(exception=None):
-    g.db.close()
+class PlayerSearchQuery(FieldsQuery):
+    q: str = Field(min_length=1, description="Name, or part of one, or a phone number")
+    limit: int = Field(default=10, ge=1, le=50, description="Maximum number of players to return")
 
-@players_bp.route("/players", methods=["GET"])
-def get_players():
-    players = g.db.query(Player).all()
-    return jsonify([{
-        "id": player.id,
-        "name": player.name,
-        "gender": player.gender,
-        "phone_number": player.phone_number
-    } for player in players])
+@players_bp.route("/players/search", methods=["GET"])
+@players_bp.input(PlayerSearchQuery, location="query")
+def search_player_registry(query_data):
+    try:
+        row_type = PLAYER.only(query_data.fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    matches = search_players(db, query_data.q, query_data.limit)
+    if not matches:
+        return jsonify([])
+
+    rows = {row.id: row for row in db.execute(row_type.select().where(Player.id.in_([match[0] for match in matches])))}
+    return jsonify([
+        {**row_type.encode(rows[player_id]), "match": match, "score": score}
+        for player_id, match, score in matches
+        if player_id in rows
+    ])
 
 @players_bp.route("/players", methods=["POST"])
 def add_player():
@@ -35,31 +52,43 @@ def add_player():
     player = Player(name=name, gender=gender, phone_number=phone_number)
 
     try:
-        g.db.add(player)
-        g.db.commit()
+        db.add(player)
+        db.flush()
+        index_player(db, player.id, name, phone_number)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({
-        "id": player.id,
-        "name": player.name,
-        "gender": player.gender,
-        "phone_number": player.phone_number
-    }), 201
+    return jsonify(PLAYER.dump(player)), 201
 
 @players_bp.route("/players/<int:player_id>", methods=["DELETE"])
 def remove_player(player_id):
-    player = g.db.query(Player).filter(Player.id == player_id).first()
+    player = db.query(Player).filter(Player.id == player_id).first()
 
     if not player:
         return jsonify({"error": "Player not found"}), 404
 
+    # Brackets embed the player in their player lists, matchups and standings
+    bracket_ids = db.execute(union(
+        select(BracketPlayer.bracket_id).where(BracketPlayer.player_id == player_id),
+        select(Matchup.bracket_id).where(or_(
+            Matchup.player1_id == player_id,
+            Matchup.player2_id == player_id,
+            Matchup.player1_partner_id == player_id,
+            Matchup.player2_partner_id == player_id,
+            Matchup.winner_id == player_id
+        ))
+    )).scalars().all()
+
     try:
-        g.db.delete(player)
-        g.db.commit()
+        unindex_player(db, player_id)
+        for bracket_id in bracket_ids:
+            bump_bracket_version(bracket_id)
+        db.delete(player)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({"message": "Player removed from the registry successfully"})
@@ -1,25 +1,62 @@
-from flask import jsonify, request, g
+from flask import jsonify, request
 from apiflask import APIBlueprint
-from models import TournamentPlayer, SessionLocal
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Player, Tournament, TournamentPlayer
+from db import db
+from versioning import tournament_version
+from pagination import PageQuery, list_response
+from serialization import PLAYER, TOURNAMENT_PLAYER, FieldsQuery
 
 tournament_players_bp = APIBlueprint("tournament_players", __name__)
 
-@tournament_players_bp.before_request
-def create_session():
-    g.db = SessionLocal()
-
-@tournament_players_bp.teardown_request
-def close_session(exception=None):
-    g.db.close()
-
 @tournament_players_bp.route("/tournament-players", methods=["GET"])
-def get_tournament_players():
-    tournament_players = g.db.query(TournamentPlayer).all()
-    return jsonify([{
-        "id": tp.id,
-        "tournament_id": tp.tournament_id,
-        "player_id": tp.player_id
-    } for tp in tournament_players])
+@tournament_players_bp.input(PageQuery, location="query")
+def get_tournament_players(query_data):
+    return list_response(TOURNAMENT_PLAYER, TournamentPlayer.id, query_data)
+
+def upsert_tournament_players(tournament_id, player_ids):
+    """Register players in a tournament with one INSERT .. SELECT that ignores existing registrations.
+
+    Only ids of existing players in an existing tournament are selected, so bad ids are
+    skipped rather than failing the batch. A registration that already exists is hit by
+    a no-op update on uq_tournament_player, which keeps the table from growing on retries
+    while still returning its id. SQLite and PostgreSQL report (id, player_id) through
+    RETURNING in the same statement; MySQL has no RETURNING, so the rows are read back.
+    """
+    table = TournamentPlayer.__table__
+    rows = select(Tournament.id, Player.id).select_from(Player).join(Tournament, Tournament.id == tournament_id).where(
+        Player.id.in_(player_ids)
+    )
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        statement = mysql_insert(table).from_select(["tournament_id", "player_id"], rows)
+        db.execute(statement.on_duplicate_key_update(player_id=statement.inserted.player_id))
+        return db.execute(
+            select(table.c.id, table.c.player_id).where(
+                table.c.tournament_id == tournament_id,
+                table.c.player_id.in_(player_ids)
+            )
+        ).all()
+
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert(table).from_select(["tournament_id", "player_id"], rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["tournament_id", "player_id"],
+        set_={"player_id": statement.excluded.player_id}
+    )
+    return db.execute(statement.returning(table.c.id, table.c.player_id)).all()
+
+def unique_ids(values):
+    """Drop repeated ids, keeping first occurrences; 1, 1.0 and True stay apart and lists need no hashing."""
+    unique = []
+    for value in values:
+        if not any(type(seen) is type(value) and seen == value for seen in unique):
+            unique.append(value)
+    return unique
 
 @tournament_players_bp.route("/tournament_players", methods=["POST"])
 def add_players_to_tournament():
@@ -27,52 +64,67 @@ def add_players_to_tournament():
     tournament_id = data.get("tournament_id")
     player_ids = data.get("player_ids")
 
-    if not tournament_id or not player_ids:
+    if not tournament_id or not player_ids or not isinstance(player_ids, list):
         return jsonify({"error": "tournament_id and player_ids are required"}), 400
 
-    tournament_players = [
-        TournamentPlayer(tournament_id=tournament_id, player_id=player_id)
-        for player_id in player_ids
-    ]
+    # Anything but an int (a bool, a float, a list) is invalid before it meets a set or dict
+    accepted, invalid = [], []
+    for player_id in player_ids:
+        (accepted if type(player_id) is int else invalid).append(player_id)
+    requested = list(dict.fromkeys(accepted))
+
+    # With nothing to insert the upsert can't tell whether the tournament exists
+    if not requested and tournament_version(tournament_id) is None:
+        return jsonify({"error": "Tournament not found"}), 404
 
     try:
-        g.db.bulk_save_objects(tournament_players)
-        g.db.commit()
+        rows = upsert_tournament_players(tournament_id, requested) if requested else []
+        registered = {player_id: tp_id for tp_id, player_id in rows}
+
+        # Only a short answer needs explaining: either the tournament or some players don't exist
+        if len(registered) < len(requested) and tournament_version(tournament_id) is None:
+            db.rollback()
+            return jsonify({"error": "Tournament not found"}), 404
+
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
-    return jsonify([
-        {
-            "id": tp.id,
-            "tournament_id": tp.tournament_id,
-            "player_id": tp.player_id
-        }
-        for tp in tournament_players
-    ]), 201
+    return jsonify({
+        "players": [
+            {
+                "id": registered[player_id],
+                "tournament_id": tournament_id,
+                "player_id": player_id
+            }
+            for player_id in requested if player_id in registered
+        ],
+        "invalid": unique_ids(invalid + [player_id for player_id in requested if player_id not in registered])
+    }), 201
 
 @tournament_players_bp.route("/tournaments/<int:tournament_id>/players", methods=["GET"])
-def get_players_by_tournament(tournament_id):
-    tournament_players = g.db.query(TournamentPlayer).filter(TournamentPlayer.tournament_id == tournament_id).all()
+@tournament_players_bp.input(FieldsQuery, location="query")
+def get_players_by_tournament(tournament_id, query_data):
+    try:
+        player_type = PLAYER.only(query_data.fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if not tournament_players:
-        return jsonify({"error": "No players found for the given tournament"}), 404
+    players = db.execute(
+        player_type.select().join(TournamentPlayer, TournamentPlayer.player_id == Player.id).where(
+            TournamentPlayer.tournament_id == tournament_id
+        ).order_by(TournamentPlayer.id)
+    ).all()
 
-    players = [
-        {
-            "id": tp.player.id,
-            "name": tp.player.name,
-            "gender": tp.player.gender,
-            "phone_number": tp.player.phone_number
-        }
-        for tp in tournament_players
-    ]
+    if not players:
+        return jsonify({"error": "No players found for the given tournament"}), 404
 
-    return jsonify(players)
+    return jsonify(player_type.encode_all(players))
 
 @tournament_players_bp.route("/tournaments/<int:tournament_id>/players/<int:player_id>", methods=["DELETE"])
 def remove_player_from_tournament(tournament_id, player_id):
-    tournament_player = g.db.query(TournamentPlayer).filter(
+    tournament_player = db.query(TournamentPlayer).filter(
         TournamentPlayer.tournament_id == tournament_id,
         TournamentPlayer.player_id == player_id
     ).first()
@@ -81,10 +133,10 @@ def remove_player_from_tournament(tournament_id, player_id):
         return jsonify({"error": "Player not found in the tournament"}), 404
 
     try:
-        g.db.delete(tournament_player)
-        g.db.commit()
+        db.delete(tournament_player)
+        db.commit()
     except Exception as e:
-        g.db.rollback()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
 
     return jsonify({"message": "Player removed from the tournament successfully"})
@@ -1,28 +1,143 @@
-from flask import jsonify, request, g
+from collections import defaultdict
+from flask import jsonify, request
 from apiflask import APIBlueprint
-from models import Tournament, SessionLocal
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import aliased
+from models import Bracket, BracketPlayer, Matchup, Player, Tournament, TournamentPlayer
+from db import db
+from async_db import async_alternative, run_steps, run_steps_async
+from serialization import BRACKET_MATCHUP, BRACKET_OVERVIEW, TOURNAMENT
+from versioning import bump_tournament_version, is_not_modified, list_version_marker, make_etag, not_modified_response, tournament_list_version_statement, with_etag
 
 tournaments_bp = APIBlueprint("tournaments", __name__)
 
-@tournaments_bp.before_request
-def create_session():
-    g.db = SessionLocal()
+ACTIVE_STATUSES = ["PLANNING", "IN_PROGRESS"]
 
-@tournaments_bp.teardown_request
-def close_session(exception=None):
-    g.db.close()
+def active_tournaments_statement():
+    return TOURNAMENT.select().where(Tournament.status.in_(ACTIVE_STATUSES))
+
+def tournaments_steps():
+    marker = list_version_marker(*(yield tournament_list_version_statement(ACTIVE_STATUSES), "one"))
+    etag = make_etag("tournaments", marker)
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    tournaments = yield active_tournaments_statement(), "all"
+    return with_etag(jsonify(TOURNAMENT.encode_all(tournaments)), etag)
+
+async def get_tournaments_async():
+    return await run_steps_async(tournaments_steps())
 
 @tournaments_bp.route("/tournaments", methods=["GET"])
+@async_alternative(get_tournaments_async)
 def get_tournaments():
-    tournaments = g.db.query(Tournament).filter(Tournament.status.in_(["PLANNING", "IN_PROGRESS"])).all()
-    return jsonify([{
-        "id": tournament.id,
-        "name": tournament.name,
-        "start_date": tournament.start_date,
-        "end_date": tournament.end_date,
-        "format": tournament.format,
-        "status": tournament.status
-    } for tournament in tournaments])
+    return run_steps(tournaments_steps())
+
+# Current-round matchups in the overview name their players and nothing more
+OVERVIEW_MATCHUP = BRACKET_MATCHUP.only(nested_fields="name")
+
+def overview_tournament_statement(tournament_id):
+    registered = select(func.count()).where(TournamentPlayer.tournament_id == tournament_id).scalar_subquery()
+    return select(*TOURNAMENT.columns(), Tournament.version, registered.label("player_count")).where(
+        Tournament.id == tournament_id
+    )
+
+def overview_brackets_statement(tournament_id):
+    player_counts = (
+        select(BracketPlayer.bracket_id, func.count().label("player_count"))
+        .join(Bracket, Bracket.id == BracketPlayer.bracket_id)
+        .where(Bracket.tournament_id == tournament_id)
+        .group_by(BracketPlayer.bracket_id)
+        .subquery()
+    )
+    return (
+        select(*BRACKET_OVERVIEW.columns(), Bracket.version, func.coalesce(player_counts.c.player_count, 0).label("player_count"))
+        .outerjoin(player_counts, player_counts.c.bracket_id == Bracket.id)
+        .where(Bracket.tournament_id == tournament_id)
+        .order_by(Bracket.id)
+    )
+
+def overview_status_counts_statement(tournament_id):
+    return (
+        select(Matchup.bracket_id, Matchup.status, func.count().label("count"))
+        .join(Bracket, Bracket.id == Matchup.bracket_id)
+        .where(Bracket.tournament_id == tournament_id)
+        .group_by(Matchup.bracket_id, Matchup.status)
+    )
+
+def overview_matchups_statement(tournament_id):
+    """Every bracket's current-round matchups: the smallest round still in PLANNING, as GET /brackets/<id>/matchups has it."""
+    current_rounds = (
+        select(Matchup.bracket_id, func.min(Matchup.round).label("round"))
+        .join(Bracket, Bracket.id == Matchup.bracket_id)
+        .where(Bracket.tournament_id == tournament_id, Matchup.status == "PLANNING")
+        .group_by(Matchup.bracket_id)
+        .subquery()
+    )
+    players = {slot: aliased(Player) for slot, _ in OVERVIEW_MATCHUP.nested}
+    statement = select(*OVERVIEW_MATCHUP.columns(nested_entities=players)).join(
+        current_rounds, and_(current_rounds.c.bracket_id == Matchup.bracket_id, current_rounds.c.round == Matchup.round)
+    )
+    for slot, player in players.items():
+        statement = statement.outerjoin(player, player.id == getattr(Matchup, f"{slot}_id"))
+    return statement.order_by(Matchup.bracket_id, Matchup.id)
+
+def overview_etag(tournament, brackets):
+    # Bracket writes bump only the bracket's version, and registrations bump none, so both go in the tag
+    marker = list_version_marker(len(brackets), sum(bracket.version for bracket in brackets), max((bracket.id for bracket in brackets), default=0))
+    return make_etag("tournament", tournament.id, tournament.version, "overview", marker, tournament.player_count)
+
+def overview_body(tournament, brackets, status_counts, matchups):
+    bracket_counts = defaultdict(dict)
+    totals = defaultdict(int)
+    for bracket_id, status, count in status_counts:
+        bracket_counts[bracket_id][status] = count
+        totals[status] += count
+
+    bracket_matchups = defaultdict(list)
+    for matchup in OVERVIEW_MATCHUP.encode_all(matchups):
+        bracket_matchups[matchup["bracket_id"]].append(matchup)
+
+    return {
+        "tournament": {**TOURNAMENT.encode(tournament), "player_count": tournament.player_count},
+        "status_counts": totals,
+        "brackets": [
+            {
+                **BRACKET_OVERVIEW.encode(bracket),
+                "player_count": bracket.player_count,
+                "status_counts": bracket_counts.get(bracket.id, {}),
+                "current_round": bracket_matchups[bracket.id][0]["round"] if bracket_matchups.get(bracket.id) else None,
+                "matchups": bracket_matchups.get(bracket.id, [])
+            }
+            for bracket in brackets
+        ]
+    }
+
+def tournament_overview_steps(tournament_id):
+    # Four set-based queries however many brackets there are; unchanged polls stop after the first two
+    tournament = yield overview_tournament_statement(tournament_id), "first"
+
+    if tournament is None:
+        return jsonify({"error": "Tournament not found"}), 404
+
+    brackets = yield overview_brackets_statement(tournament_id), "all"
+    etag = overview_etag(tournament, brackets)
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    status_counts = yield overview_status_counts_statement(tournament_id), "all"
+    matchups = yield overview_matchups_statement(tournament_id), "all"
+    return with_etag(jsonify(overview_body(tournament, brackets, status_counts, matchups)), etag)
+
+async def get_tournament_overview_async(tournament_id):
+    return await run_steps_async(tournament_overview_steps(tournament_id))
+
+@tournaments_bp.route("/tournaments/<int:tournament_id>/overview", methods=["GET"])
+@async_alternative(get_tournament_overview_async)
+def get_tournament_overview(tournament_id):
+    return run_steps(tournament_overview_steps(tournament_id))
 
 @tournaments_bp.route("/tournaments", methods=["POST"])
 def create_tournament():
@@ -34,21 +149,14 @@ def create_tournament():
         format=data["format"],
         status=data["status"]
     )
-    g.db.add(new_tournament)
-    g.db.commit()
-    return jsonify({
-        "id": new_tournament.id,
-        "name": new_tournament.name,
-        "start_date": new_tournament.start_date,
-        "end_date": new_tournament.end_date,
-        "format": new_tournament.format,
-        "status": new_tournament.status
-    }), 201
+    db.add(new_tournament)
+    db.commit()
+    return jsonify(TOURNAMENT.dump(new_tournament)), 201
 
 @tournaments_bp.route("/tournaments/<int:tournament_id>", methods=["PUT"])
 def update_tournament(tournament_id):
     data = request.get_json()
-    tournament = g.db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
 
     if not tournament:
         return jsonify({"error": "Tournament not found"}), 404
@@ -59,13 +167,7 @@ def update_tournament(tournament_id):
     tournament.format = data.get("format", tournament.format)
     tournament.status = data.get("status", tournament.status)
 
-    g.db.commit()
+    bump_tournament_version(tournament_id)
+    db.commit()
 
-    return jsonify({
-        "id": tournament.id,
-        "name": tournament.name,
-        "start_date": tournament.start_date,
-        "end_date": tournament.end_date,
-        "format": tournament.format,
-        "status": tournament.status
-    })
+    return jsonify(TOURNAMENT.dump(tournament))
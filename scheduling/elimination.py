@@ -0,0 +1,152 @@
+def seed_positions(size):
+    """Standard bracket seed order for a power-of-two size, e.g. [1, 8, 4, 5, 2, 7, 3, 6] for 8.
+
+    Seeds 1 and 2 can only meet in the final, and a bye (a seed above the field size)
+    always lands against one of the top seeds.
+    """
+    positions = [1]
+    while len(positions) < size:
+        total = len(positions) * 2 + 1
+        positions = [seed for position in positions for seed in (position, total - position)]
+    return positions
+
+class _Match:
+    __slots__ = ("round", "slots", "state", "entrant", "row")
+
+    def __init__(self, slots, matches):
+        self.slots = slots
+        self.round = 1 + max((matches[ref].round for kind, ref in filter(None, slots) if kind != "player"), default=0)
+        self.state = None
+        self.entrant = None
+        self.row = None
+
+def _build_winners_bracket(player_ids, size, matches):
+    """Add the winners bracket to `matches` and return the match indices of each round."""
+    seeds = seed_positions(size)
+    rounds = []
+
+    first_round = []
+    for position in range(0, size, 2):
+        slots = [
+            ("player", player_ids[seed - 1]) if seed <= len(player_ids) else None
+            for seed in seeds[position:position + 2]
+        ]
+        matches.append(_Match(slots, matches))
+        first_round.append(len(matches) - 1)
+    rounds.append(first_round)
+
+    while len(rounds[-1]) > 1:
+        previous = rounds[-1]
+        current = []
+        for i in range(0, len(previous), 2):
+            matches.append(_Match([("winner", previous[i]), ("winner", previous[i + 1])], matches))
+            current.append(len(matches) - 1)
+        rounds.append(current)
+
+    return rounds
+
+def _build_losers_bracket(winners_rounds, matches):
+    """Add the losers bracket to `matches` and return the source feeding its champion.
+
+    Losers round 1 pairs the losers of winners round 1. After that, each "major" round
+    meets the previous survivors against the losers dropping from the next winners
+    round, and each "minor" round halves the survivors.
+    """
+    if len(winners_rounds) == 1:
+        return ("loser", winners_rounds[0][0])
+
+    first = winners_rounds[0]
+    survivors = []
+    for i in range(0, len(first), 2):
+        matches.append(_Match([("loser", first[i]), ("loser", first[i + 1])], matches))
+        survivors.append(len(matches) - 1)
+
+    for winners_round in winners_rounds[1:]:
+        # Drop-downs are fed in reverse order so players don't immediately meet again
+        dropping = list(reversed(winners_round))
+        major = []
+        for survivor, dropped in zip(survivors, dropping):
+            matches.append(_Match([("winner", survivor), ("loser", dropped)], matches))
+            major.append(len(matches) - 1)
+
+        if len(major) == 1:
+            survivors = major
+            break
+
+        survivors = []
+        for i in range(0, len(major), 2):
+            matches.append(_Match([("winner", major[i]), ("winner", major[i + 1])], matches))
+            survivors.append(len(matches) - 1)
+
+    return ("winner", survivors[0])
+
+def _resolve(matches):
+    """Collapse byes in one pass over the matches, which are already in dependency order.
+
+    A match with no entrants is void; a match with one entrant is a walkover whose
+    entrant moves straight on, and which produces no loser. Every other match is real.
+    """
+    for match in matches:
+        resolved = []
+        for slot in match.slots:
+            if slot is not None and slot[0] != "player":
+                kind, ref = slot
+                source = matches[ref]
+                if source.state == "void":
+                    slot = None
+                elif source.state == "walkover":
+                    slot = source.entrant if kind == "winner" else None
+            resolved.append(slot)
+
+        match.slots = resolved
+        live = [slot for slot in resolved if slot is not None]
+
+        if not live:
+            match.state = "void"
+        elif len(live) == 1:
+            match.state = "walkover"
+            match.entrant = live[0]
+        else:
+            match.state = "real"
+
+def elimination_schedule(player_ids, double=False):
+    """Build a single- or double-elimination bracket in one pass, in seed order.
+
+    Returns one dict per playable matchup in dependency order with "round",
+    "player1_id" and "player2_id" (None until fed), and "winner_next"/"loser_next"
+    as (matchup index, slot 1 or 2) or None. Byes give the top seeds a free pass into
+    the next round and create no rows. A double-elimination bracket ends with a
+    single grand final between the winners- and losers-bracket champions.
+    """
+    if len(player_ids) < 2:
+        return []
+
+    size = 1
+    while size < len(player_ids):
+        size *= 2
+
+    matches = []
+    winners_rounds = _build_winners_bracket(player_ids, size, matches)
+
+    if double:
+        losers_champion = _build_losers_bracket(winners_rounds, matches)
+        matches.append(_Match([("winner", winners_rounds[-1][0]), losers_champion], matches))
+
+    _resolve(matches)
+
+    schedule = []
+    for match in matches:
+        if match.state != "real":
+            continue
+        match.row = len(schedule)
+        row = {"round": match.round, "player1_id": None, "player2_id": None, "winner_next": None, "loser_next": None}
+
+        for slot_number, (kind, ref) in enumerate(match.slots, start=1):
+            if kind == "player":
+                row[f"player{slot_number}_id"] = ref
+            else:
+                schedule[matches[ref].row][f"{kind}_next"] = (match.row, slot_number)
+
+        schedule.append(row)
+
+    return schedule
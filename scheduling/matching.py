@@ -0,0 +1,375 @@
+"""Maximum-weight matching in general graphs (Edmonds' blossom algorithm).
+
+This follows the O(n^3) primal-dual formulation described by Galil ("Efficient
+algorithms for finding maximum matching in graphs", 1986) in the structure of Joris
+van Rantwijk's public-domain mwmatching.py. With integer weights every dual value
+stays an integer, so the result is exact however large the weights are.
+"""
+
+def max_weight_matching(edges, max_cardinality=False):
+    """Match vertices 0..n-1 along `edges`, (i, j, weight) triples, for the largest total weight.
+
+    With `max_cardinality` only matchings with the most edges are considered. Returns a
+    list whose entry i is the vertex matched to i, or -1 if i is left unmatched.
+    """
+    if not edges:
+        return []
+
+    num_edges = len(edges)
+    num_vertices = 1 + max(max(i, j) for i, j, _ in edges)
+    max_weight = max(0, max(weight for _, _, weight in edges))
+    integer_weights = all(isinstance(weight, int) for _, _, weight in edges)
+
+    # Edge k has endpoints 2k (its i) and 2k + 1 (its j); endpoint p's partner is p ^ 1
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * num_edges)]
+    # The endpoints on the far side of each vertex's edges
+    neighbour_ends = [[] for _ in range(num_vertices)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbour_ends[i].append(2 * k + 1)
+        neighbour_ends[j].append(2 * k)
+
+    # mate[v] is the remote endpoint of v's matched edge, or -1
+    mate = [-1] * num_vertices
+    # Labels of top-level blossoms and vertices: 0 free, 1 S (outer), 2 T (inner), 5 while scanning
+    label = [0] * (2 * num_vertices)
+    label_end = [-1] * (2 * num_vertices)
+    in_blossom = list(range(num_vertices))
+    blossom_parent = [-1] * (2 * num_vertices)
+    blossom_children = [None] * (2 * num_vertices)
+    blossom_base = list(range(num_vertices)) + [-1] * num_vertices
+    blossom_ends = [None] * (2 * num_vertices)
+    best_edge = [-1] * (2 * num_vertices)
+    blossom_best_edges = [None] * (2 * num_vertices)
+    unused_blossoms = list(range(num_vertices, 2 * num_vertices))
+    dual = [max_weight] * num_vertices + [0] * num_vertices
+    allowed = [False] * num_edges
+    queue = []
+
+    def slack(k):
+        i, j, weight = edges[k]
+        return dual[i] + dual[j] - 2 * weight
+
+    def leaves(b):
+        if b < num_vertices:
+            yield b
+        else:
+            for child in blossom_children[b]:
+                if child < num_vertices:
+                    yield child
+                else:
+                    yield from leaves(child)
+
+    def assign_label(w, t, p):
+        b = in_blossom[w]
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        if t == 1:
+            queue.extend(leaves(b))
+        elif t == 2:
+            base = blossom_base[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        """The base of the blossom closed by edge (v, w), or -1 if the edge joins two trees."""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                v = endpoint[label_end[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        base_blossom = in_blossom[base]
+        bv = in_blossom[v]
+        bw = in_blossom[w]
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[base_blossom] = b
+        blossom_children[b] = path = []
+        blossom_ends[b] = ends = []
+
+        while bv != base_blossom:
+            blossom_parent[bv] = b
+            path.append(bv)
+            ends.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+        path.append(base_blossom)
+        path.reverse()
+        ends.reverse()
+        ends.append(2 * k)
+        while bw != base_blossom:
+            blossom_parent[bw] = b
+            path.append(bw)
+            ends.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+
+        label[b] = 1
+        label_end[b] = label_end[base_blossom]
+        dual[b] = 0
+        for v in leaves(b):
+            if label[in_blossom[v]] == 2:
+                # Former T-vertices become S-vertices and get scanned
+                queue.append(v)
+            in_blossom[v] = b
+
+        # The least-slack edge from the new blossom to each neighbouring S-blossom
+        best_edge_to = [-1] * (2 * num_vertices)
+        for child in path:
+            if blossom_best_edges[child] is None:
+                edge_lists = [[p // 2 for p in neighbour_ends[v]] for v in leaves(child)]
+            else:
+                edge_lists = [blossom_best_edges[child]]
+            for edge_list in edge_lists:
+                for edge in edge_list:
+                    i, j, _ = edges[edge]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if bj != b and label[bj] == 1 and (best_edge_to[bj] == -1 or slack(edge) < slack(best_edge_to[bj])):
+                        best_edge_to[bj] = edge
+            blossom_best_edges[child] = None
+            best_edge[child] = -1
+        blossom_best_edges[b] = [edge for edge in best_edge_to if edge != -1]
+        best_edge[b] = -1
+        for edge in blossom_best_edges[b]:
+            if best_edge[b] == -1 or slack(edge) < slack(best_edge[b]):
+                best_edge[b] = edge
+
+    def expand_blossom(b, end_of_stage):
+        for child in blossom_children[b]:
+            blossom_parent[child] = -1
+            if child < num_vertices:
+                in_blossom[child] = child
+            elif end_of_stage and dual[child] == 0:
+                expand_blossom(child, end_of_stage)
+            else:
+                for v in leaves(child):
+                    in_blossom[v] = child
+
+        if not end_of_stage and label[b] == 2:
+            # Relabel the children along the even-length path from the entry child to the base
+            entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+            j = blossom_children[b].index(entry_child)
+            if j & 1:
+                j -= len(blossom_children[b])
+                step, trick = 1, 0
+            else:
+                step, trick = -1, 1
+            p = label_end[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossom_ends[b][j - trick] ^ trick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowed[blossom_ends[b][j - trick] // 2] = True
+                j += step
+                p = blossom_ends[b][j - trick] ^ trick
+                allowed[p // 2] = True
+                j += step
+            child = blossom_children[b][j]
+            label[endpoint[p ^ 1]] = label[child] = 2
+            label_end[endpoint[p ^ 1]] = label_end[child] = p
+            best_edge[child] = -1
+            j += step
+            while blossom_children[b][j] != entry_child:
+                child = blossom_children[b][j]
+                if label[child] == 1:
+                    j += step
+                    continue
+                for v in leaves(child):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossom_base[child]]]] = 0
+                    assign_label(v, 2, label_end[v])
+                j += step
+
+        label[b] = label_end[b] = -1
+        blossom_children[b] = blossom_ends[b] = None
+        blossom_base[b] = -1
+        blossom_best_edges[b] = None
+        best_edge[b] = -1
+        unused_blossoms.append(b)
+
+    def augment_blossom(b, v):
+        """Swap matched and unmatched edges inside blossom `b` so that `v` becomes its base."""
+        t = v
+        while blossom_parent[t] != b:
+            t = blossom_parent[t]
+        if t >= num_vertices:
+            augment_blossom(t, v)
+        i = j = blossom_children[b].index(t)
+        if i & 1:
+            j -= len(blossom_children[b])
+            step, trick = 1, 0
+        else:
+            step, trick = -1, 1
+        while j != 0:
+            j += step
+            t = blossom_children[b][j]
+            p = blossom_ends[b][j - trick] ^ trick
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p])
+            j += step
+            t = blossom_children[b][j]
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+        blossom_ends[b] = blossom_ends[b][i:] + blossom_ends[b][:i]
+        blossom_base[b] = blossom_base[blossom_children[b][0]]
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = in_blossom[s]
+                if bs >= num_vertices:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                if bt >= num_vertices:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    # Each stage grows alternating trees until it augments the matching by one edge, or can't
+    for _ in range(num_vertices):
+        label[:] = [0] * (2 * num_vertices)
+        best_edge[:] = [-1] * (2 * num_vertices)
+        blossom_best_edges[num_vertices:] = [None] * num_vertices
+        allowed[:] = [False] * num_edges
+        queue[:] = []
+
+        for v in range(num_vertices):
+            if mate[v] == -1 and label[in_blossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbour_ends[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if in_blossom[v] == in_blossom[w]:
+                        continue
+                    if not allowed[k]:
+                        k_slack = slack(k)
+                        if k_slack <= 0:
+                            allowed[k] = True
+                    if allowed[k]:
+                        if label[in_blossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[in_blossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            # w is an unreached vertex inside a T-blossom
+                            label[w] = 2
+                            label_end[w] = p ^ 1
+                    elif label[in_blossom[w]] == 1:
+                        b = in_blossom[v]
+                        if best_edge[b] == -1 or k_slack < slack(best_edge[b]):
+                            best_edge[b] = k
+                    elif label[w] == 0:
+                        if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                            best_edge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path with the current duals: pick the smallest dual change that makes progress
+            delta_type = -1
+            delta = delta_edge = delta_blossom = None
+            if not max_cardinality:
+                delta_type = 1
+                delta = min(dual[:num_vertices])
+            for v in range(num_vertices):
+                if label[in_blossom[v]] == 0 and best_edge[v] != -1:
+                    d = slack(best_edge[v])
+                    if delta_type == -1 or d < delta:
+                        delta, delta_type, delta_edge = d, 2, best_edge[v]
+            for b in range(2 * num_vertices):
+                if blossom_parent[b] == -1 and label[b] == 1 and best_edge[b] != -1:
+                    k_slack = slack(best_edge[b])
+                    d = k_slack // 2 if integer_weights else k_slack / 2
+                    if delta_type == -1 or d < delta:
+                        delta, delta_type, delta_edge = d, 3, best_edge[b]
+            for b in range(num_vertices, 2 * num_vertices):
+                if (
+                    blossom_base[b] >= 0 and blossom_parent[b] == -1 and label[b] == 2
+                    and (delta_type == -1 or dual[b] < delta)
+                ):
+                    delta, delta_type, delta_blossom = dual[b], 4, b
+            if delta_type == -1:
+                # Only possible with max_cardinality: no further augmenting path exists
+                delta_type = 1
+                delta = max(0, min(dual[:num_vertices]))
+
+            for v in range(num_vertices):
+                if label[in_blossom[v]] == 1:
+                    dual[v] -= delta
+                elif label[in_blossom[v]] == 2:
+                    dual[v] += delta
+            for b in range(num_vertices, 2 * num_vertices):
+                if blossom_base[b] >= 0 and blossom_parent[b] == -1:
+                    if label[b] == 1:
+                        dual[b] += delta
+                    elif label[b] == 2:
+                        dual[b] -= delta
+
+            if delta_type == 1:
+                break
+            if delta_type == 2:
+                allowed[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                if label[in_blossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif delta_type == 3:
+                allowed[delta_edge] = True
+                i, _, _ = edges[delta_edge]
+                queue.append(i)
+            else:
+                expand_blossom(delta_blossom, False)
+
+        if not augmented:
+            break
+
+        # S-blossoms whose dual reached zero are taken apart before the next stage
+        for b in range(num_vertices, 2 * num_vertices):
+            if blossom_parent[b] == -1 and blossom_base[b] >= 0 and label[b] == 1 and dual[b] == 0:
+                expand_blossom(b, True)
+
+    return [endpoint[mate[v]] if mate[v] >= 0 else -1 for v in range(num_vertices)]
@@ -0,0 +1,51 @@
+def circle_pairings(num_players):
+    """Precompute the circle-method pairing table for a round-robin.
+
+    Returns one list per round of (home_slot, away_slot) index pairs. Slot n - 1 stays
+    fixed while the others rotate around a ring; an odd field makes the fixed slot a bye
+    (numbered num_players) and its pairing is the first of every round. Each round is
+    sliced straight out of a doubled ring, so the player list is never rebuilt.
+    """
+    n = num_players + num_players % 2
+    rotating = n - 1
+    fixed = n - 1
+    half = n // 2
+    ring = list(range(rotating)) * 2
+    table = []
+
+    for round_index in range(rotating):
+        # Ring positions round_index + k and round_index - k meet, for k = 1 .. half - 1
+        ahead = ring[round_index + 1:round_index + half]
+        behind = ring[round_index + rotating - half + 1:round_index + rotating][::-1]
+
+        # The fixed slot and each offset alternate home and away to balance home games
+        pairs = [(round_index, fixed) if round_index % 2 == 0 else (fixed, round_index)]
+        pairs.extend(zip(behind[0::2], ahead[0::2]))
+        pairs.extend(zip(ahead[1::2], behind[1::2]))
+        table.append(pairs)
+
+    return table
+
+def round_robin_schedule(player_ids, double=False):
+    """Return (round, home_player_id, away_player_id) tuples for a single or double round-robin.
+
+    The second half of a double round-robin repeats the first with home and away swapped.
+    """
+    table = circle_pairings(len(player_ids))
+    # With an odd field the first pairing of every round is against the bye slot
+    first_pair = len(player_ids) % 2
+    schedule = []
+
+    for round_index, pairs in enumerate(table):
+        round_num = round_index + 1
+        schedule.extend(
+            (round_num, player_ids[home], player_ids[away]) for home, away in pairs[first_pair:]
+        )
+
+    if double:
+        num_rounds = len(table)
+        schedule.extend(
+            (round_num + num_rounds, away_id, home_id) for round_num, home_id, away_id in schedule[:]
+        )
+
+    return schedule
@@ -0,0 +1,121 @@
+from sqlalchemy import bindparam, case, delete, exists, func, insert, select, update
+from models import BracketRound, Matchup
+
+def rebuild_round_state(session, bracket_id=None):
+    """Recompute the PLANNING count of every round from the matchups, for one bracket or all of them."""
+    rounds = BracketRound.__table__
+    matchups = Matchup.__table__
+
+    counts = select(
+        matchups.c.bracket_id,
+        matchups.c.round,
+        func.sum(case((matchups.c.status == "PLANNING", 1), else_=0))
+    ).where(matchups.c.round.is_not(None)).group_by(matchups.c.bracket_id, matchups.c.round)
+
+    if bracket_id is None:
+        session.execute(delete(rounds))
+    else:
+        session.execute(delete(rounds).where(rounds.c.bracket_id == bracket_id))
+        counts = counts.where(matchups.c.bracket_id == bracket_id)
+
+    session.execute(insert(rounds).from_select(["bracket_id", "round", "open_count"], counts))
+
+def _adjust_open_count(session, bracket_id, round_num, delta):
+    rounds = BracketRound.__table__
+    adjusted = session.execute(
+        update(rounds)
+        .where(rounds.c.bracket_id == bracket_id, rounds.c.round == round_num)
+        .values(open_count=rounds.c.open_count + delta)
+    ).rowcount
+
+    if not adjusted:
+        # Brackets generated before round state existed get it built on first use
+        rebuild_round_state(session, bracket_id)
+
+def adjust_open_counts(session, deltas):
+    """Apply {(bracket_id, round): change} to many rounds' PLANNING counts with one executemany UPDATE.
+
+    The caller must hold the brackets' version locks, since the changes were worked out
+    from statuses it read itself rather than by conditional updates.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta and key[1] is not None}
+    if not deltas:
+        return
+
+    rounds = BracketRound.__table__
+    adjusted = session.execute(
+        update(rounds)
+        .where(rounds.c.bracket_id == bindparam("b_bracket_id"), rounds.c.round == bindparam("b_round"))
+        .values(open_count=rounds.c.open_count + bindparam("delta")),
+        [
+            {"b_bracket_id": bracket_id, "b_round": round_num, "delta": delta}
+            for (bracket_id, round_num), delta in deltas.items()
+        ]
+    ).rowcount
+
+    if adjusted != len(deltas):
+        for bracket_id in {bracket_id for bracket_id, _ in deltas}:
+            rebuild_round_state(session, bracket_id)
+
+def change_status(session, matchup_id, bracket_id, round_num, status):
+    """Set a matchup's status and keep its round's PLANNING count in step.
+
+    The transition is detected by a conditional UPDATE on the matchup row rather than
+    by the status read earlier, so of several concurrent writers exactly one sees a
+    given matchup leave PLANNING. Returns True if this call took it out of PLANNING.
+    """
+    matchups = Matchup.__table__
+
+    if status == "PLANNING":
+        entered = session.execute(
+            update(matchups).where(matchups.c.id == matchup_id, matchups.c.status != "PLANNING").values(status=status)
+        ).rowcount
+        if entered and round_num is not None:
+            _adjust_open_count(session, bracket_id, round_num, 1)
+        return False
+
+    left = session.execute(
+        update(matchups).where(matchups.c.id == matchup_id, matchups.c.status == "PLANNING").values(status=status)
+    ).rowcount
+
+    if not left:
+        session.execute(update(matchups).where(matchups.c.id == matchup_id).values(status=status))
+        return False
+
+    if round_num is not None:
+        _adjust_open_count(session, bracket_id, round_num, -1)
+    return True
+
+def advance_round(session, bracket_id, round_num):
+    """Open the next round with one conditional UPDATE if `round_num` has no PLANNING matchups left.
+
+    Returns the number of matchups moved from PENDING to PLANNING.
+    """
+    rounds = BracketRound.__table__
+    matchups = Matchup.__table__
+
+    round_closed = exists().where(
+        rounds.c.bracket_id == bracket_id,
+        rounds.c.round == round_num,
+        rounds.c.open_count == 0
+    )
+    opened = session.execute(
+        update(matchups)
+        .where(
+            matchups.c.bracket_id == bracket_id,
+            matchups.c.round == round_num + 1,
+            matchups.c.status == "PENDING",
+            round_closed
+        )
+        .values(status="PLANNING")
+    ).rowcount
+
+    if opened:
+        _adjust_open_count(session, bracket_id, round_num + 1, opened)
+    return opened
+
+def is_round_closed(session, bracket_id, round_num):
+    open_count = session.execute(
+        select(BracketRound.open_count).where(BracketRound.bracket_id == bracket_id, BracketRound.round == round_num)
+    ).scalar()
+    return open_count == 0
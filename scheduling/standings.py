@@ -0,0 +1,153 @@
+"""Materialized per-bracket standings, kept current from matchup results.
+
+Run as a module to rebuild every bracket's standings from its matchups:
+
+    python -m scheduling.standings
+"""
+import re
+from collections import defaultdict
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from models import BracketPlayer, BracketStanding, Matchup, SessionLocal
+
+STAT_COLUMNS = ("played", "wins", "losses", "sets_won", "sets_lost", "games_won", "games_lost")
+SET_SCORE = re.compile(r"(\d+)\s*-\s*(\d+)")
+
+def parse_score(score):
+    """Split a score such as "6-4 3-6 7-6(5)" into (player1 games, player2 games) per set."""
+    if not score:
+        return []
+    return [(int(first), int(second)) for first, second in SET_SCORE.findall(score)]
+
+def matchup_result(matchup):
+    return (matchup.player1_id, matchup.player2_id, matchup.winner_id, matchup.score, matchup.status)
+
+def result_contribution(player1_id, player2_id, winner_id, score, status):
+    """What one matchup adds to each player's standing, as {player_id: {stat: amount}}.
+
+    Only completed matchups with a winner count. A bye (no player2) is a win with no sets or games.
+    """
+    if status != "COMPLETED" or winner_id is None or player1_id is None:
+        return {}
+
+    if player2_id is None:
+        return {player1_id: {"played": 1, "wins": 1}}
+
+    first = defaultdict(int, played=1)
+    second = defaultdict(int, played=1)
+    loser_id = player2_id if winner_id == player1_id else player1_id
+    (first if winner_id == player1_id else second)["wins"] += 1
+    (first if loser_id == player1_id else second)["losses"] += 1
+
+    for first_games, second_games in parse_score(score):
+        first["games_won"] += first_games
+        first["games_lost"] += second_games
+        second["games_won"] += second_games
+        second["games_lost"] += first_games
+        if first_games > second_games:
+            first["sets_won"] += 1
+            second["sets_lost"] += 1
+        elif second_games > first_games:
+            second["sets_won"] += 1
+            first["sets_lost"] += 1
+
+    return {player1_id: first, player2_id: second}
+
+def _with_differences(stats):
+    stats = {column: stats.get(column, 0) for column in STAT_COLUMNS}
+    stats["set_difference"] = stats["sets_won"] - stats["sets_lost"]
+    stats["game_difference"] = stats["games_won"] - stats["games_lost"]
+    return stats
+
+def add_standings(session, bracket_id, player_ids):
+    """Give each player without a standing in the bracket an empty one, so they rank before playing."""
+    table = BracketStanding.__table__
+    existing = set(session.execute(
+        select(table.c.player_id).where(table.c.bracket_id == bracket_id, table.c.player_id.in_(player_ids))
+    ).scalars())
+    missing = [player_id for player_id in player_ids if player_id not in existing]
+    if missing:
+        session.execute(insert(table), [
+            {"bracket_id": bracket_id, "player_id": player_id, **_with_differences({})} for player_id in missing
+        ])
+
+def remove_standings(session, bracket_id, player_ids):
+    table = BracketStanding.__table__
+    session.execute(delete(table).where(table.c.bracket_id == bracket_id, table.c.player_id.in_(player_ids)))
+
+def apply_results(session, bracket_id, removed=(), added=()):
+    """Incrementally update standings for results taken back (`removed`) and recorded (`added`).
+
+    Results are (player1_id, player2_id, winner_id, score, status) tuples. The deltas of
+    all affected players go out as one executemany UPDATE; players without a standing
+    row yet get one first.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for sign, results in ((-1, removed), (1, added)):
+        for result in results:
+            for player_id, stats in result_contribution(*result).items():
+                for column, amount in stats.items():
+                    deltas[player_id][column] += sign * amount
+
+    deltas = {player_id: _with_differences(stats) for player_id, stats in deltas.items() if any(stats.values())}
+    if not deltas:
+        return
+
+    table = BracketStanding.__table__
+    add_standings(session, bracket_id, list(deltas))
+
+    columns = (*STAT_COLUMNS, "set_difference", "game_difference")
+    session.execute(
+        update(table)
+        .where(table.c.bracket_id == bindparam("b_bracket_id"), table.c.player_id == bindparam("b_player_id"))
+        .values({column: table.c[column] + bindparam(f"d_{column}") for column in columns}),
+        [
+            {"b_bracket_id": bracket_id, "b_player_id": player_id, **{f"d_{column}": stats[column] for column in columns}}
+            for player_id, stats in deltas.items()
+        ]
+    )
+
+def rebuild_standings(session, bracket_id=None, batch_size=1000):
+    """Recompute standings in bulk from the matchups, for one bracket or all of them."""
+    table = BracketStanding.__table__
+    totals = defaultdict(lambda: defaultdict(int))
+
+    players = select(BracketPlayer.bracket_id, BracketPlayer.player_id)
+    results = select(
+        Matchup.bracket_id, Matchup.player1_id, Matchup.player2_id, Matchup.winner_id, Matchup.score, Matchup.status
+    ).where(Matchup.status == "COMPLETED")
+
+    if bracket_id is not None:
+        players = players.where(BracketPlayer.bracket_id == bracket_id)
+        results = results.where(Matchup.bracket_id == bracket_id)
+
+    for row in session.execute(players):
+        totals[(row.bracket_id, row.player_id)]
+    for row in session.execute(results, execution_options={"yield_per": batch_size}):
+        for player_id, stats in result_contribution(*row[1:]).items():
+            for column, amount in stats.items():
+                totals[(row.bracket_id, player_id)][column] += amount
+
+    if bracket_id is None:
+        session.execute(delete(table))
+    else:
+        session.execute(delete(table).where(table.c.bracket_id == bracket_id))
+
+    rows = [
+        {"bracket_id": standing_bracket_id, "player_id": player_id, **_with_differences(stats)}
+        for (standing_bracket_id, player_id), stats in totals.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        session.execute(insert(table), rows[start:start + batch_size])
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuild_standings(session)
+        session.commit()
+        print("Standings rebuilt for all brackets.")
+    except Exception as e:
+        session.rollback()
+        print(f"Failed to rebuild standings: {e}")
+    finally:
+        session.close()
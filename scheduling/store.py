@@ -0,0 +1,139 @@
+from sqlalchemy import bindparam, case, delete, insert, select, update
+from models import Matchup
+from scheduling.rounds import adjust_open_counts
+
+def replace_bracket_matchups(session, bracket_id, rows):
+    """Replace a bracket's matchups with `rows` inside the session's current transaction.
+
+    The rows go out as one executemany INSERT and their ids are read back in insertion
+    order with a single SELECT, which works the same on SQLite and on MySQL drivers
+    without RETURNING. Each row dict gets its assigned "id"; nothing is committed here.
+    """
+    session.execute(delete(Matchup.__table__).where(Matchup.bracket_id == bracket_id))
+
+    if rows:
+        session.execute(insert(Matchup.__table__), rows)
+
+    ids = session.scalars(
+        select(Matchup.id).where(Matchup.bracket_id == bracket_id).order_by(Matchup.id)
+    ).all()
+
+    for row, matchup_id in zip(rows, ids):
+        row["id"] = matchup_id
+
+    return rows
+
+def link_elimination_matchups(session, schedule, rows):
+    """Store the winner/loser advancement links of an elimination schedule on its inserted rows.
+
+    `schedule` is the output of elimination_schedule and `rows` the same matchups after
+    replace_bracket_matchups assigned their ids. All links go out as one executemany UPDATE.
+    """
+    links = []
+    for entry, row in zip(schedule, rows):
+        winner_next = entry["winner_next"]
+        loser_next = entry["loser_next"]
+        if winner_next is None and loser_next is None:
+            continue
+        links.append({
+            "matchup_id": row["id"],
+            "winner_next_matchup_id": rows[winner_next[0]]["id"] if winner_next else None,
+            "winner_next_slot": winner_next[1] if winner_next else None,
+            "loser_next_matchup_id": rows[loser_next[0]]["id"] if loser_next else None,
+            "loser_next_slot": loser_next[1] if loser_next else None,
+        })
+
+    if links:
+        table = Matchup.__table__
+        session.execute(
+            update(table).where(table.c.id == bindparam("matchup_id")).values(
+                winner_next_matchup_id=bindparam("winner_next_matchup_id"),
+                winner_next_slot=bindparam("winner_next_slot"),
+                loser_next_matchup_id=bindparam("loser_next_matchup_id"),
+                loser_next_slot=bindparam("loser_next_slot"),
+            ),
+            links
+        )
+
+RESULT_COLUMNS = ("player1_id", "player2_id", "player1_partner_id", "player2_partner_id", "winner_id", "score", "status")
+
+def write_matchup_results(session, rows):
+    """Write the result columns of many matchups with one executemany UPDATE.
+
+    Each row dict carries the matchup "id" and every column in RESULT_COLUMNS.
+    """
+    if not rows:
+        return
+
+    table = Matchup.__table__
+    session.execute(
+        update(table).where(table.c.id == bindparam("matchup_id")).values(
+            {column: bindparam(f"new_{column}") for column in RESULT_COLUMNS}
+        ),
+        [
+            {"matchup_id": row["id"], **{f"new_{column}": row[column] for column in RESULT_COLUMNS}}
+            for row in rows
+        ]
+    )
+
+def place_in_slot(session, matchup_id, slot, player_id):
+    """Put a player into one slot of a matchup with a single UPDATE."""
+    place_in_slots(session, [(matchup_id, slot, player_id)])
+
+def place_in_slots(session, placements):
+    """Put players into matchup slots, one executemany UPDATE per slot number.
+
+    `placements` are (matchup_id, slot, player_id) tuples. A PENDING matchup whose other
+    slot is already filled becomes PLANNING in the same statement, which also holds when
+    both slots are filled by one call: slot 1 is written before slot 2.
+    A matchup that is already COMPLETED is left alone, so correcting an earlier result
+    never rewrites a match that has been played (or the standings it fed).
+    The rounds' PLANNING counts follow the matchups that open; like adjust_open_counts,
+    this relies on the caller holding the brackets' version locks.
+    """
+    if not placements:
+        return
+
+    table = Matchup.__table__
+
+    # Play the placements through on the rows as they stand to learn which matchups open
+    targets = {
+        row.id: {"bracket_id": row.bracket_id, "round": row.round, "status": row.status, 1: row.player1_id, 2: row.player2_id}
+        for row in session.execute(
+            select(table.c.id, table.c.bracket_id, table.c.round, table.c.status, table.c.player1_id, table.c.player2_id)
+            .where(table.c.id.in_({matchup_id for matchup_id, _, _ in placements}))
+        )
+    }
+    open_deltas = {}
+    for slot in (1, 2):
+        for matchup_id, placement_slot, player_id in placements:
+            target = targets.get(matchup_id)
+            if placement_slot != slot or target is None or target["status"] == "COMPLETED":
+                continue
+            target[slot] = player_id
+            if target["status"] == "PENDING" and target[3 - slot] is not None:
+                target["status"] = "PLANNING"
+                key = (target["bracket_id"], target["round"])
+                open_deltas[key] = open_deltas.get(key, 0) + 1
+
+    for slot in (1, 2):
+        params = [
+            {"matchup_id": matchup_id, "player_id": player_id}
+            for matchup_id, placement_slot, player_id in placements if placement_slot == slot
+        ]
+        if not params:
+            continue
+
+        column, other = (table.c.player1_id, table.c.player2_id) if slot == 1 else (table.c.player2_id, table.c.player1_id)
+        session.execute(
+            update(table).where(table.c.id == bindparam("matchup_id"), table.c.status != "COMPLETED").values({
+                column: bindparam("player_id"),
+                table.c.status: case(
+                    ((table.c.status == "PENDING") & other.is_not(None), "PLANNING"),
+                    else_=table.c.status
+                )
+            }),
+            params
+        )
+
+    adjust_open_counts(session, open_deltas)
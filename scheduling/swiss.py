@@ -0,0 +1,186 @@
+import math
+from collections import defaultdict, deque
+from scheduling.matching import max_weight_matching
+
+def default_num_rounds(num_players):
+    """Enough rounds to separate a single undefeated player: ceil(log2(n))."""
+    return max(1, math.ceil(math.log2(num_players))) if num_players > 1 else 1
+
+def swiss_standings(player_ids, results):
+    """Compute wins, opponents and byes from (player1_id, player2_id, winner_id) results.
+
+    A result with no player2_id is a bye. Returns the players ranked by wins, then
+    Buchholz (the sum of their opponents' wins), then their original seeding.
+    """
+    seeds = {player_id: seed for seed, player_id in enumerate(player_ids)}
+    wins = dict.fromkeys(player_ids, 0)
+    opponents = defaultdict(set)
+    had_bye = set()
+
+    for player1_id, player2_id, winner_id in results:
+        if player2_id is None:
+            had_bye.add(player1_id)
+        else:
+            opponents[player1_id].add(player2_id)
+            opponents[player2_id].add(player1_id)
+        if winner_id in wins:
+            wins[winner_id] += 1
+
+    buchholz = {
+        player_id: sum(wins.get(opponent_id, 0) for opponent_id in opponents[player_id])
+        for player_id in player_ids
+    }
+    ranked = sorted(player_ids, key=lambda player_id: (-wins[player_id], -buchholz[player_id], seeds[player_id]))
+
+    return ranked, wins, opponents, had_bye
+
+def _dutch_order(ranked, wins):
+    """Reorder ranked players so adjacent pairs match the top half of each score group against its bottom half.
+
+    A score group with an odd number of players floats its lowest player down into
+    the next group.
+    """
+    order = []
+    group = []
+    carried = []
+
+    def flush(group):
+        half = len(group) // 2
+        for top, bottom in zip(group[:half], group[half:]):
+            order.extend((top, bottom))
+
+    for index, player_id in enumerate(ranked):
+        group.append(player_id)
+        is_last = index == len(ranked) - 1
+        if is_last or wins[ranked[index + 1]] != wins[player_id]:
+            group = carried + group
+            carried = [group.pop()] if len(group) % 2 else []
+            flush(group)
+            group = []
+
+    order.extend(carried)
+    return order
+
+def max_rounds_without_rematches(num_players):
+    """Rounds a field can play before someone must meet an opponent again, as in a full round robin."""
+    return num_players if num_players % 2 else max(1, num_players - 1)
+
+def _greedy_pairs(order, opponents):
+    """Give each player in turn the nearest unplayed opponent, then repair leftovers by swapping partners.
+
+    Linear per repair, but not guaranteed to avoid rematches.
+    """
+    remaining = deque(order)
+    pairs = []
+    leftovers = []
+
+    while remaining:
+        player_id = remaining.popleft()
+        played = opponents[player_id]
+        match_index = next((i for i, opponent_id in enumerate(remaining) if opponent_id not in played), None)
+
+        if match_index is None:
+            leftovers.append(player_id)
+        else:
+            opponent_id = remaining[match_index]
+            del remaining[match_index]
+            pairs.append((player_id, opponent_id))
+
+    for first, second in zip(leftovers[0::2], leftovers[1::2]):
+        if second not in opponents[first]:
+            pairs.append((first, second))
+            continue
+
+        # Swap partners with the lowest-ranked pair that allows it
+        for index in range(len(pairs) - 1, -1, -1):
+            third, fourth = pairs[index]
+            if third not in opponents[first] and fourth not in opponents[second]:
+                pairs[index] = (third, first)
+                pairs.append((fourth, second))
+                break
+            if fourth not in opponents[first] and third not in opponents[second]:
+                pairs[index] = (third, second)
+                pairs.append((fourth, first))
+                break
+        else:
+            pairs.append((first, second))
+
+    return pairs
+
+def _rematches(pairs, opponents):
+    return [(first, second) for first, second in pairs if second in opponents[first]]
+
+def _min_cost_pairs(ranked, order, wins, opponents, had_bye):
+    """Pair every player (and hand out the bye, if the field is odd) by a minimum-cost perfect matching.
+
+    Costs are ranked lexicographically through their scales: a rematch or a second bye
+    outweighs everything else, then the bye goes as far down the ranking as it can,
+    then squared score gaps are kept small, and last the pairs stay close to the
+    score-group `order`. Returns (pairs, bye_player_id).
+    """
+    size = len(ranked)
+    rank = {player_id: index for index, player_id in enumerate(ranked)}
+    position = {player_id: index for index, player_id in enumerate(order)}
+    score_spread = max(wins.values()) - min(wins.values())
+
+    order_scale = 1
+    gap_scale = size * size + 1
+    bye_scale = gap_scale * (size * score_spread * score_spread + 1)
+    rematch_scale = bye_scale * size
+
+    edges = []
+    for i, first in enumerate(ranked):
+        for second in ranked[i + 1:]:
+            gap = wins[first] - wins[second]
+            cost = (
+                rematch_scale * (second in opponents[first])
+                + gap_scale * gap * gap
+                + order_scale * abs(position[first] - position[second])
+            )
+            edges.append((rank[first], rank[second], 2 * rematch_scale - cost))
+
+    bye = size
+    if size % 2:
+        for player_id in ranked:
+            cost = rematch_scale * (player_id in had_bye) + bye_scale * (size - 1 - rank[player_id])
+            edges.append((rank[player_id], bye, 2 * rematch_scale - cost))
+
+    mate = max_weight_matching(edges, max_cardinality=True)
+
+    pairs = []
+    bye_player_id = None
+    for player_id in sorted(ranked, key=position.get):
+        partner = mate[rank[player_id]]
+        if partner == bye:
+            bye_player_id = player_id
+        elif position[ranked[partner]] > position[player_id]:
+            pairs.append((player_id, ranked[partner]))
+
+    return pairs, bye_player_id
+
+def pair_swiss_round(player_ids, results):
+    """Pair the next Swiss round from the results so far.
+
+    Returns (pairs, bye_player_id, rematches), `rematches` listing the pairs whose
+    players have met before. The bye goes to the lowest-ranked player who has not had
+    one. The greedy pass over the score-group order is tried first; if it pairs a
+    rematch, a minimum-cost matching over the whole field (polynomial, O(n^3)) finds
+    a pairing with as few rematches as possible, moving the bye up the ranking if that
+    is what it takes, and keeps score gaps small within that. Rematches are only
+    returned when no pairing avoids them.
+    """
+    ranked, wins, opponents, had_bye = swiss_standings(player_ids, results)
+
+    bye_player_id = None
+    if len(ranked) % 2:
+        bye_player_id = next((player_id for player_id in reversed(ranked) if player_id not in had_bye), ranked[-1])
+
+    order = _dutch_order([player_id for player_id in ranked if player_id != bye_player_id], wins)
+    pairs = _greedy_pairs(order, opponents)
+    if not _rematches(pairs, opponents):
+        return pairs, bye_player_id, []
+
+    if bye_player_id is not None:
+        order.append(bye_player_id)
+    pairs, bye_player_id = _min_cost_pairs(ranked, order, wins, opponents, had_bye)
+    return pairs, bye_player_id, _rematches(pairs, opponents)
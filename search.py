@@ -0,0 +1,249 @@
+"""Player search: prefix and trigram matching on names, exact matching on phone numbers.
+
+The index lives in two tables kept current by the player routes. player_search_term
+holds every word-suffix of each player's normalized name ("danielle neal", "neal") and
+the digits of their phone number, so a prefix of any word is an index range scan.
+player_search_trigram holds the trigrams of each distinct name word, so a fuzzy lookup
+reads the vocabulary rather than every player.
+
+Run as a module to rebuild the index from the player table:
+
+    python -m search
+"""
+import itertools
+import os
+import re
+import unicodedata
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Player, PlayerSearchTerm, PlayerSearchTrigram, SessionLocal
+
+load_dotenv()
+
+# Minimum trigram similarity for a word to count as a fuzzy match of a query word
+SIMILARITY = float(os.getenv("SEARCH_SIMILARITY", 0.3))
+# How many of the vocabulary's closest words a fuzzy lookup considers, and how many lookups it makes
+FUZZY_CANDIDATES = int(os.getenv("SEARCH_FUZZY_CANDIDATES", 50))
+TERM_LENGTH = PlayerSearchTerm.term.type.length
+NON_WORD = re.compile(r"[\W_]+")
+NON_DIGIT = re.compile(r"\D")
+
+def normalize(text):
+    """Lowercase, strip accents and reduce to single-space separated words."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(NON_WORD.sub(" ", text).split())
+
+def name_terms(name):
+    """Every word-suffix of a normalized name, so a prefix of any of its words finds it."""
+    words = normalize(name).split()
+    return {" ".join(words[start:])[:TERM_LENGTH] for start in range(len(words))}
+
+def phone_digits(phone_number):
+    return NON_DIGIT.sub("", phone_number or "")[:TERM_LENGTH]
+
+def trigrams(word):
+    """The trigrams of a word padded as pg_trgm does, so short words and word starts weigh in."""
+    padded = f"  {word} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+def similarity(first, second):
+    first, second = trigrams(first), trigrams(second)
+    return len(first & second) / len(first | second)
+
+def _word_condition(word):
+    # A term whose first word is `word`: the word itself, or the word, a space and more.
+    # Terms hold only letters, digits and spaces, so that is one range the index can scan.
+    return and_(PlayerSearchTerm.term >= word, PlayerSearchTerm.term < word + "!")
+
+def _insert_ignoring_duplicates(session, table, rows, index_elements):
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        statement = mysql_insert(table)
+        session.execute(statement.on_duplicate_key_update(word=statement.inserted.word), rows)
+        return
+
+    insert_ = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    session.execute(insert_(table).on_conflict_do_nothing(index_elements=index_elements), rows)
+
+def index_player(session, player_id, name, phone_number):
+    """Add a player's terms to the index, and the trigrams of any name words it didn't have yet."""
+    rows = [{"player_id": player_id, "field": "name", "term": term} for term in name_terms(name)]
+    digits = phone_digits(phone_number)
+    if digits:
+        rows.append({"player_id": player_id, "field": "phone", "term": digits})
+    if rows:
+        session.execute(insert(PlayerSearchTerm.__table__), rows)
+
+    words = set(normalize(name).split())
+    known = set(session.execute(
+        select(PlayerSearchTrigram.word).where(PlayerSearchTrigram.word.in_(words)).distinct()
+    ).scalars())
+    trigram_rows = [
+        {"trigram": trigram, "word": word} for word in words - known for trigram in trigrams(word)
+    ]
+    if trigram_rows:
+        # Two players with the same new word can be indexed at once; the second insert is a no-op
+        _insert_ignoring_duplicates(session, PlayerSearchTrigram.__table__, trigram_rows, ["trigram", "word"])
+
+def unindex_player(session, player_id):
+    """Remove a player's terms, and the trigrams of name words no other player has."""
+    words = {
+        term.split(" ", 1)[0]
+        for term in session.execute(
+            select(PlayerSearchTerm.term).where(PlayerSearchTerm.player_id == player_id, PlayerSearchTerm.field == "name")
+        ).scalars()
+    }
+    session.execute(delete(PlayerSearchTerm).where(PlayerSearchTerm.player_id == player_id))
+
+    for word in words:
+        in_use = session.execute(
+            select(PlayerSearchTerm.id).where(PlayerSearchTerm.field == "name", _word_condition(word)).limit(1)
+        ).first()
+        if in_use is None:
+            session.execute(delete(PlayerSearchTrigram).where(PlayerSearchTrigram.word == word))
+
+def rebuild_search_index(session, batch_size=5000):
+    """Recompute the whole index in bulk from the player table."""
+    session.execute(delete(PlayerSearchTerm))
+    session.execute(delete(PlayerSearchTrigram))
+
+    words = set()
+    rows = []
+    players = select(Player.id, Player.name, Player.phone_number)
+    for player_id, name, phone_number in session.execute(players, execution_options={"yield_per": batch_size}):
+        words.update(normalize(name).split())
+        rows.extend({"player_id": player_id, "field": "name", "term": term} for term in name_terms(name))
+        digits = phone_digits(phone_number)
+        if digits:
+            rows.append({"player_id": player_id, "field": "phone", "term": digits})
+        if len(rows) >= batch_size:
+            session.execute(insert(PlayerSearchTerm.__table__), rows)
+            rows = []
+    if rows:
+        session.execute(insert(PlayerSearchTerm.__table__), rows)
+
+    trigram_rows = [{"trigram": trigram, "word": word} for word in words for trigram in trigrams(word)]
+    for start in range(0, len(trigram_rows), batch_size):
+        session.execute(insert(PlayerSearchTrigram.__table__), trigram_rows[start:start + batch_size])
+
+def _phone_matches(session, digits, limit):
+    statement = (
+        select(PlayerSearchTerm.player_id)
+        .where(PlayerSearchTerm.field == "phone", PlayerSearchTerm.term == digits)
+        .order_by(PlayerSearchTerm.player_id)
+        .limit(limit)
+    )
+    return [(player_id, "phone", 1.0) for player_id in session.execute(statement).scalars()]
+
+def _prefix_matches(session, query, limit):
+    # Everything from the query up to, but not including, the next string of its length
+    upper = query[:-1] + chr(ord(query[-1]) + 1)
+    statement = (
+        select(PlayerSearchTerm.player_id, PlayerSearchTerm.term)
+        .where(PlayerSearchTerm.field == "name", PlayerSearchTerm.term >= query, PlayerSearchTerm.term < upper)
+        .order_by(PlayerSearchTerm.term, PlayerSearchTerm.player_id)
+        # A player can match through more than one of their suffixes
+        .limit(limit * 2)
+    )
+    matches = []
+    for player_id, term in session.execute(statement):
+        # Whole words rank above partial ones: "dan" is a better match for "dan reid" than for "danielle neal"
+        whole = term == query or term.startswith(query + " ")
+        matched_word = term[len(query):].split(" ", 1)[0]
+        score = 1.0 if whole else round(len(query) / (len(query) + len(matched_word)), 3)
+        matches.append((player_id, "prefix", score))
+    matches.sort(key=lambda match: -match[2])
+    return matches
+
+def _similar_words(session, query_word):
+    """Vocabulary words similar to `query_word`, as (word, similarity), most similar first."""
+    candidates = session.execute(
+        select(PlayerSearchTrigram.word)
+        .where(PlayerSearchTrigram.trigram.in_(trigrams(query_word)))
+        .group_by(PlayerSearchTrigram.word)
+        .order_by(func.count().desc(), PlayerSearchTrigram.word)
+        .limit(FUZZY_CANDIDATES)
+    ).scalars()
+    scored = [(word, similarity(word, query_word)) for word in candidates]
+    return sorted(((word, score) for word, score in scored if score >= SIMILARITY), key=lambda item: (-item[1], item[0]))
+
+def _fuzzy_matches(session, query, limit):
+    """Players whose names have words similar to the query's, best first.
+
+    Each lookup is an index seek for one sequence of similar words, tried in order of
+    score until the limit is filled, so the cost doesn't grow with how many players
+    share a common name. For several query words, whole sequences of similar words
+    ("danielle neal" for "danyelle nael") go before single ones.
+    """
+    query_words = query.split()
+    similar = [_similar_words(session, word) for word in query_words]
+
+    sequences = []
+    if len(query_words) > 1 and all(similar):
+        # Only the closest few words of each make up sequences, which multiply quickly
+        closest = [words[:5] for words in similar]
+        sequences.extend(
+            (" ".join(word for word, _ in combination), sum(score for _, score in combination) / len(query_words))
+            for combination in itertools.product(*closest)
+        )
+    sequences.extend((word, score / len(query_words)) for words in similar for word, score in words)
+    sequences.sort(key=lambda item: -item[1])
+
+    matches = []
+    found = set()
+    for term, score in sequences[:FUZZY_CANDIDATES]:
+        if len(matches) >= limit:
+            break
+        statement = (
+            select(PlayerSearchTerm.player_id)
+            .where(PlayerSearchTerm.field == "name", _word_condition(term))
+            .order_by(PlayerSearchTerm.player_id)
+            # Enough to fill the limit even if every player already found comes up again
+            .limit(limit)
+        )
+        for player_id in session.execute(statement).scalars():
+            if player_id not in found and len(matches) < limit:
+                found.add(player_id)
+                matches.append((player_id, "fuzzy", round(score, 3)))
+    return matches
+
+def search_players(session, text, limit):
+    """Rank players matching `text` as (player_id, match, score), best first, at most `limit` of them.
+
+    A query of digits and punctuation only is matched exactly against phone numbers.
+    Otherwise name prefixes come first, then, if they don't fill the limit, names with
+    words similar to the query's.
+    """
+    query = normalize(text)
+    if not query:
+        return []
+
+    if not any(char.isalpha() for char in query):
+        digits = phone_digits(query)
+        return _phone_matches(session, digits, limit) if digits else []
+
+    results = {}
+    for player_id, match, score in _prefix_matches(session, query, limit):
+        results.setdefault(player_id, (player_id, match, score))
+    if len(results) < limit:
+        for player_id, match, score in _fuzzy_matches(session, query, limit + len(results)):
+            results.setdefault(player_id, (player_id, match, score))
+    return list(results.values())[:limit]
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        rebuild_search_index(session)
+        session.commit()
+        print("Player search index rebuilt.")
+    except Exception as e:
+        session.rollback()
+        print(f"Failed to rebuild the player search index: {e}")
+    finally:
+        session.close()
@@ -0,0 +1,157 @@
+from datetime import date
+from typing import Optional
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from werkzeug.http import http_date
+from models import Bracket, BracketStanding, Matchup, Player, Tournament, TournamentPlayer
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with encoding done by orjson.
+
+    Output matches the default provider's: keys are sorted and dates are HTTP dates.
+    Calls with formatting options such as `indent` go to the standard library encoder,
+    which supports them.
+    """
+
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def _default(self, value):
+        if isinstance(value, date):
+            return http_date(value)
+        return self.default(value)
+
+    def dumps_bytes(self, obj):
+        options = self.options | orjson.OPT_SORT_KEYS if self.sort_keys else self.options
+        return orjson.dumps(obj, default=self._default, option=options)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+class RowType:
+    """The columns one kind of response object is read from, and the encoder for its rows.
+
+    Read-only routes select these columns as plain rows instead of loading ORM objects,
+    and turn each row into a dict by zipping it with the field names worked out here
+    once. `nested` adds (key, RowType) objects read from columns that follow, as
+    selected by columns(); a nested object whose id is NULL, from an outer join that
+    matched nothing, becomes None.
+    """
+
+    def __init__(self, model, fields, nested=()):
+        self.model = model
+        self.fields = tuple(fields)
+        self.nested = tuple(nested)
+        self._subsets = {}
+
+        if not self.nested:
+            fields = self.fields
+            self.encode = lambda row: dict(zip(fields, row))
+
+    def only(self, fields=None, nested_fields=None):
+        """This type cut down to a comma-separated list of fields, for a `fields=` parameter.
+
+        "id" is always kept, so rows can still be paged and referred to. Naming a nested
+        key keeps that object, itself cut down to `nested_fields`. None keeps everything.
+        Raises ValueError naming any field the type doesn't have.
+        """
+        key = (fields, nested_fields)
+        subset = self._subsets.get(key)
+        if subset is not None:
+            return subset
+
+        nested_keys = [nested_key for nested_key, _ in self.nested]
+        if fields is None:
+            wanted = set(self.fields) | set(nested_keys)
+        else:
+            wanted = {field.strip() for field in fields.split(",") if field.strip()}
+            unknown = wanted - set(self.fields) - set(nested_keys)
+            if unknown:
+                raise ValueError(
+                    f"Unknown fields: {', '.join(sorted(unknown))}; "
+                    f"available: {', '.join(self.fields + tuple(nested_keys))}"
+                )
+
+        subset = RowType(
+            self.model,
+            [field for field in self.fields if field in wanted or field == "id"],
+            [(nested_key, row_type.only(nested_fields)) for nested_key, row_type in self.nested if nested_key in wanted]
+        )
+        # Bounded by the distinct field lists clients send, which in practice are a handful
+        if len(self._subsets) < 256:
+            self._subsets[key] = subset
+        return subset
+
+    def columns(self, entity=None, nested_entities=None):
+        """The columns to select, from `entity` (an alias of the model) if given.
+
+        `nested_entities` maps each nested key to the alias its columns are read from.
+        """
+        entity = entity if entity is not None else self.model
+        columns = [getattr(entity, field) for field in self.fields]
+        for nested_key, row_type in self.nested:
+            columns.extend(row_type.columns(nested_entities[nested_key]))
+        return columns
+
+    def select(self, entity=None):
+        return select(*self.columns(entity))
+
+    def encode(self, row):
+        data = dict(zip(self.fields, row))
+        start = len(self.fields)
+        for key, row_type in self.nested:
+            end = start + len(row_type.fields)
+            data[key] = row_type.encode(row[start:end]) if row[start] is not None else None
+            start = end
+        return data
+
+    def encode_all(self, rows):
+        encode = self.encode
+        return [encode(row) for row in rows]
+
+    def dump(self, obj):
+        """Encode an ORM object, for write routes that already have one loaded."""
+        return {field: getattr(obj, field) for field in self.fields}
+
+class FieldsQuery(BaseModel):
+    fields: Optional[str] = Field(default=None, description="Comma-separated fields to return; id is always included")
+
+PLAYER = RowType(Player, ("id", "name", "gender", "phone_number"))
+TOURNAMENT = RowType(Tournament, ("id", "name", "start_date", "end_date", "format", "status"))
+BRACKET = RowType(Bracket, ("id", "tournament_id", "name"))
+BRACKET_SUMMARY = RowType(Bracket, ("id", "name"))
+BRACKET_OVERVIEW = RowType(Bracket, ("id", "name", "format", "num_rounds"))
+TOURNAMENT_PLAYER = RowType(TournamentPlayer, ("id", "tournament_id", "player_id"))
+MATCHUP = RowType(Matchup, (
+    "id", "bracket_id", "player1_id", "player2_id", "player1_partner_id", "player2_partner_id", "winner_id", "score", "status"
+))
+MATCHUP_SUMMARY = RowType(Matchup, ("id", "status", "score"))
+STANDING = RowType(BracketStanding, (
+    "player_id", "played", "wins", "losses", "sets_won", "sets_lost", "games_won", "games_lost", "set_difference", "game_difference"
+))
+
+# The players of a matchup, in the order their columns follow the matchup's own
+MATCHUP_PLAYER_SLOTS = ("player1", "player2", "player1_partner", "player2_partner", "winner")
+BRACKET_MATCHUP = RowType(
+    Matchup, ("id", "bracket_id", "score", "status", "round"), nested=[(slot, PLAYER) for slot in MATCHUP_PLAYER_SLOTS]
+)
+# The normalized shape: players by id, listed once alongside the matchups
+BRACKET_MATCHUP_REFERENCES = RowType(
+    Matchup, ("id", "bracket_id", "score", "status", "round", *(f"{slot}_id" for slot in MATCHUP_PLAYER_SLOTS))
+)
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import time, so point it at a scratch database first
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["CACHE_BACKEND"] = "none"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event, insert
+from models import Base, Bracket, BracketPlayer, Player, Tournament, engine
+
+@pytest.fixture
+def database():
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def client(database):
+    from app import app
+    return app.test_client()
+
+@pytest.fixture
+def query_counter(database):
+    """A list whose length is the number of statements run since the test started or last cleared it."""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
+
+def create_bracket(num_players, tournament_format="ROUND_ROBIN"):
+    """A tournament with one bracket of `num_players` new players; returns (tournament_id, bracket_id, player_ids)."""
+    with engine.begin() as conn:
+        tournament_id = conn.execute(
+            insert(Tournament.__table__).values(name="Test", format=tournament_format, status="IN_PROGRESS")
+        ).inserted_primary_key[0]
+        bracket_id = conn.execute(
+            insert(Bracket.__table__).values(tournament_id=tournament_id, name="Test")
+        ).inserted_primary_key[0]
+        player_ids = [
+            conn.execute(
+                insert(Player.__table__).values(name=f"Player {i}", gender="Female", phone_number=f"555-{i:04}")
+            ).inserted_primary_key[0]
+            for i in range(num_players)
+        ]
+        if player_ids:
+            conn.execute(insert(BracketPlayer.__table__), [
+                {"bracket_id": bracket_id, "player_id": player_id} for player_id in player_ids
+            ])
+    return tournament_id, bracket_id, player_ids
@@ -0,0 +1,52 @@
+from conftest import create_bracket
+from test_players import add_player
+
+def test_bulk_add_keeps_ids_that_equal_rejected_values(client):
+    _, bracket_id, (member,) = create_bracket(1)
+    first, second = add_player(client, "First"), add_player(client, "Second")
+
+    response = client.post(f"/brackets/{bracket_id}/players/bulk", json={
+        "player_ids": [True, float(member), member, float(first), first, str(second), second, second, 999999]
+    })
+    assert response.status_code == 201
+    assert response.get_json() == {
+        "added": [first, second],
+        "skipped": [member],
+        "invalid": [True, float(member), float(first), str(second), 999999],
+        "duplicates_in_request": 1
+    }
+
+def test_standings_follow_players_joining_the_bracket(client):
+    _, bracket_id, _ = create_bracket(0)
+    first, second, third = (add_player(client, name) for name in ("First", "Second", "Third"))
+
+    assert client.post(f"/brackets/{bracket_id}/players", json={"player_id": first}).status_code == 201
+    assert client.post(f"/brackets/{bracket_id}/players/bulk", json={"player_ids": [second, third]}).status_code == 201
+
+    # Nobody has played, so the player id settles the order
+    standings = client.get(f"/brackets/{bracket_id}/standings").get_json()
+    assert [(row["rank"], row["player_id"], row["played"]) for row in standings] == [(1, third, 0), (2, second, 0), (3, first, 0)]
+
+def test_bracket_player_routes_add_and_remove_standings(client):
+    from apiflask import APIFlask
+    from db import close_db
+    from routes.bracket_players import bracket_players_bp
+
+    # The app doesn't serve these routes, so they get an app of their own
+    app = APIFlask(__name__)
+    app.teardown_appcontext(close_db)
+    app.register_blueprint(bracket_players_bp)
+    bracket_players = app.test_client()
+
+    _, bracket_id, _ = create_bracket(0)
+    first, second = add_player(client, "First"), add_player(client, "Second")
+    bracket_player_ids = [
+        bracket_players.post("/bracket_players", json={"bracket_id": bracket_id, "player_id": player_id}).get_json()["id"]
+        for player_id in (first, second)
+    ]
+    standings = client.get(f"/brackets/{bracket_id}/standings").get_json()
+    assert [row["player_id"] for row in standings] == [second, first]
+
+    assert bracket_players.delete(f"/bracket_players/{bracket_player_ids[1]}").status_code == 200
+    standings = client.get(f"/brackets/{bracket_id}/standings").get_json()
+    assert [row["player_id"] for row in standings] == [first]
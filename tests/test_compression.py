@@ -0,0 +1,35 @@
+import brotli
+from cache import LRUCacheBackend
+from conftest import create_bracket
+
+def test_compressed_variants_get_their_own_etags(client):
+    _, bracket_id, _ = create_bracket(16)
+    client.post("/matchups/generate", json={"bracket_id": bracket_id, "format": "ROUND_ROBIN"})
+    url = f"/brackets/{bracket_id}/matchups?ALL=true"
+
+    plain = client.get(url)
+    compressed = client.get(url, headers={"Accept-Encoding": "br"})
+    assert compressed.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(compressed.data) == plain.data
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-br"'
+
+    # Either tag revalidates, and the 304 names the variant the client holds
+    for response in (plain, compressed):
+        etag = response.headers["ETag"]
+        revalidated = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+
+def test_replace_only_swaps_the_value_it_expects():
+    cache = LRUCacheBackend()
+    first, second = ("first",), ("second",)
+    cache.set("key", first, ("tag",), cache.generations(("tag",)))
+
+    cache.replace("key", second, ("stale",))
+    assert cache.get("key") is first
+    cache.replace("key", first, second)
+    assert cache.get("key") is second
+
+    # Invalidation still reaches a replaced value through its tags
+    cache.invalidate(("tag",))
+    assert cache.get("key") is None
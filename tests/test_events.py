@@ -0,0 +1,61 @@
+from conftest import create_bracket
+from events import EventHub
+
+def test_resuming_a_recreated_channel_asks_for_a_refresh():
+    hub = EventHub(max_channels=2)
+    first = hub.publish(["a"], "matchup", {})
+    hub.publish(["a"], "matchup", {})
+    # "b" and "c" push "a" out, then "a" comes back with only its new events
+    hub.publish(["b"], "matchup", {})
+    hub.publish(["c"], "matchup", {})
+    latest = hub.publish(["a"], "matchup", {})
+
+    _, backlog, missed = hub.subscribe("a", first)
+    assert missed and backlog == []
+
+    # A client already past the recreation resumes as usual
+    _, backlog, missed = hub.subscribe("a", latest)
+    assert not missed and backlog == []
+
+def test_resuming_within_and_beyond_the_history():
+    hub = EventHub(history_size=3)
+    ids = [hub.publish(["a"], "matchup", {"n": n}) for n in range(5)]
+
+    _, backlog, missed = hub.subscribe("a", ids[1])
+    assert not missed and [entry[0] for entry in backlog] == ids[2:]
+
+    _, backlog, missed = hub.subscribe("a", ids[0])
+    assert missed and backlog == []
+
+    # A channel nothing was published to, and no eviction could have emptied, has nothing to replay
+    _, backlog, missed = hub.subscribe("b", ids[0])
+    assert not missed and backlog == []
+
+def test_subscribers_are_capped():
+    hub = EventHub(max_subscribers=2)
+    first, _, _ = hub.subscribe("a")
+    hub.subscribe("b")
+    assert hub.subscribe("a") is None
+
+    hub.unsubscribe(first)
+    assert hub.subscribe("a") is not None
+    assert hub.snapshot()["subscribers"] == 2
+    assert hub.snapshot()["refused_subscribers"] == 1
+
+def test_streams_unsubscribe_when_closed_unread(client):
+    from events import hub
+    _, bracket_id, _ = create_bracket(2)
+    subscribers = hub.snapshot()["subscribers"]
+
+    # The test client leaves closing to the caller, as a WSGI server does once the client is gone
+    for _ in range(3):
+        response = client.head(f"/brackets/{bracket_id}/events")
+        assert response.status_code == 200
+        response.close()
+    client.get(f"/brackets/{bracket_id}/events", buffered=False).close()
+
+    stream = client.get(f"/brackets/{bracket_id}/events", buffered=False)
+    assert next(iter(stream.response)).startswith(b"retry:")
+    assert hub.snapshot()["subscribers"] == subscribers + 1
+    stream.close()
+    assert hub.snapshot()["subscribers"] == subscribers
@@ -0,0 +1,15 @@
+from conftest import create_bracket
+
+def bracket_matchups_queries(client, query_counter, num_players):
+    _, bracket_id, _ = create_bracket(num_players)
+    response = client.post("/matchups/generate", json={"bracket_id": bracket_id, "format": "ROUND_ROBIN"})
+    assert response.status_code == 201, response.get_json()
+
+    query_counter.clear()
+    response = client.get(f"/brackets/{bracket_id}/matchups?ALL=true")
+    assert response.status_code == 200
+    assert len(response.get_json()) == num_players * (num_players - 1) // 2
+    return len(query_counter)
+
+def test_bracket_matchups_query_count_is_independent_of_bracket_size(client, query_counter):
+    assert bracket_matchups_queries(client, query_counter, 2) == bracket_matchups_queries(client, query_counter, 64)
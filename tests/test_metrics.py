@@ -0,0 +1,26 @@
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+
+from app import app
+from models import engine
+
+def test_failed_statements_leave_no_start_time_behind(database):
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert not conn.info["query_started"]
+
+        conn.exec_driver_sql("SELECT 1")
+        assert not conn.info["query_started"]
+
+def test_failed_statements_count_towards_the_request(database):
+    with app.test_request_context():
+        app.preprocess_request()
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.exec_driver_sql("SELECT 1")
+
+        assert g.request_metrics["queries"] == 2
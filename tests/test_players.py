@@ -0,0 +1,23 @@
+from conftest import create_bracket
+
+def add_player(client, name):
+    return client.post("/players", json={"name": name, "gender": "Male", "phone_number": "555-9999"}).get_json()["id"]
+
+def test_removing_a_player_changes_the_etags_of_brackets_showing_them(client):
+    _, bracket_id, player_ids = create_bracket(2)
+    substitute = add_player(client, "Substitute")
+    response = client.post("/matchups", json={
+        "bracket_id": bracket_id, "player1_id": substitute, "player2_id": player_ids[0], "status": "PLANNING", "round": 1
+    })
+    assert response.status_code == 201, response.get_json()
+    matchups = client.get(f"/brackets/{bracket_id}/matchups?ALL=true")
+    etag = {"If-None-Match": matchups.headers["ETag"]}
+
+    # Removing a player no bracket shows leaves the bracket's tags alone
+    assert client.delete(f"/players/{add_player(client, 'Unrelated')}").status_code == 200
+    assert client.get(f"/brackets/{bracket_id}/matchups?ALL=true", headers=etag).status_code == 304
+
+    assert client.delete(f"/players/{substitute}").status_code == 200
+    response = client.get(f"/brackets/{bracket_id}/matchups?ALL=true", headers=etag)
+    assert response.status_code == 200
+    assert response.get_json()[0]["player1"] is None
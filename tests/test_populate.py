@@ -0,0 +1,11 @@
+import random
+
+from populate import round_robin_rows
+
+def test_round_robin_rows_open_the_round_after_the_completed_ones():
+    rows = round_robin_rows(1, list(range(1, 7)), 2, 1, random.Random(0))
+
+    statuses = {}
+    for row in rows:
+        statuses.setdefault(row["round"], set()).add(row["status"])
+    assert statuses == {1: {"COMPLETED"}, 2: {"COMPLETED"}, 3: {"PLANNING"}, 4: {"PENDING"}, 5: {"PENDING"}}
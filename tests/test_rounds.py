@@ -0,0 +1,188 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from conftest import create_bracket
+from models import BracketRound, Matchup, SessionLocal, engine
+from scheduling.rounds import advance_round, rebuild_round_state
+
+def round_counts(bracket_id):
+    """(stored open_count, actual PLANNING matchups) per round of a bracket."""
+    session = SessionLocal()
+    try:
+        actual = dict(session.execute(
+            select(Matchup.round, func.count(Matchup.id))
+            .where(Matchup.bracket_id == bracket_id, Matchup.status == "PLANNING")
+            .group_by(Matchup.round)
+        ).all())
+        stored = dict(session.execute(
+            select(BracketRound.round, BracketRound.open_count).where(BracketRound.bracket_id == bracket_id)
+        ).all())
+        return stored, {round_num: actual.get(round_num, 0) for round_num in stored}
+    finally:
+        session.close()
+
+def playable_matchups(bracket_id):
+    session = SessionLocal()
+    try:
+        return session.execute(
+            select(Matchup.id, Matchup.player1_id, Matchup.status)
+            .where(Matchup.bracket_id == bracket_id, Matchup.player1_id.is_not(None), Matchup.player2_id.is_not(None),
+                   Matchup.status != "COMPLETED")
+            .order_by(Matchup.id)
+        ).all()
+    finally:
+        session.close()
+
+def open_matchups_missing_players(bracket_id):
+    session = SessionLocal()
+    try:
+        return session.execute(
+            select(Matchup.id).where(
+                Matchup.bracket_id == bracket_id,
+                Matchup.status == "PLANNING",
+                Matchup.player1_id.is_(None) | Matchup.player2_id.is_(None)
+            )
+        ).scalars().all()
+    finally:
+        session.close()
+
+def play_elimination_bracket(client, format, complete, num_players=8):
+    _, bracket_id, _ = create_bracket(num_players)
+    response = client.post("/matchups/generate", json={"bracket_id": bracket_id, "format": format})
+    assert response.status_code == 201, response.get_json()
+
+    while matchups := playable_matchups(bracket_id):
+        complete(matchups)
+        stored, actual = round_counts(bracket_id)
+        assert stored == actual
+        assert open_matchups_missing_players(bracket_id) == []
+
+def test_elimination_round_counts_follow_single_results(client):
+    def complete(matchups):
+        matchup_id, winner_id, status = matchups[0]
+        if status == "PENDING":
+            response = client.put(f"/matchups/{matchup_id}", json={"status": "PLANNING"})
+            assert response.status_code == 200, response.get_json()
+        response = client.put(f"/matchups/{matchup_id}", json={"status": "COMPLETED", "winner_id": winner_id, "score": "6-4 6-4"})
+        assert response.status_code == 200, response.get_json()
+
+    play_elimination_bracket(client, "SINGLE_ELIMINATION", complete)
+    play_elimination_bracket(client, "DOUBLE_ELIMINATION", complete)
+
+def test_elimination_round_counts_follow_batch_results(client):
+    def complete(matchups):
+        response = client.post("/matchups/batch", json={"results": [
+            {"id": matchup_id, "status": "COMPLETED", "winner_id": winner_id, "score": "6-4 6-4"}
+            for matchup_id, winner_id, _ in matchups
+        ]})
+        assert response.status_code == 200, response.get_json()
+
+    play_elimination_bracket(client, "SINGLE_ELIMINATION", complete)
+    play_elimination_bracket(client, "DOUBLE_ELIMINATION", complete)
+
+def test_elimination_brackets_with_byes_open_matchups_only_when_filled(client):
+    # Latest first, so a later round's matchup is played while a bye's feeder is still open
+    def complete_one(matchups):
+        matchup_id, winner_id, _ = matchups[-1]
+        response = client.post("/matchups/batch", json={"results": [
+            {"id": matchup_id, "status": "COMPLETED", "winner_id": winner_id, "score": "6-4 6-4"}
+        ]})
+        assert response.status_code == 200, response.get_json()
+
+    for num_players in (5, 6):
+        play_elimination_bracket(client, "SINGLE_ELIMINATION", complete_one, num_players)
+        play_elimination_bracket(client, "DOUBLE_ELIMINATION", complete_one, num_players)
+
+def test_batch_ids_must_be_integers(client):
+    _, bracket_id, _ = create_bracket(4)
+    client.post("/matchups/generate", json={"bracket_id": bracket_id, "format": "ROUND_ROBIN"})
+    matchup_id, _, _ = playable_matchups(bracket_id)[0]
+
+    # true would otherwise pass for matchup 1
+    assert matchup_id == 1
+    response = client.post("/matchups/batch", json={"results": [{"id": True, "status": "PLANNING"}]})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Every result needs an integer id"}
+
+def run_together(num_threads, work):
+    """Run `work()` on `num_threads` threads released at the same moment; returns their results."""
+    barrier = threading.Barrier(num_threads)
+
+    def run():
+        barrier.wait()
+        return work()
+
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        return list(pool.map(lambda _: run(), range(num_threads)))
+
+def generate_round_robin(client, num_players):
+    """A round robin bracket with its first round opened, as an organizer would start it."""
+    _, bracket_id, _ = create_bracket(num_players)
+    response = client.post("/matchups/generate", json={"bracket_id": bracket_id, "format": "ROUND_ROBIN"})
+    assert response.status_code == 201, response.get_json()
+
+    first_round = [matchup_id for matchup_id, _, _ in playable_matchups(bracket_id)[:num_players // 2]]
+    for matchup_id in first_round:
+        response = client.put(f"/matchups/{matchup_id}", json={"status": "PLANNING"})
+        assert response.status_code == 200, response.get_json()
+    return bracket_id
+
+def round_statuses(bracket_id, round_num):
+    session = SessionLocal()
+    try:
+        return session.execute(
+            select(Matchup.status).where(Matchup.bracket_id == bracket_id, Matchup.round == round_num)
+        ).scalars().all()
+    finally:
+        session.close()
+
+def test_advance_round_opens_the_next_round_once(client):
+    bracket_id = generate_round_robin(client, 8)
+    assert set(round_statuses(bracket_id, 1)) == {"PLANNING"}
+
+    def advance():
+        session = SessionLocal()
+        try:
+            opened = advance_round(session, bracket_id, 1)
+            session.commit()
+            return opened
+        finally:
+            session.close()
+
+    # Round 1 still has PLANNING matchups, so the conditional UPDATE matches nothing
+    assert run_together(8, advance) == [0] * 8
+    assert set(round_statuses(bracket_id, 2)) == {"PENDING"}
+
+    with engine.begin() as conn:
+        conn.execute(update(Matchup.__table__).where(Matchup.bracket_id == bracket_id, Matchup.round == 1).values(status="COMPLETED"))
+        rebuild_round_state(Session(bind=conn), bracket_id)
+
+    opened = run_together(8, advance)
+    assert sorted(opened) == [0] * 7 + [len(round_statuses(bracket_id, 2))]
+    assert set(round_statuses(bracket_id, 2)) == {"PLANNING"}
+    stored, actual = round_counts(bracket_id)
+    assert stored == actual
+
+def test_concurrent_results_open_the_next_round_once(client):
+    from app import app
+
+    bracket_id = generate_round_robin(client, 8)
+
+    first_round = iter(playable_matchups(bracket_id)[:4])
+    lock = threading.Lock()
+
+    def complete():
+        with lock:
+            matchup_id, winner_id, _ = next(first_round)
+        return app.test_client().put(
+            f"/matchups/{matchup_id}", json={"status": "COMPLETED", "winner_id": winner_id, "score": "6-4 6-4"}
+        ).status_code
+
+    assert run_together(4, complete) == [200] * 4
+    assert set(round_statuses(bracket_id, 1)) == {"COMPLETED"}
+    assert set(round_statuses(bracket_id, 2)) == {"PLANNING"}
+    assert set(round_statuses(bracket_id, 3)) == {"PENDING"}
+    stored, actual = round_counts(bracket_id)
+    assert stored == actual
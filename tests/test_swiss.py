@@ -0,0 +1,103 @@
+import random
+from functools import lru_cache
+from itertools import combinations
+
+from scheduling.matching import max_weight_matching
+from scheduling.swiss import default_num_rounds, max_rounds_without_rematches, pair_swiss_round, swiss_standings
+
+def rematch_free_pairing_exists(player_ids, results):
+    _, _, opponents, _ = swiss_standings(player_ids, results)
+    index = {player_id: i for i, player_id in enumerate(player_ids)}
+    allowed = [
+        sum(1 << index[other] for other in player_ids if other != player_id and other not in opponents[player_id])
+        for player_id in player_ids
+    ]
+
+    @lru_cache(maxsize=None)
+    def pairable(unpaired, bye_left):
+        if not unpaired:
+            return True
+        first = (unpaired & -unpaired).bit_length() - 1
+        rest = unpaired & ~(1 << first)
+        if bye_left and pairable(rest, False):
+            return True
+        candidates = rest & allowed[first]
+        while candidates:
+            second = candidates & -candidates
+            if pairable(rest & ~second, bye_left):
+                return True
+            candidates &= ~second
+        return False
+
+    return pairable((1 << len(player_ids)) - 1, len(player_ids) % 2 == 1)
+
+def test_max_weight_matching_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(500):
+        num_vertices = rng.randint(2, 8)
+        edges = [
+            (i, j, rng.randint(-5, 20))
+            for i, j in combinations(range(num_vertices), 2) if rng.random() < 0.6
+        ]
+        if not edges:
+            continue
+        weights = {frozenset((i, j)): weight for i, j, weight in edges}
+
+        def best(unmatched):
+            if not unmatched:
+                return (0, 0)
+            first, rest = unmatched[0], unmatched[1:]
+            options = [best(rest)]
+            for index, second in enumerate(rest):
+                weight = weights.get(frozenset((first, second)))
+                if weight is not None:
+                    cardinality, total = best(rest[:index] + rest[index + 1:])
+                    options.append((cardinality + 1, total + weight))
+            return max(options)
+
+        mate = max_weight_matching(edges, max_cardinality=True)
+        matched = [frozenset((v, mate[v])) for v in range(len(mate)) if mate[v] > v]
+        assert all(mate[mate[v]] == v for v in range(len(mate)) if mate[v] != -1)
+        assert (len(matched), sum(weights[pair] for pair in matched)) == best(tuple(range(num_vertices)))
+
+def test_swiss_pairs_no_rematch_whenever_one_can_be_avoided():
+    for seed in range(100):
+        rng = random.Random(seed)
+        for num_players in range(4, 21):
+            player_ids = list(range(1, num_players + 1))
+            results = []
+            played = set()
+
+            for _ in range(min(default_num_rounds(num_players) + 2, max_rounds_without_rematches(num_players))):
+                pairs, bye_player_id, rematches = pair_swiss_round(player_ids, results)
+
+                paired = sorted([player_id for pair in pairs for player_id in pair] + [bye_player_id] * (bye_player_id is not None))
+                assert paired == player_ids
+                assert rematches == [pair for pair in pairs if frozenset(pair) in played]
+                if rematches:
+                    assert not rematch_free_pairing_exists(player_ids, results), (seed, num_players, pairs)
+
+                for player1_id, player2_id in pairs:
+                    played.add(frozenset((player1_id, player2_id)))
+                    results.append((player1_id, player2_id, rng.choice((player1_id, player2_id))))
+                if bye_player_id is not None:
+                    results.append((bye_player_id, None, bye_player_id))
+
+def test_swiss_late_rounds_report_rematches_and_give_each_player_one_bye():
+    rng = random.Random(7)
+    player_ids = list(range(1, 42))
+    results = []
+    played = set()
+    byes = []
+
+    for _ in range(len(player_ids)):
+        pairs, bye_player_id, rematches = pair_swiss_round(player_ids, results)
+
+        assert rematches == [pair for pair in pairs if frozenset(pair) in played]
+        byes.append(bye_player_id)
+        for player1_id, player2_id in pairs:
+            played.add(frozenset((player1_id, player2_id)))
+            results.append((player1_id, player2_id, rng.choice((player1_id, player2_id))))
+        results.append((bye_player_id, None, bye_player_id))
+
+    assert sorted(byes) == player_ids
@@ -0,0 +1,33 @@
+from conftest import create_bracket
+from test_players import add_player
+
+def test_registering_reports_every_non_integer_id_as_invalid(client):
+    tournament_id, _, _ = create_bracket(1)
+    player_id = add_player(client, "First")
+
+    response = client.post("/tournament_players", json={
+        "tournament_id": tournament_id, "player_ids": [[[player_id]], {"id": player_id}, True, float(player_id), player_id, 999999]
+    })
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [player["player_id"] for player in body["players"]] == [player_id]
+    assert body["invalid"] == [[[player_id]], {"id": player_id}, True, float(player_id), 999999]
+
+def test_registering_only_invalid_ids_still_checks_the_tournament(client):
+    tournament_id, _, _ = create_bracket(1)
+
+    response = client.post("/tournament_players", json={"tournament_id": 999999, "player_ids": [True, "1"]})
+    assert response.status_code == 404
+
+    response = client.post("/tournament_players", json={"tournament_id": tournament_id, "player_ids": [True, "1"]})
+    assert response.status_code == 201
+    assert response.get_json() == {"players": [], "invalid": [True, "1"]}
+
+def test_registering_reports_each_invalid_id_once(client):
+    tournament_id, _, _ = create_bracket(1)
+
+    response = client.post("/tournament_players", json={
+        "tournament_id": tournament_id, "player_ids": [999999, True, [1], 1.0, True, 999999, [1], 1.0, 999998]
+    })
+    assert response.status_code == 201
+    assert response.get_json()["invalid"] == [True, [1], 1.0, 999999, 999998]
@@ -0,0 +1,51 @@
+from flask import Response
+from sqlalchemy import func, select
+from models import Bracket, Tournament
+from db import db
+from cache import bracket_tag, invalidate_on_commit, tournament_tag
+from compression import matching_etag
+
+def bump_bracket_version(bracket_id):
+    """Mark a bracket's players or matchups as changed. Flushed with the caller's commit."""
+    db.query(Bracket).filter(Bracket.id == bracket_id).update(
+        {Bracket.version: Bracket.version + 1}, synchronize_session=False
+    )
+    invalidate_on_commit(db, bracket_tag(bracket_id))
+
+def bump_tournament_version(tournament_id):
+    """Mark a tournament's own fields or its bracket list as changed. Flushed with the caller's commit."""
+    db.query(Tournament).filter(Tournament.id == tournament_id).update(
+        {Tournament.version: Tournament.version + 1}, synchronize_session=False
+    )
+    invalidate_on_commit(db, tournament_tag(tournament_id))
+
+def bracket_version(bracket_id):
+    return db.query(Bracket.version).filter(Bracket.id == bracket_id).scalar()
+
+def tournament_version(tournament_id):
+    return db.query(Tournament.version).filter(Tournament.id == tournament_id).scalar()
+
+def tournament_list_version_statement(statuses):
+    """A marker's parts for a filtered tournament list, changing whenever a tournament in or entering it changes."""
+    return select(
+        func.count(Tournament.id), func.sum(Tournament.version), func.max(Tournament.id)
+    ).where(Tournament.status.in_(statuses))
+
+def list_version_marker(count, total, last_id):
+    return f"{count}.{total or 0}.{last_id or 0}"
+
+def make_etag(*parts):
+    return "-".join(str(part) for part in parts)
+
+def is_not_modified(etag):
+    return matching_etag(etag) is not None
+
+def not_modified_response(etag):
+    response = Response(status=304)
+    # Echo the variant the client holds, compressed or not
+    response.set_etag(matching_etag(etag) or etag)
+    return response
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    return response